@@ -0,0 +1,93 @@
+"""
+强化学习接口基准.
+
+1. Scenario.accept_actions: 指令集 (字典) 与动作向量 (ActionSchema).
+2. Environment.step: 字典指令 + 逐步查找编码，与动作格式 + 观测编码器.
+"""
+
+import sys
+sys.path.append('../')
+
+import numpy as np
+
+from sim import Scenario, vec
+from sim.common import Uav, Jammer
+from sim.observation import ObservationSpec, Distance, Norm
+from sim.rl import Environment, RlAgent, RlReferee
+
+from harness import measure, record, format_results
+
+
+def setup_scene(scene, n_jammers=4):
+    """ 一架目标无人机和 n_jammers 个干扰器. """
+    scene.set_params(end=1e9)
+    for i in range(n_jammers):
+        scene.add(Jammer(name='jammer{}'.format(i), pos=[10.0 * i, 0.0]))
+    scene.add(Uav(name='target', tracks=[[100, 100], [1e6, 1e6]], speed=1.0, life=1e9))
+
+
+class DictAgent(RlAgent):
+    """ 逐步查找实体并新建数组编码，以字典给出指令. """
+
+    def __init__(self, n_jammers):
+        self.names = ['jammer{}'.format(i) for i in range(n_jammers)]
+
+    def encode_state(self, scene):
+        uav = scene.find('target')
+        s = [vec.dist(uav.position, scene.find(name).position) for name in self.names]
+        return vec.vec(s + [vec.dist(uav.velocity)])
+
+    def decode_action(self, act_val):
+        return {name + '.power_on': bool(a) for name, a in zip(self.names, act_val)}
+
+
+class SpecAgent(RlAgent):
+    """ 观测编码器 + 动作格式. """
+
+    def __init__(self, n_jammers):
+        names = ['jammer{}'.format(i) for i in range(n_jammers)]
+        self.observation = ObservationSpec([Distance('target', name) for name in names] + [Norm('target')])
+        self.action_keys = [name + '.power_on' for name in names]
+
+
+def bench_actions(n_keys=(1, 4, 16)) -> list:
+    """ accept_actions 每次调用耗时. """
+    results = []
+    for n in n_keys:
+        scene = Scenario()
+        setup_scene(scene, n)
+        actions = {'jammer{}.power_on'.format(i): True for i in range(n)}
+        results.append(record('actions/dict/keys={}'.format(n), measure(lambda: scene.accept_actions(actions)),
+                              keys=n))
+        scene.register_actions(list(actions))
+        a = np.ones(n)
+        results.append(record('actions/vector/keys={}'.format(n), measure(lambda: scene.accept_actions(a)),
+                              keys=n))
+    return results
+
+
+def bench_env(n_jammers=4) -> list:
+    """ Environment.step 每步耗时. """
+    results = []
+    for name, agent in (('dict', DictAgent(n_jammers)), ('spec', SpecAgent(n_jammers))):
+        env = Environment(referee=RlReferee(), agent=agent, setup=lambda scene: setup_scene(scene, n_jammers))
+        env.need_info = False
+        env.reset()
+        act = np.ones(n_jammers)
+        results.append(record('env/step/{}'.format(name), measure(lambda: env.step(act)), jammers=n_jammers))
+    for name, agent in (('dict', DictAgent(n_jammers)), ('spec', SpecAgent(n_jammers))):
+        env = Environment(referee=RlReferee(), agent=agent, setup=lambda scene: setup_scene(scene, n_jammers))
+        env.reset()
+        results.append(record('env/encode/{}'.format(name), measure(lambda: agent.encode_state(env.scene)),
+                              jammers=n_jammers))
+    return results
+
+
+def collect(quick=False) -> list:
+    """ 全部强化学习接口基准. """
+    return bench_actions() + bench_env()
+
+
+if __name__ == '__main__':
+    print(format_results(collect()))
+    print('--- over ---')
@@ -0,0 +1,143 @@
+"""
+场景基准.
+
+1. Scenario.step 耗时随无人机、雷达、干扰器数量的变化.
+2. 雷达探测 (交互阶段中 Radar 的耗时).
+3. 消息分发.
+
+阶段耗时通过 StepProfiler 统计.
+"""
+
+import math
+import time
+
+import sys
+sys.path.append('../')
+
+import numpy as np
+
+from sim import Scenario, Entity
+from sim.common import Uav, Radar, Jammer
+from sim.profiling import StepProfiler
+
+from harness import measure, record, format_results
+
+
+SIZES = (10, 100, 1000, 10000)
+QUICK_SIZES = (10, 100, 1000)
+
+
+def build_scene(n_uavs, n_radars, n_jammers, seed=0) -> Scenario:
+    """ 构建场景. 实体密度不随数量变化，无人机沿随机方向长距离飞行，计时期间不会退出.
+
+    :return: 已 reset 的场景.
+    """
+    rng = np.random.default_rng(seed)
+    side = 50.0 * math.sqrt(max(n_uavs, n_radars, n_jammers, 1))
+    scene = Scenario(end=1e9)
+    for i in range(n_uavs):
+        p = rng.uniform(-side / 2, side / 2, size=2)
+        heading = rng.uniform(0, 2 * math.pi)
+        dest = p + 1e6 * np.array([math.cos(heading), math.sin(heading)])
+        scene.add(Uav(name='uav', tracks=[p.tolist(), dest.tolist()], speed=1.0, life=1e9))
+    for i in range(n_radars):
+        radar = scene.add(Radar(name='radar', pos=rng.uniform(-side / 2, side / 2, size=2).tolist()))
+        radar.set_params(max_range=200.0)
+    for i in range(n_jammers):
+        jammer = scene.add(Jammer(name='jammer', pos=rng.uniform(-side / 2, side / 2, size=2).tolist()))
+        jammer.set_params(effect_range=50.0)
+        jammer.power_on = True
+    scene.reset()
+    return scene
+
+
+def profile_steps(scene: Scenario, min_time: float = 0.5, min_steps: int = 3) -> StepProfiler:
+    """ 带剖析地运行场景, 直到达到 min_time 和 min_steps. """
+    scene.step()  # 预热.
+    scene.profiler = prof = StepProfiler()
+    t0 = time.perf_counter()
+    while prof.steps < min_steps or time.perf_counter() - t0 < min_time:
+        scene.step()
+    scene.profiler = None
+    return prof
+
+
+def bench_step(sizes=SIZES, min_time=0.5) -> list:
+    """ 步进耗时 (每步). """
+    results = []
+    series = [
+        ('uav', lambda n: (n, 1, 1)),
+        ('radar', lambda n: (100, n, 1)),
+        ('jammer', lambda n: (100, 1, n)),
+        ('mixed', lambda n: (n, max(n // 10, 1), max(n // 10, 1))),
+    ]
+    for name, counts in series:
+        for n in sizes:
+            u, r, j = counts(n)
+            scene = build_scene(u, r, j)
+            scene.step()
+            us = measure(scene.step, min_time=min_time, repeat=1)
+            results.append(record('step/{}/n={}'.format(name, n), us, uavs=u, radars=r, jammers=j))
+    return results
+
+
+def bench_radar(sizes=SIZES, min_time=0.5) -> list:
+    """ 雷达探测耗时 (每步交互阶段中 Radar 的耗时). 目标数与雷达数之比为 10. """
+    results = []
+    for n in sizes:
+        radars = max(n // 10, 1)
+        prof = profile_steps(build_scene(n, radars, 0), min_time)
+        t, _ = prof.types[('access', 'Radar')]
+        results.append(record('radar/access/targets={}'.format(n), t / prof.steps * 1e6, uavs=n, radars=radars,
+                              detections=prof.counters.get('radar.detections', 0) / prof.steps))
+    return results
+
+
+class Chatter(Entity):
+    """ 基准实体: 每步给固定的若干实体发消息，并发布主题消息. """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.peers = []
+        self.topic = None
+        self.received = 0
+
+    def on_step(self):
+        for p in self.peers:
+            self.send_msg(p, 1)
+        if self.topic is not None:
+            self.publish(self.topic, 1)
+
+    def on_msgs(self, msgs):
+        self.received += len(msgs)
+
+
+def bench_message(sizes=SIZES, fanout=4, min_time=0.5) -> list:
+    """ 消息分发耗时 (每步). 每个实体每步发 fanout 条点对点消息; 另有一个实体向所有实体发布主题消息. """
+    results = []
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        scene = Scenario(end=1e9)
+        chatters = [scene.add(Chatter(name='chatter')) for _ in range(n)]
+        for c in chatters:
+            c.peers = [chatters[k].id for k in rng.integers(0, n, size=fanout)]
+            c.subscribe('news')
+        chatters[0].topic = 'news'
+        scene.reset()
+        prof = profile_steps(scene, min_time)
+        msgs = prof.counters['messages'] / prof.steps
+        results.append(record('message/dispatch/n={}'.format(n), prof.phases['message'] / prof.steps * 1e6,
+                              entities=n, messages=msgs))
+    return results
+
+
+def collect(quick=False) -> list:
+    """ 全部场景基准. """
+    sizes = QUICK_SIZES if quick else SIZES
+    min_time = 0.1 if quick else 0.5
+    return bench_step(sizes, min_time) + bench_radar(sizes, min_time) + bench_message(sizes, min_time=min_time)
+
+
+if __name__ == '__main__':
+    print(format_results(collect(quick='--quick' in sys.argv)))
+    print('--- over ---')
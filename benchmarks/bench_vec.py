@@ -0,0 +1,101 @@
+"""
+sim.vec 微基准.
+
+对比原实现 (np.linalg.norm)、当前标量实现以及批量实现的单次调用耗时.
+"""
+
+import timeit
+
+import sys
+sys.path.append('../')
+
+import numpy as np
+
+from sim import vec
+
+
+##############################################################################
+# 原实现 (对照组)
+##############################################################################
+
+def dist_ref(v1, v2=None):
+    v = v1 if v2 is None else (v1 - v2)
+    return np.linalg.norm(v)
+
+
+def unit_ref(v):
+    d = dist_ref(v)
+    if d > 0.:
+        return v / dist_ref(v)
+    return np.zeros_like(v)
+
+
+def move_to_ref(p0, p1, d):
+    d0 = dist_ref(p0, p1)
+    left = d0 - d
+    if left > 0:
+        return p0 + d * unit_ref(p1 - p0), left
+    return p1, left
+
+
+def move_step_ref(p0, p1, d):
+    d0 = dist_ref(p0, p1)
+    step = unit_ref(p1 - p0) * min(d0, d)
+    left = d0 - d
+    return step, left
+
+
+##############################################################################
+
+
+def _time(func, number) -> float:
+    """ 单次调用耗时 (微秒). """
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def bench(n=10000, number=2000):
+    """ 运行基准.
+
+    :param n: 批量版本的向量个数.
+    :param number: 单次计时的调用次数.
+    :return: [(名称, 原实现耗时, 标量实现耗时, 批量实现的单个向量耗时)], 单位为微秒.
+    """
+    rng = np.random.default_rng(0)
+    rows = []
+    for d in (2, 3):
+        a, b = rng.normal(size=d), rng.normal(size=d) * 10
+        pa, pb = rng.normal(size=(n, d)), rng.normal(size=(n, d)) * 10
+        cases = [
+            ('dist', lambda: dist_ref(a, b), lambda: vec.dist(a, b), lambda: vec.dist_n(pa, pb)),
+            ('unit', lambda: unit_ref(b), lambda: vec.unit(b), lambda: vec.unit_n(pb)),
+            ('move_to', lambda: move_to_ref(a, b, 1.0), lambda: vec.move_to(a, b, 1.0),
+             lambda: vec.move_to_n(pa, pb, 1.0)),
+            ('move_step', lambda: move_step_ref(a, b, 1.0), lambda: vec.move_step(a, b, 1.0),
+             lambda: vec.move_step_n(pa, pb, 1.0)),
+        ]
+        for name, ref, fast, batch in cases:
+            rows.append(('{}/{}d'.format(name, d), _time(ref, number), _time(fast, number),
+                         _time(batch, max(number // 100, 1)) / n))
+    return rows
+
+
+def collect(quick=False) -> list:
+    """ 基准结果 (见 harness.record). 批量实现记录单个向量的耗时. """
+    from harness import record
+    results = []
+    for name, ref, fast, batch in bench(number=500 if quick else 2000):
+        results.append(record('vec/{}/ref'.format(name), ref))
+        results.append(record('vec/{}/fast'.format(name), fast))
+        results.append(record('vec/{}/batch'.format(name), batch, n=10000))
+    return results
+
+
+def main():
+    print('{:<14}{:>10}{:>10}{:>10}{:>10}{:>10}'.format('func', 'ref(us)', 'fast(us)', 'x', 'batch(us)', 'x'))
+    for name, ref, fast, batch in bench():
+        print('{:<14}{:>10.3f}{:>10.3f}{:>10.1f}{:>10.4f}{:>10.1f}'.format(name, ref, fast, ref / fast, batch, ref / batch))
+
+
+if __name__ == '__main__':
+    main()
+    print('--- over ---')
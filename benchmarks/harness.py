@@ -0,0 +1,123 @@
+"""
+基准测试工具.
+
+计时、结果记录、保存 (JSON) 以及与基线比较.
+所有结果统一为每次操作的耗时 (微秒)，越小越好.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def measure(func: Callable[[], object], min_time: float = 0.2, repeat: int = 3, max_number: int = 1 << 20) -> float:
+    """ 单次调用耗时 (微秒).
+
+    先确定调用次数使一轮计时不少于 min_time，再取 repeat 轮中最快的一轮.
+
+    :param func: 被测函数.
+    :param min_time: 每轮最短时间 (秒).
+    :param repeat: 轮数.
+    :param max_number: 每轮最多调用次数.
+    """
+    number = 1
+    while True:
+        t = _run(func, number)
+        if t >= min_time or number >= max_number:
+            break
+        number = min(max(number * 2, int(number * min_time / max(t, 1e-9) * 1.2)), max_number)
+    best = t
+    for _ in range(repeat - 1):
+        best = min(best, _run(func, number))
+    return best / number * 1e6
+
+
+def _run(func, number) -> float:
+    t0 = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - t0
+
+
+def record(name: str, us: float, **params) -> dict:
+    """ 一条基准结果.
+
+    :param name: 名称 (唯一, 用于与基线对应), 例如 'step/uav/n=1000'.
+    :param us: 每次操作耗时 (微秒).
+    :param params: 规模等参数.
+    """
+    return {'name': name, 'us': us, 'params': params}
+
+
+def environment() -> dict:
+    """ 运行环境信息. """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def save(results: List[dict], path: str):
+    """ 保存结果 (JSON). """
+    with open(path, 'w') as f:
+        json.dump({'env': environment(), 'results': results}, f, indent=1)
+
+
+def load(path: str) -> List[dict]:
+    """ 读取 save 保存的结果. """
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(results: List[dict], baseline: List[dict], threshold: float = 0.2) \
+        -> List[Tuple[str, Optional[float], float, Optional[float], str]]:
+    """ 与基线比较.
+
+    :param threshold: 允许的变慢比例. 耗时超过基线 (1 + threshold) 倍为退化，低于 1 / (1 + threshold) 倍为改进.
+    :return: [(名称, 基线耗时, 当前耗时, 当前/基线, 状态)]. 状态为 'regression', 'improved', 'ok' 或 'new'.
+    """
+    base: Dict[str, float] = {r['name']: r['us'] for r in baseline}
+    rows = []
+    for r in results:
+        b = base.get(r['name'])
+        if b is None or b <= 0:
+            rows.append((r['name'], None, r['us'], None, 'new'))
+            continue
+        ratio = r['us'] / b
+        status = 'regression' if ratio > 1 + threshold else 'improved' if ratio < 1 / (1 + threshold) else 'ok'
+        rows.append((r['name'], b, r['us'], ratio, status))
+    return rows
+
+
+def format_results(results: List[dict]) -> str:
+    """ 结果表格. """
+    lines = ['{:<44}{:>14}{:>14}'.format('name', 'us/op', 'op/s')]
+    for r in results:
+        lines.append('{:<44}{:>14.3f}{:>14.1f}'.format(r['name'], r['us'], 1e6 / r['us'] if r['us'] > 0 else 0.0))
+    return '\n'.join(lines)
+
+
+def format_comparison(rows) -> str:
+    """ 比较结果表格. """
+    lines = ['{:<44}{:>14}{:>14}{:>8}  {}'.format('name', 'base(us)', 'now(us)', 'x', 'status')]
+    for name, b, now, ratio, status in rows:
+        lines.append('{:<44}{:>14}{:>14.3f}{:>8}  {}'.format(
+            name, '-' if b is None else '{:.3f}'.format(b), now, '-' if ratio is None else '{:.2f}'.format(ratio),
+            status))
+    return '\n'.join(lines)
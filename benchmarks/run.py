@@ -0,0 +1,73 @@
+"""
+基准测试入口.
+
+在 benchmarks 目录下运行:
+    python run.py --out results.json                        # 运行全部基准并保存结果
+    python run.py --quick --only scene rl                   # 快速运行部分基准
+    python run.py --out new.json --baseline results.json    # 与基线比较, 有退化时返回 1
+    python run.py --compare new.json --baseline results.json
+
+结果文件为 JSON: {'env': 运行环境, 'results': [{'name', 'us', 'params'}]}.
+"""
+
+import argparse
+import importlib
+import sys
+
+from harness import save, load, compare, format_results, format_comparison
+
+
+SUITES = {
+    'scene': 'bench_scene',
+    'vec': 'bench_vec',
+    'rl': 'bench_rl',
+}
+
+
+def run(only=None, quick=False, progress=None) -> list:
+    """ 运行基准.
+
+    :param only: 运行的基准组. None 表示全部.
+    :param quick: 快速模式 (规模和计时时间较小).
+    :param progress: 进度回调 progress(组名).
+    """
+    results = []
+    for name in only or SUITES:
+        if progress:
+            progress(name)
+        results.extend(importlib.import_module(SUITES[name]).collect(quick=quick))
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='sim benchmarks')
+    parser.add_argument('--only', nargs='+', choices=list(SUITES), help='benchmark groups to run')
+    parser.add_argument('--quick', action='store_true', help='smaller sizes and shorter timing')
+    parser.add_argument('--out', help='save results to this JSON file')
+    parser.add_argument('--compare', help='compare this result file instead of running')
+    parser.add_argument('--baseline', help='baseline result file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown ratio (default 0.2)')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        results = load(args.compare)
+    else:
+        results = run(args.only, args.quick, progress=lambda name: print('running {} ...'.format(name),
+                                                                           file=sys.stderr))
+        if args.out:
+            save(results, args.out)
+    print(format_results(results))
+
+    if args.baseline:
+        rows = compare(results, load(args.baseline), args.threshold)
+        print()
+        print(format_comparison(rows))
+        regressions = [r[0] for r in rows if r[4] == 'regression']
+        if regressions:
+            print('\n{} regression(s): {}'.format(len(regressions), ', '.join(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
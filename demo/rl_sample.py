@@ -13,24 +13,21 @@ sys.path.append('../')
 
 from sim import vec
 from sim.common import Uav, Jammer, Radar
-from sim.rl import Environment, RlReferee
+from sim.rl import Environment, VecEnvironment, RlReferee, RlAgent
+from sim.observation import ObservationSpec, Distance, Norm
+from sim.montecarlo import MonteCarlo
 
 ##############################################################################
 # 决策代理
 ##############################################################################
 
-class CmdAgent:
-    """ 简单指控代理. """
+class CmdAgent(RlAgent):
+    """ 简单指控代理. 输入为目标与干扰器的距离. """
 
     def __init__(self):
         self.range_0 = 21.0
         self.range_1 = 30.0
-
-    def encode_state(self, scene):
-        """ 把场景翻译为输入."""
-        jammer, uav = scene.find('jammer'), scene.find('target')
-        s = vec.dist(uav.position, jammer.position)
-        return s
+        self.observation = ObservationSpec([Distance('target', 'jammer')])
 
     def decode_action(self, act_val):
         """ 把输出翻译为动作. """
@@ -47,9 +44,9 @@ class CmdAgent:
         :return: 1表示power_on；-1表示power_off；0表示维持原状.
         """
         output = 0
-        if s < self.range_0:
+        if s[0] < self.range_0:
             output = 1
-        if s > self.range_1:
+        if s[0] > self.range_1:
             output = -1
         return output
 
@@ -57,7 +54,7 @@ class CmdAgent:
 ##############################################################################
 
 
-class DqnAgent:
+class DqnAgent(RlAgent):
     """ 深度Q网络代理. """
 
     def __init__(self):
@@ -68,13 +65,7 @@ class DqnAgent:
             outputs = softmax([on, off, keep])
         """
         self.network = None
-
-    def encode_state(self, scene):
-        """ 把场景翻译为输入."""
-        jammer, uav = scene.find('jammer'), scene.find('target')
-        d = vec.dist(uav.position, jammer.position)
-        s = vec.dist(uav.velocity)
-        return vec.vec([d, s])
+        self.observation = ObservationSpec([Distance('target', 'jammer'), Norm('target', 'velocity')])
 
     def decode_action(self, acts):
         """ 把输出翻译为动作. """
@@ -166,6 +157,42 @@ def play(rounds=15):
     print('avg reward = {}'.format(sum(total_rewards) / len(total_rewards)))
 
 
+def play_vec(n_envs=8, n_steps=2000):
+    """ 多个环境同步运行. """
+    agent = CmdAgent()
+    venv = VecEnvironment([lambda: Environment(referee=SimpleReferee(), agent=agent, setup=setup_scene)
+                           for _ in range(n_envs)])
+    s = venv.reset()
+    total_rewards = []
+    for _ in range(n_steps):
+        a = [agent.decide(si) for si in s]
+        s, r, done, infos = venv.step(a)
+        for info in infos:
+            if 'episode' in info:
+                total_rewards.append(info['episode']['r'])
+    print('episodes = {}, avg reward = {}'.format(len(total_rewards), sum(total_rewards) / max(len(total_rewards), 1)))
+
+
+def make_env():
+    return Environment(referee=SimpleReferee(), agent=CmdAgent(), setup=setup_scene)
+
+
+def play_episode(env):
+    """ 用 CmdAgent 玩一个 episode. """
+    s = env.reset()
+    done = False
+    while not done:
+        s, r, done, info = env.step(env.agent.decide(s))
+
+
+def play_mc(rounds=10000, out=None):
+    """ 蒙特卡洛统计平均奖励. """
+    mc = MonteCarlo(make_env, lambda env: {'reward': env.total_reward, 'steps': env.steps},
+                    run_fn=play_episode, out=out)
+    summary = mc.run(rounds, progress=lambda s: print('runs = {}'.format(s.count)))
+    print(summary.info())
+
+
 if __name__ == '__main__':
     play()
     print('--- over ---')
@@ -9,6 +9,7 @@ sys.path.append('../')
 from sim import Scenario
 from sim.common import Uav, Jammer, Radar
 from sim.event import TimeEvent
+from sim.record import TrajectoryRecorder
 
 
 def print_scene(scene):
@@ -40,6 +41,22 @@ def main():
     scene.run()
 
 
+def record(path='scenario_demo.traj'):
+    """ 记录轨迹 (不打印). """
+    scene = Scenario(end=20)
+    recorder = TrajectoryRecorder(path)
+    scene.step_handlers.append(recorder)
+
+    jammer = scene.add(Jammer(name='jammer-1', pos=[0, 0]))
+    jammer.step_handlers.append(TimeEvent(times=[5, 11], evt=switch_jammer))
+    scene.add(Radar(name='radar-1', pos=[5, 0]))
+    scene.add(Uav(name='uav-1', tracks=[[0, 0], [10, 10]], two_way=True))
+
+    scene.reset()
+    scene.run()
+    recorder.close()
+
+
 if __name__ == '__main__':
     main()
     print('--- over ---')
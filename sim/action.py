@@ -0,0 +1,126 @@
+"""
+动作格式 (预编译的场景指令).
+
+注册一次指令键 ('实体名.属性')，解析为目标实体和设置方式；
+之后每步以扁平向量给出动作，直接按位置赋值，不再解析字符串和查找实体.
+"""
+
+import copy
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+class ActionSchema:
+    """ 动作格式.
+
+    每个键占向量中连续的若干位: 标量属性 (bool/int/float) 占 1 位，数组属性占其长度.
+    当前值为 None 的属性需要显式给出宽度，宽度为 1 时按 float 处理.
+
+    Usages:
+        schema = scene.register_actions(['jammer.power_on', ('uav.sensor_position', 2)])
+        scene.accept_actions(np.array([1.0, 10.0, 20.0]))
+
+    Attributes:
+        keys: 指令键.
+        size: 向量长度.
+    """
+
+    def __init__(self, keys: Sequence[Union[str, Tuple[str, int]]]):
+        """ 初始化.
+
+        :param keys: 指令键列表. 元素为 '实体名.属性' 或 ('实体名.属性', 宽度).
+        """
+        self._specs: List[Tuple[str, str, str, Optional[int]]] = []
+        for item in keys:
+            key, width = (item, None) if isinstance(item, str) else item
+            name, sep, attr = key.partition('.')
+            if not (name and sep and attr) or '.' in attr:
+                raise KeyError('invalid action key: {!r}'.format(key))
+            self._specs.append((key, name, attr, width))
+        self.keys = [k for k, _, _, _ in self._specs]
+        if len(set(self.keys)) != len(self.keys):
+            raise ValueError('duplicate action keys')
+        self.size = 0
+        self._slots: Dict[str, slice] = {}
+        self._scalars: List[Tuple[Any, str, int, type]] = []
+        self._vectors: List[Tuple[Any, str, int, int]] = []
+        self._scene = None
+        self._layout = None
+
+    def bind(self, scene) -> 'ActionSchema':
+        """ 解析指令键对应的实体和属性.
+
+        :param scene: 场景.
+        :return: self.
+        :raise KeyError: 实体或属性不存在.
+        :raise ValueError: 无法确定属性宽度，或宽度与之前解析的不一致.
+        """
+        scalars, vectors, slots, pos = [], [], {}, 0
+        for key, name, attr, width in self._specs:
+            obj = scene.find(name)
+            if obj is None:
+                raise KeyError('unknown entity in action key: {!r}'.format(key))
+            if not hasattr(obj, attr):
+                raise KeyError('unknown attribute in action key: {!r}'.format(key))
+            value = getattr(obj, attr)
+            if isinstance(value, np.ndarray):
+                n = value.size
+                vectors.append((obj, attr, pos, pos + n))
+            elif value is None and width is not None and width > 1:
+                n = width
+                vectors.append((obj, attr, pos, pos + n))
+            elif isinstance(value, (bool, np.bool_)):
+                n = 1
+                scalars.append((obj, attr, pos, bool))
+            elif isinstance(value, (int, np.integer)):
+                n = 1
+                scalars.append((obj, attr, pos, int))
+            elif isinstance(value, (float, np.floating)) or (value is None and width == 1):
+                n = 1
+                scalars.append((obj, attr, pos, float))
+            else:
+                raise ValueError('cannot infer width of action key: {!r}'.format(key))
+            if width is not None and width != n:
+                raise ValueError('width mismatch for action key: {!r}'.format(key))
+            slots[key] = slice(pos, pos + n)
+            pos += n
+        if self._scene is not None and pos != self.size:
+            raise ValueError('action size changed from {} to {}'.format(self.size, pos))
+        self._scalars, self._vectors, self._slots, self.size = scalars, vectors, slots, pos
+        self._scene, self._layout = scene, scene.layout
+        return self
+
+    def apply(self, values):
+        """ 执行动作.
+
+        场景中的实体增删后自动重新解析.
+
+        :param values: 动作向量 (size,).
+        """
+        if self._scene.layout != self._layout:
+            self.bind(self._scene)
+        values = np.asarray(values)
+        if values.shape != (self.size,):
+            raise ValueError('action vector shape {} != ({},)'.format(values.shape, self.size))
+        flat = values.tolist()
+        for obj, attr, i, conv in self._scalars:
+            setattr(obj, attr, conv(flat[i]))
+        for obj, attr, lo, hi in self._vectors:
+            setattr(obj, attr, np.array(values[lo:hi], dtype=np.float64))
+
+    def fork(self, scene) -> 'ActionSchema':
+        """ 复制动作格式到分支场景. 首次执行动作时在分支场景中重新解析. """
+        other = copy.copy(self)
+        other._scene, other._layout = scene, None
+        return other
+
+    def pack(self, actions: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """ 把指令集 {键: 值} 转换为动作向量. 未给出的键保持 out 中的值 (默认为 0).
+
+        :raise KeyError: 键未注册.
+        """
+        out = np.zeros(self.size, dtype=np.float64) if out is None else out
+        for key, value in actions.items():
+            out[self._slots[key]] = value
+        return out
@@ -8,7 +8,20 @@
 from __future__ import annotations
 
 import copy
-from typing import Optional, Tuple, List, Callable, Any
+import itertools
+import math
+from typing import Optional, Tuple, List, Dict, Callable, Any
+
+import numpy as np
+
+from . import checkpoint as _ckpt
+from .action import ActionSchema
+from .checkpoint import Checkpoint
+from .event import Scheduler
+from .kinematics import KinematicsStore
+from .message import MessageBus
+from .profiling import StepProfiler
+from .spatial import AccessIndex
 
 
 class Entity:
@@ -19,8 +32,20 @@ class Entity:
         id: 实体 ID.
         step_handlers: 步进处理列表. List[ step_handle(entity) ]
         msg_handlers: 消息处理列表. List[ msg_handle(sender, msg) -> bool]
+        shadow_fields: 影子实体中发布的状态字段, 即其他实体 access 时可读取的字段.
+            None 表示发布全部状态 (深拷贝, 开销较大).
+        access_range: 交互范围. access 只需要看到该距离内的实体, None 表示不限.
+        effect_range: 影响范围. 该距离内的实体 access 时需要看到本实体, None 表示不限.
+        access_types: 交互关注的实体类型. access 只会收到这些类型 (含子类) 的实体, None 表示不限.
+        update_period: 更新周期 (场景节拍的整数倍). 场景只在到期的节拍调用 step/access, None 表示每个节拍.
     """
 
+    shadow_fields: Optional[Tuple[str, ...]] = None
+    access_range: Optional[float] = None
+    effect_range: Optional[float] = 0.0
+    access_types: Optional[Tuple[type, ...]] = None
+    update_period: Optional[float] = None
+
     def __init__(self, **kwargs):
         self.step_handlers: List[Callable[[Entity, Any], bool]] = []
         self.msg_handlers: List[Callable[[Entity], None]] = []
@@ -60,7 +85,17 @@ class Entity:
         """ 退出活动状态.
         退出活动状态后，实体将不再参与仿真.
         """
-        self._active = False
+        if self._active:
+            self._active = False
+            if self._scene is not None:
+                self._scene.on_deactive(self)
+
+    def active(self):
+        """ 恢复活动状态. """
+        if not self._active:
+            self._active = True
+            if self._scene is not None:
+                self._scene.on_active(self)
 
     def info(self) -> str:
         """ 实体信息. """
@@ -74,6 +109,28 @@ class Entity:
         """ 步进. """
         pass
 
+    @classmethod
+    def step_batch(cls, entities, tt):
+        """ 批量步进同类型实体. 子类可重载为向量化实现, 结果应与逐个 step 一致. """
+        for e in entities:
+            e.step(tt)
+
+    @classmethod
+    def access_batch(cls, entities, slots, index):
+        """ 批量交互同类型实体. 子类可重载为向量化实现.
+
+        :param entities: 实体列表.
+        :param slots: 实体在 index 中的序号.
+        :param index: 交互候选索引 (spatial.AccessIndex).
+        """
+        for e, i in zip(entities, slots):
+            e.access(index.others(i))
+
+    @property
+    def profiler(self):
+        """ 所在场景的性能剖析器 (用于实体增加计数). None 表示未启用. """
+        return self._scene.profiler if self._scene is not None else None
+
     def on_step(self):
         """ 步进消息处理. """
         for handle in self.step_handlers:
@@ -83,6 +140,42 @@ class Entity:
         """ 与其他实体交互，改变自己状态. """
         pass
 
+    def next_attention(self, now: float, dt: float) -> Optional[float]:
+        """ 下一次需要步进的时间 (事件推进模式使用).
+
+        :param now: 当前时间.
+        :param dt: 节拍时长.
+        :return: 时间. 不晚于 now 表示下一个节拍就需要步进，None 表示不需要主动步进.
+            默认每个节拍都需要步进.
+        """
+        return now
+
+    def shadow(self, out: Optional[Entity] = None) -> Entity:
+        """ 生成影子实体.
+
+        影子实体与实体同类型，只包含 id、name、活动状态和 shadow_fields 声明的字段，
+        不关联场景、不带处理器.
+
+        :param out: 可复用的影子实体. 给出时就地更新其状态.
+        :return: 影子实体.
+        """
+        if out is None or type(out) is not type(self):
+            out = type(self).__new__(type(self))
+            out.step_handlers, out.msg_handlers = [], []
+            out._scene = None
+        out._id, out._name, out._active = self._id, self._name, self._active
+
+        state = out.__dict__
+        if self.shadow_fields is None:
+            memo = {id(self): out, id(self._scene): None}
+            for k, v in self.__dict__.items():
+                if k not in _SHADOW_SKIP:
+                    state[k] = copy.deepcopy(v, memo)
+        else:
+            for k in self.shadow_fields:
+                setattr(out, k, _copy_field(getattr(out, k, None), getattr(self, k)))
+        return out
+
     def send_msg(self, reciever: Optional[Entity, id, str], msg) -> bool:
         """ 发送消息. 
 
@@ -90,11 +183,41 @@ class Entity:
         :return: 是否发送成功.
         """
         if self._scene:
-            if recv_obj := self.scene.find(reciever):
-                self.scene.post_msg(self, recv_obj, msg)
+            if recv_obj := self._scene._lookup(reciever):
+                self._scene.post_msg(self, recv_obj, msg)
                 return True
         return False
 
+    def publish(self, topic, msg) -> int:
+        """ 发送主题消息. 所有订阅者 (自己除外) 共享同一个消息对象.
+
+        :return: 接收者个数.
+        """
+        return self._scene.bus.publish(self, topic, msg) if self._scene else 0
+
+    def subscribe(self, topic) -> bool:
+        """ 订阅主题. 需要先加入场景.
+
+        :return: 是否订阅成功.
+        """
+        if self._scene:
+            self._scene.bus.subscribe(self.id, topic)
+            return True
+        return False
+
+    def unsubscribe(self, topic=None):
+        """ 取消订阅. topic 为 None 时取消全部订阅. """
+        if self._scene:
+            self._scene.bus.unsubscribe(self.id, topic)
+
+    def on_msgs(self, msgs: List[Tuple[Entity, Any]]):
+        """ 批量接收消息. 默认逐条调用 on_msg.
+
+        :param msgs: 本步收到的消息 [(发送者, 消息)], 按发送顺序.
+        """
+        for sender, msg in msgs:
+            self.on_msg(sender, msg)
+
     def on_msg(self, sender: Entity, msg):
         """ 接收和处理消息. """
         for handler in self.msg_handlers:
@@ -102,31 +225,217 @@ class Entity:
                 break
 
 
+_SHADOW_SKIP = frozenset(['_id', '_name', '_active', '_scene', 'step_handlers', 'msg_handlers'])
+_STATE_SKIP = frozenset(['_scene', 'step_handlers', 'msg_handlers'])  # 检查点不保存的实体字段.
+_STEP_HOOKS = ('step', 'step_batch', 'access', 'access_batch')
+_overrides_cache: Dict[type, Tuple[bool, bool]] = {}
+
+
+def _overrides(cls) -> Tuple[bool, bool]:
+    """ 实体类型是否重载了步进/交互 (step, step_batch, access, access_batch) 和 on_step.
+
+    分支场景只预先复制本步可能修改状态的实体.
+    """
+    if (flags := _overrides_cache.get(cls)) is None:
+        mro = cls.__mro__[:cls.__mro__.index(Entity)]
+        flags = (any(k in c.__dict__ for c in mro for k in _STEP_HOOKS), any('on_step' in c.__dict__ for c in mro))
+        _overrides_cache[cls] = flags
+    return flags
+
+
+def _copy_field(old, new):
+    """ 复制影子字段. 形状一致的数组就地复制, 避免重复分配. """
+    if isinstance(new, np.ndarray):
+        if isinstance(old, np.ndarray) and old.shape == new.shape and old.dtype == new.dtype:
+            old[...] = new
+            return old
+        return new.copy()
+    if isinstance(new, (int, float, bool, str, tuple, type(None))):
+        return new
+    return copy.deepcopy(new)
+
+
+class ShadowBuffer:
+    """ 影子实体双缓冲区.
+
+    每步将活动实体的状态发布到后台缓冲区，然后交换前后台.
+    影子实体对象在两个缓冲区中复用，发布时只复制声明的字段.
+    """
+
+    def __init__(self):
+        self._buffers = [{}, {}]  # 实体 id -> 影子实体.
+        self._front = 0
+        self._view = []
+
+    @property
+    def view(self) -> list:
+        """ 最近一次发布的影子实体列表. """
+        return self._view
+
+    def publish(self, entities) -> list:
+        """ 发布实体状态.
+
+        :param entities: 实体列表.
+        :return: 影子实体列表, 与 entities 顺序一致.
+        """
+        back = self._buffers[1 - self._front]
+        buffer, view = {}, []
+        for e in entities:
+            se = e.shadow(back.get(e.id))
+            buffer[e.id] = se
+            view.append(se)
+        self._buffers[1 - self._front] = buffer
+        self._front = 1 - self._front
+        self._view = view
+        return view
+
+    def clear(self):
+        self._buffers = [{}, {}]
+        self._view = []
+
+
 class Scenario:
     """ 场景.
 
     Attributes:
         step_handlers: 步进处理器列表.: List[ step_handle(Scenario) ]
+        spatial_index: 交互阶段是否按实体交互/影响范围使用空间索引筛选候选实体.
+        cell_size: 空间索引网格边长. None 表示自动选取.
+        kinematics: 运动学状态存储. None 表示不使用.
+        batch_step: 是否按类型批量步进实体 (见 Entity.step_batch). 默认开启.
+            开启时步进和交互阶段按类型分组执行: 类型按其第一个实体的加入顺序，同类型内按加入顺序;
+            不同类型实体之间的执行顺序因此与加入顺序不同 (例如 A1, B1, A2 执行为 A1, A2, B1).
+            依赖跨类型执行顺序 (例如步进时读取另一类型实体本步的状态、发送消息的先后) 时请关闭.
+        auto_compact: 是否在每步结束时自动归档退出活动状态的实体 (见 compact).
+        archive: 已归档实体. {id: (归档时间, 实体)}
+        scheduler: 定时事件调度器. 事件默认关联对象为场景.
+        bus: 消息总线. 本步发送的消息在本步交互之后分发，处理消息时发送的消息在下一步分发.
+        event_driven: 事件推进模式. 每步结束后直接跳到最近一个需要处理的节拍
+            (实体 next_attention、调度器事件、带 next_time 的步进处理器、待分发消息)，
+            跳过的节拍不执行; 没有 next_time 的步进处理器要求每个节拍都执行.
+            False 表示按固定 dt 推进.
+        profiler: 步进性能剖析器 (profiling.StepProfiler). None 表示不剖析.
     """
 
     def __init__(self, **kwargs):
-        self._entities = []
+        self._entities: Dict[int, Entity] = {}  # id -> 实体, 保持加入顺序.
+        self._names: Dict[str, List[Entity]] = {}  # 名称 -> 同名实体列表.
+        self._types: Dict[type, Dict[int, Entity]] = {}  # 类型 -> {id: 实体}.
+        self._entity_list: Optional[list] = None
+        self._active: Dict[int, Entity] = {}  # 活动实体, 保持加入顺序.
+        self._active_list: Optional[list] = None
+        self._inactive: List[Entity] = []  # 待归档的实体.
+        self._last_tick: Dict[int, int] = {}  # 设置了更新周期的实体上次步进的节拍.
+        self.auto_compact = False
+        self.archive: Dict[int, Tuple[float, Entity]] = {}
         self.clock = SimClock(**kwargs)
         self.step_handlers = []
-        self._msg_queue = []  # 消息队列.
+        self.scheduler = Scheduler(self.clock, self)
+        self.spatial_index = True
+        self.cell_size = None
+        self.kinematics: Optional[KinematicsStore] = None
+        self.batch_step = True
+        self.event_driven = False
+        self.bus = MessageBus()
+        self._shadows = ShadowBuffer()
+        self.profiler: Optional[StepProfiler] = None
+        self._shared: Dict[int, Entity] = {}  # 分支场景中仍与上级场景共享的实体. id(obj) -> obj.
+        self._memo: Dict[int, Any] = {}  # 分支场景复制实体的 deepcopy memo, 含已复制的实体 id(原实体) -> 复制.
+        self._fork_base: List[Tuple[Scenario, int]] = []  # 上级场景及分支时的版本.
+        self._version = 0  # 每次步进/重置/执行指令/恢复/实体增删加一, 用于检查分支后上级场景是否变化.
+        self._layout = 0  # 每次实体增删/替换加一, 用于检查缓存的实体引用是否过期.
+        self.actions: Optional[ActionSchema] = None
+        self._observations: Dict[int, tuple] = {}  # 观测编码器的绑定, 见 ObservationSpec. id(spec) -> 绑定.
 
     def set_params(self, **kwargs):
         self.clock.set_params(**kwargs)
 
+    @property
+    def layout(self) -> int:
+        """ 实体布局版本. 实体增删或在分支场景中被复制时改变. """
+        return self._layout
+
     @property
     def entities(self) -> list:
         """ 场景中的实体列表. """
-        return self._entities
+        if self._entity_list is None:
+            self._entity_list = list(self._entities.values())
+        return self._entity_list
 
     @property
     def active_entities(self) -> list:
-        """ 场景中活动实体列表. """
-        return list([e for e in self._entities if e.is_active()])
+        """ 场景中活动实体列表.
+
+        活动集合通过 Entity.deactive/active 的通知增量维护，reset 时按实体状态重建. 返回的列表只读.
+        """
+        if self._active_list is None:
+            self._active_list = list(self._active.values())
+        return self._active_list
+
+    def on_deactive(self, obj: Entity):
+        """ 实体退出活动状态的通知. """
+        if self._active.pop(obj.id, None) is not None:
+            self._active_list = None
+            self._inactive.append(obj)
+
+    def on_active(self, obj: Entity):
+        """ 实体恢复活动状态的通知. """
+        if self._entities.get(obj.id) is obj and obj.id not in self._active:
+            self._sync_active()
+
+    def _sync_active(self):
+        """ 按实体状态重建活动集合, 保持加入顺序. """
+        self._active = {i: e for i, e in self._entities.items() if e.is_active()}
+        self._active_list = None
+        self._inactive = [e for e in self._inactive if not e.is_active()]
+
+    def compact(self) -> int:
+        """ 归档退出活动状态的实体.
+
+        归档的实体从场景中移除 (不再参与查找、遍历和显示)，保留最终状态，
+        可以通过 archive 或 find_archived 获取.
+
+        :return: 本次归档的实体个数.
+        """
+        now = self.clock.now
+        count = 0
+        for obj in self._inactive:
+            if self._entities.get(obj.id) is obj and not obj.is_active():
+                self.remove(obj)
+                self.archive[obj.id] = (now, obj)
+                count += 1
+        self._inactive.clear()
+        return count
+
+    def find_archived(self, ref: Optional[Entity, int, str]) -> Optional[Entity]:
+        """ 查找已归档的实体.
+
+        :param ref: 查找条件. 可以是 obj, id, name
+        :return: 符合条件的实体，找不到返回None
+        """
+        if isinstance(ref, Entity):
+            ref = ref.id
+        if isinstance(ref, int):
+            return self.archive[ref][1] if ref in self.archive else None
+        if isinstance(ref, str) and ref:
+            for _, obj in self.archive.values():
+                if obj.name == ref:
+                    return obj
+        return None
+
+    def enable_kinematics(self, dim: int = 2) -> KinematicsStore:
+        """ 启用运动学状态存储.
+
+        支持的实体 (如 Uav) 的位置、速度将保存在场景级的连续数组中.
+
+        :param dim: 空间维数.
+        :return: 运动学状态存储.
+        """
+        if self.kinematics is None:
+            self.kinematics = KinematicsStore(dim, capacity=max(len(self._entities), 1))
+            for e in self.entities:
+                e.attach(self)
+        return self.kinematics
 
     def find(self, ref: Optional[Entity, int, str]) -> Optional[Entity]:
         """ 查找实体.
@@ -134,35 +443,78 @@ class Scenario:
         :param ref: 查找条件. 可以是 obj, id, name  
         :return: 符合条件的实体，找不到返回None  
         """
-        obj_v = ref if isinstance(ref, Entity) else None
-        id_v = ref if isinstance(ref, int) else None
-        name_v = ref if isinstance(ref, str) else None
-        for e in self._entities:
-            if (obj_v and e is obj_v) or (id_v and e.id == id_v) or (name_v and e.name == name_v):
-                return e
+        obj = self._lookup(ref)
+        return self._own(obj) if obj is not None and self._shared else obj
+
+    def _lookup(self, ref) -> Optional[Entity]:
+        """ 查找实体. 分支场景中不复制共享的实体. """
+        if isinstance(ref, Entity):
+            return ref if self._entities.get(ref.id) is ref else None
+        if isinstance(ref, int):
+            return self._entities.get(ref)
+        if isinstance(ref, str) and ref and (same_names := self._names.get(ref)):
+            return same_names[0]
         return None
 
+    def entities_of(self, cls: type) -> list:
+        """ 指定类型 (含子类) 的实体列表. 按类型分组，同类型内保持加入顺序. """
+        return [e for t, es in self._types.items() if issubclass(t, cls) for e in es.values()]
+
     def add(self, obj: Entity) -> Optional[Entity]:
         """ 增加实体. """
         if not isinstance(obj, Entity):
             return None
-        ids = [e.id for e in self._entities]
-        if obj.id not in ids:
+        if obj.id not in self._entities:
             obj.attach(self)
-            self._entities.append(obj)
+            self._entities[obj.id] = obj
+            self._names.setdefault(obj.name, []).append(obj)
+            self._types.setdefault(type(obj), {})[obj.id] = obj
+            if obj.is_active():
+                self._active[obj.id] = obj
+                self._active_list = None
+            self._entity_list = None
+            self._layout += 1
+            self._version += 1
         return obj
 
     def remove(self, obj):
         """ 移除对象. """
-        if obj and isinstance(obj, Entity):
-            obj.attach(None)
-            self._entities.remove(obj)
+        if obj and isinstance(obj, Entity) and self._entities.get(obj.id) is obj:
+            if self._shared.pop(id(obj), None) is None:
+                obj.attach(None)
+            del self._entities[obj.id]
+            same_names = self._names[obj.name]
+            same_names.remove(obj)
+            if not same_names:
+                del self._names[obj.name]
+            del self._types[type(obj)][obj.id]
+            self._entity_list = None
+            self._layout += 1
+            self._version += 1
+            if self._active.pop(obj.id, None) is not None:
+                self._active_list = None
+            self._last_tick.pop(obj.id, None)
+            self.bus.unsubscribe(obj.id)
 
     def clear(self):
         """ 移除所有对象. """
-        for obj in self._entities:
-            obj.attach(None)
+        for obj in self.entities:
+            if id(obj) not in self._shared:
+                obj.attach(None)
+        self._shared.clear()
+        self._memo = {}
         self._entities.clear()
+        self._names.clear()
+        self._types.clear()
+        self._entity_list = None
+        self._layout += 1
+        self._version += 1
+        self._active.clear()
+        self._active_list = None
+        self._inactive.clear()
+        self.archive.clear()
+        self._last_tick.clear()
+        self.bus.clear()
 
     def step(self):
         """ 步进.
@@ -172,27 +524,371 @@ class Scenario:
         """
         if self.clock.is_over():
             return None
+        self._version += 1
+        prof = self.profiler
+        if prof is not None:
+            t_start = t0 = prof.clock()
 
         tt = self.clock.info()
         active_entities = self.active_entities
+        due, due_tt = self._due_entities(active_entities, tt)
+        if self._shared:
+            # 分支场景: 本步会修改的实体先复制. 未重载步进/交互且没有处理器的实体不复制.
+            for i in due:
+                if _overrides(type(active_entities[i]))[0]:
+                    self._own(active_entities[i])
+            for e in active_entities:
+                if e.step_handlers or _overrides(type(e))[1]:
+                    self._own(e)
+            active_entities = self.active_entities
+        if prof is not None:
+            t0 = prof.lap('schedule', t0)
+            prof.count('entities.stepped', len(due))
+
+        if self.batch_step:
+            groups = {}
+            for i in due:
+                groups.setdefault((type(active_entities[i]), due_tt[i]), []).append(i)
+            for (cls, tt_e), slots in groups.items():
+                cls.step_batch([active_entities[i] for i in slots], tt_e)
+                if prof is not None:
+                    t0 = prof.lap_type('step', cls, t0, len(slots))
+        else:
+            for i in due:
+                active_entities[i].step(due_tt[i])
+                if prof is not None:
+                    t0 = prof.lap_type('step', type(active_entities[i]), t0)
+
+        shadow_entities = self._shadows.publish(active_entities)
+        if prof is not None:
+            t0 = prof.lap('shadow', t0)
+        index = AccessIndex(active_entities, shadow_entities, self.cell_size, self.spatial_index)
+        if prof is not None:
+            t0 = prof.lap('index', t0)
+        if self.batch_step:
+            groups = {}
+            for i in due:
+                groups.setdefault(type(active_entities[i]), []).append(i)
+            for cls, slots in groups.items():
+                cls.access_batch([active_entities[i] for i in slots], slots, index)
+                if prof is not None:
+                    t0 = prof.lap_type('access', cls, t0, len(slots))
+        else:
+            for i in due:
+                active_entities[i].access(index.others(i))
+                if prof is not None:
+                    t0 = prof.lap_type('access', type(active_entities[i]), t0)
+
+        n_msgs = self.bus.dispatch(self.find)
+        if prof is not None:
+            t0 = prof.lap('message', t0)
+            prof.count('access.pairs', index.pairs)
+            prof.count('messages', n_msgs)
+
+        self.scheduler.dispatch()
+        if prof is None:
+            for handler in self.step_handlers:
+                handler(self)
+            for e in active_entities:
+                e.on_step()
+        else:
+            t0 = prof.lap('events', t0)
+            t0 = self._profile_handlers(prof, t0, active_entities)
+
+        if self.auto_compact and self._inactive:
+            self.compact()
+            if prof is not None:
+                t0 = prof.lap('compact', t0)
+
+        ret = self.clock.step(self._next_stride() if self.event_driven else 1)
+        if prof is not None:
+            prof.lap('clock', t0)
+            prof.end_step(t_start, tt[0])
+        return ret
 
-        for e in active_entities:
-            e.step(tt)
-
-        shadow_entities = copy.deepcopy(active_entities)
-        for e in active_entities:
-            others = [se for se in shadow_entities if se.id != e.id]
-            e.access(others)
-
-        self._dispatch_msgs()
-
+    def _profile_handlers(self, prof: StepProfiler, t0: float, active_entities) -> float:
+        """ 执行场景和实体的步进处理器，并逐个记录耗时. """
         for handler in self.step_handlers:
             handler(self)
+            t0 = prof.lap_handler('handlers', handler, t0)
         for e in active_entities:
-            e.on_step()
-
-        ret = self.clock.step()
-        return ret
+            if type(e).on_step is not Entity.on_step:
+                e.on_step()
+                t0 = prof.lap_type('on_step', type(e), t0)
+                continue
+            for handler in e.step_handlers:
+                handler(e)
+                t0 = prof.lap_handler('on_step', handler, t0)
+        return t0
+
+    def _due_entities(self, active_entities, tt) -> Tuple[list, list]:
+        """ 本节拍需要步进的实体.
+
+        设置了 update_period 的实体只在距上次步进达到更新周期的节拍步进，
+        其步进时长为距上次步进经过的时间.
+
+        :return: (需要步进的实体序号, 各实体的时间信息)
+        """
+        clock = self.clock
+        due, due_tt = [], []
+        for i, e in enumerate(active_entities):
+            period = e.update_period
+            if period is None:
+                due.append(i)
+                due_tt.append(tt)
+                continue
+            last = self._last_tick.get(e.id)
+            if last is None:
+                due.append(i)
+                due_tt.append(tt)
+            elif clock.tick - last >= max(round(period / clock.dt), 1):
+                due.append(i)
+                due_tt.append((tt[0], (clock.tick - last) * clock.dt))
+            else:
+                due_tt.append(None)
+                continue
+            self._last_tick[e.id] = clock.tick
+        return due, due_tt
+
+    def next_attention(self) -> Optional[float]:
+        """ 场景中下一次需要步进的时间. None 表示没有. """
+        clock = self.clock
+        now, dt = clock.now, clock.dt
+        if self.bus:
+            return now
+        times = [clock.start + dt * tick] if (tick := self.scheduler.next_tick()) is not None else []
+        handlers = [(None, h) for h in self.step_handlers]
+        for e in self.active_entities:
+            if (t := e.next_attention(now, dt)) is not None:
+                if e.update_period is not None and e.id in self._last_tick:
+                    due_tick = self._last_tick[e.id] + max(round(e.update_period / dt), 1)
+                    t = max(t, now + (due_tick - clock.tick) * dt)
+                if t <= now:
+                    return now
+                times.append(t)
+            handlers.extend((e, h) for h in e.step_handlers)
+        for _, h in handlers:
+            if not hasattr(h, 'next_time'):
+                return now
+            if (t := h.next_time(now, dt)) is not None:
+                times.append(t)
+        return min(times) if times else None
+
+    def _next_stride(self) -> int:
+        """ 事件推进模式下一步前进的节拍数. """
+        clock = self.clock
+        last_tick = math.floor((clock.end - clock.start) / clock.dt + Scheduler.TICK_EPS)
+        if clock.tick >= last_tick:
+            return 1
+        t = self.next_attention()
+        target = last_tick if t is None else min(self.scheduler.to_tick(t), last_tick)
+        return max(target - clock.tick, 1)
+
+    def checkpoint(self) -> Checkpoint:
+        """ 保存场景状态.
+
+        包括时钟、实体状态 (处理器除外)、活动/归档状态、待分发消息、运动学状态存储和定时事件进度.
+        场景和实体的步进/消息处理器、定时事件句柄不保存，恢复时沿用目标场景中的.
+
+        :return: 检查点. 可以用 Checkpoint.save 写入文件.
+        """
+        pool = self._checkpoint_pool()
+        refs = {id(e): ('e', i) for i, e in enumerate(pool)}
+        refs[id(self)] = ('scene',)
+        if self.kinematics is not None:
+            refs[id(self.kinematics)] = ('kinematics',)
+        state = {
+            'types': [type(e).__module__ + '.' + type(e).__qualname__ for e in pool],
+            'entities': [{k: v for k, v in e.__dict__.items() if k not in _STATE_SKIP} for e in pool],
+            'members': list(self._entities),
+            'active': list(self._active),
+            'inactive': [e.id for e in self._inactive],
+            'archive': {k: t for k, (t, _) in self.archive.items()},
+            'last_tick': dict(self._last_tick),
+            'msgs': self.bus.state(),
+            'clock': dict(self.clock.__dict__),
+            'kinematics': None if self.kinematics is None else dict(self.kinematics.__dict__),
+            'events': self.scheduler.progress(),
+        }
+        return _ckpt.dumps(state, refs)
+
+    def restore(self, cp: Checkpoint):
+        """ 恢复场景状态.
+
+        目标场景可以是保存检查点的场景，也可以是以相同方式构建的另一个场景 (例如另一个进程中).
+        场景和归档中的实体按 id 排序后与检查点逐个对应，要求类型一致;
+        多出的实体 (检查点之后加入的) 被移除. 实体 id 一并恢复.
+
+        :param cp: 检查点.
+        """
+        self._own_all()
+        self._version += 1
+        self._layout += 1  # 归档的实体重新加入，实体对象的 __dict__ 被替换.
+        pool = self._checkpoint_pool()
+        kinematics = self.kinematics if self.kinematics is not None else KinematicsStore()
+
+        def resolve(pid):
+            if pid[0] == 'e':
+                if pid[1] >= len(pool):
+                    raise ValueError('checkpoint does not match the scenario')
+                return pool[pid[1]]
+            return self if pid[0] == 'scene' else kinematics
+
+        state = _ckpt.loads(cp, resolve)
+        types = [type(e).__module__ + '.' + type(e).__qualname__ for e in pool]
+        n = len(state['types'])
+        if types[:n] != state['types']:
+            raise ValueError('checkpoint does not match the scenario')
+        for e in pool[n:]:
+            self.remove(e)
+            self.archive.pop(e.id, None)
+        pool = pool[:n]
+
+        for e, es in zip(pool, state['entities']):
+            keep = {k: e.__dict__[k] for k in _STATE_SKIP if k in e.__dict__}
+            e.__dict__.clear()
+            e.__dict__.update(es)
+            e.__dict__.update(keep)
+            e._scene = None
+        if state['kinematics'] is None:
+            self.kinematics = None
+        else:
+            kinematics.__dict__.clear()
+            kinematics.__dict__.update(state['kinematics'])
+            self.kinematics = kinematics
+
+        by_id = {e.id: e for e in pool}
+        self._entities, self._names, self._types = {}, {}, {}
+        for i in state['members']:
+            e = by_id[i]
+            e._scene = self
+            self._entities[i] = e
+            self._names.setdefault(e.name, []).append(e)
+            self._types.setdefault(type(e), {})[i] = e
+        self._active = {i: by_id[i] for i in state['active']}
+        self._inactive = [by_id[i] for i in state['inactive']]
+        self.archive = {i: (t, by_id[i]) for i, t in state['archive'].items()}
+        self._entity_list = self._active_list = None
+        self._last_tick = state['last_tick']
+        self.bus.set_state(state['msgs'])
+        self._shadows.clear()
+        self.clock.__dict__.update(state['clock'])
+        self.scheduler.restore(state['events'])
+        EntityId.reserve(max(by_id, default=0))
+
+    def fork(self) -> Scenario:
+        """ 分支场景, 用于前瞻规划.
+
+        分支场景与当前场景共享实体对象，实体第一次被分支修改 (步进、交互、接收消息、
+        通过 find 获取等) 前才复制，未被修改的实体不复制. 处理器和定时事件句柄共享.
+        分支场景使用期间当前场景不能步进、重置、执行指令、恢复或增删实体，否则分支复制实体时抛出 RuntimeError.
+
+        注意: entities/active_entities 返回的实体可能是共享的，修改前请通过 find 获取.
+        通过闭包直接引用当前场景实体的处理器在分支中仍作用于原实体.
+
+        :return: 分支场景.
+        """
+        child = type(self).__new__(type(self))
+        child.__dict__.update(self.__dict__)
+        child._entities = dict(self._entities)
+        child._names = {k: list(v) for k, v in self._names.items()}
+        child._types = {k: dict(v) for k, v in self._types.items()}
+        child._active = dict(self._active)
+        child._inactive = list(self._inactive)
+        child._last_tick = dict(self._last_tick)
+        child.archive = dict(self.archive)
+        child._shared = {id(e): e for e in self._entities.values()}
+        child._fork_base = self._fork_base + [(self, self._version)]
+        child._version = 0
+        child.clock = copy.copy(self.clock)
+        child.step_handlers = list(self.step_handlers)
+        child.scheduler = self.scheduler.fork(child.clock, child)
+        child._shadows = ShadowBuffer()
+        child.profiler = None
+        child._observations = {}
+        if self.kinematics is not None:
+            child.kinematics = copy.copy(self.kinematics)
+            child.kinematics.owners = list(self.kinematics.owners)
+            child.kinematics._position = self.kinematics._position.copy()
+            child.kinematics._velocity = self.kinematics._velocity.copy()
+        child.bus = self.bus.fork()
+        child._memo = child._fork_memo()
+        if self.actions is not None:
+            child.actions = self.actions.fork(child)
+        for e in child.scheduler.objects():
+            if isinstance(e, Entity):
+                child.scheduler.rebind(e, child._own(e))
+        return child
+
+    def _own(self, obj: Entity) -> Entity:
+        """ 分支场景中复制仍与上级场景共享的实体 (写时复制).
+
+        :return: 场景自己的实体.
+        """
+        if id(obj) not in self._shared:
+            return obj
+        for scene, version in self._fork_base:
+            if scene._version != version:
+                raise RuntimeError('parent scenario has changed since fork')
+        return self._copy_shared(obj)
+
+    def _own_all(self):
+        """ 复制所有共享的实体. """
+        for e in list(self._shared.values()):
+            self._own(e)
+
+    def _fork_memo(self) -> dict:
+        """ 分支场景的 deepcopy memo: 上级场景和运动学状态存储映射为分支场景的. """
+        memo = {}
+        for base, _ in self._fork_base:
+            memo[id(base)] = self
+            if base.kinematics is not None and self.kinematics is not None:
+                memo[id(base.kinematics)] = self.kinematics
+        return memo
+
+    def _copy_shared(self, old: Entity) -> Entity:
+        """ 复制共享的实体.
+
+        所有实体共用一个 memo，已复制的实体和实体间共享的对象保持引用关系.
+        状态中引用到的其他共享实体随之被复制，一并加入场景.
+        """
+        memo = self._memo
+        new = type(old).__new__(type(old))
+        memo[id(old)] = new
+        start = len(memo)
+        state = {k: v for k, v in old.__dict__.items() if k not in _STATE_SKIP}
+        new.__dict__.update(copy.deepcopy(state, memo))
+        self._adopt(old, new)
+        for key in list(itertools.islice(reversed(memo), len(memo) - start)):
+            if (other := self._shared.get(key)) is not None:
+                self._adopt(other, memo[key])
+        return new
+
+    def _adopt(self, old: Entity, new: Entity):
+        """ 用复制的实体替换共享的实体. """
+        del self._shared[id(old)]
+        new.step_handlers = list(old.step_handlers)
+        new.msg_handlers = list(old.msg_handlers)
+        new._scene = self
+
+        i = old.id
+        self._entities[i] = new
+        same_names = self._names[old.name]
+        same_names[same_names.index(old)] = new
+        self._types[type(old)][i] = new
+        if i in self._active:
+            self._active[i] = new
+            self._active_list = None
+        if old in self._inactive:
+            self._inactive = [new if e is old else e for e in self._inactive]
+        self._entity_list = None
+        self._layout += 1
+        if self.kinematics is not None and getattr(new, '_kin', None) is self.kinematics:
+            self.kinematics.owners[new.kin_slot] = new
+
+    def _checkpoint_pool(self) -> list:
+        """ 检查点涉及的实体 (场景和归档中的), 按 id 排序. """
+        return sorted(list(self._entities.values()) + [e for _, e in self.archive.values()], key=lambda e: e.id)
 
     def run(self):
         """ 连续运行. """
@@ -201,9 +897,15 @@ class Scenario:
 
     def reset(self):
         """ 重置场景. """
+        self._own_all()
+        self._version += 1
         self.clock.reset()
-        for e in self._entities:
+        self.scheduler.reset()
+        self._last_tick.clear()
+        self._shadows.clear()
+        for e in self.entities:
             e.reset()
+        self._sync_active()
         return self.clock_info
 
     @property
@@ -211,22 +913,31 @@ class Scenario:
         return self.clock.info()
 
     def post_msg(self, sender, reciever, msg):
-        """ 消息入列. """
-        self._msg_queue.append((sender, reciever, msg))
+        """ 消息入列. 收消息的实体为 None 时丢弃消息. """
+        if reciever is not None:
+            self.bus.post(sender, reciever.id, msg)
 
-    def _dispatch_msgs(self):
-        """ 分发消息. """
-        msg_queue = copy.copy(self._msg_queue)
-        self._msg_queue.clear()
-        for sender, reciever, msg in msg_queue:
-            if reciever and reciever.is_active():
-                reciever.on_msg(sender, msg)
+    def register_actions(self, keys) -> ActionSchema:
+        """ 注册动作格式. 之后 accept_actions 可以接收动作向量.
+
+        :param keys: 指令键列表, 见 ActionSchema.
+        :return: 动作格式.
+        :raise KeyError: 实体或属性不存在.
+        """
+        self.actions = ActionSchema(keys).bind(self)
+        return self.actions
 
     def accept_actions(self, actions):
         """ 接收和执行指令.
 
-        :param actions: 指令集. { object.property = value }
+        :param actions: 指令集. { object.property = value }，或按 register_actions 注册的格式给出的动作向量.
         """
+        self._version += 1
+        if isinstance(actions, np.ndarray):
+            if self.actions is None:
+                raise ValueError('no action schema registered')
+            self.actions.apply(actions)
+            return
         for k, v in actions.items():
             str_s = k.split('.')
             if len(str_s) == 2:
@@ -251,6 +962,8 @@ class SimClock:
         self.dt = 0.1
         self.set_params(**kwargs)
         self.now = self.start
+        self.tick = 0
+        self.stride = 1  # 上一步前进的节拍数.
 
     def set_params(self, **kwargs):
         self.start = kwargs['start'] if 'start' in kwargs else self.start
@@ -259,13 +972,18 @@ class SimClock:
 
     def reset(self):
         self.now = self.start
+        self.tick = 0
+        self.stride = 1
 
-    def step(self) -> Optional[Tuple[float, float]]:
+    def step(self, ticks: int = 1) -> Optional[Tuple[float, float]]:
         """ 步进.
 
+        :param ticks: 前进的节拍数. 大于 1 时一次跳过多个节拍.
         :return: (now, dt)
         """
-        self.now += self.dt
+        self.now += self.dt * ticks
+        self.tick += ticks
+        self.stride = ticks
         return self.info() if not self.is_over() else None
 
     def info(self) -> Tuple[float, float]:
@@ -275,7 +993,7 @@ class SimClock:
                 now: 当前时间.
                 dt: 上一步到当前时间经过的时长. 起始时是0，后续是dt。
         """
-        return self.now, (0.0 if self.now == self.start else self.dt)
+        return self.now, (0.0 if self.now == self.start else self.dt * self.stride)
 
     def is_over(self) -> bool:
         """ 是否结束. """
@@ -290,3 +1008,8 @@ class EntityId:
     def gen():
         EntityId.__id += 1
         return EntityId.__id
+
+    @staticmethod
+    def reserve(last: int):
+        """ 保证之后生成的 ID 大于 last. """
+        EntityId.__id = max(EntityId.__id, last)
@@ -0,0 +1,103 @@
+"""
+场景检查点.
+
+场景状态用 pickle 协议 5 序列化，NumPy 数组的数据作为带外缓冲区 (out-of-band buffers) 单独保存，
+不经过 pickle 流复制. 实体、场景等对象之间的引用以持久化 ID 表示，恢复时指向目标场景中的对象.
+"""
+
+import io
+import pickle
+import struct
+from typing import Any, Callable, Dict, List
+
+
+class Checkpoint:
+    """ 检查点.
+
+    Attributes:
+        data: pickle 数据.
+        buffers: 带外缓冲区列表.
+    """
+
+    _MAGIC = b'SIMCKPT1'
+
+    def __init__(self, data: bytes, buffers: List):
+        self.data = data
+        self.buffers = buffers
+
+    @property
+    def nbytes(self) -> int:
+        """ 占用的字节数. """
+        return len(self.data) + sum(len(b) for b in self.buffers)
+
+    def save(self, path: str):
+        """ 保存到文件. """
+        head = pickle.dumps([len(self.data)] + [len(b) for b in self.buffers])
+        with open(path, 'wb') as f:
+            f.write(self._MAGIC)
+            f.write(struct.pack('<Q', len(head)))
+            f.write(head)
+            f.write(self.data)
+            for b in self.buffers:
+                f.write(b)
+
+    @classmethod
+    def load(cls, path: str) -> 'Checkpoint':
+        """ 从文件读取. """
+        with open(path, 'rb') as f:
+            raw = memoryview(f.read())
+        if raw[:len(cls._MAGIC)] != cls._MAGIC:
+            raise ValueError('not a checkpoint file: {}'.format(path))
+        pos = len(cls._MAGIC) + 8
+        (n,) = struct.unpack('<Q', raw[len(cls._MAGIC):pos])
+        sizes = pickle.loads(raw[pos:pos + n])
+        pos += n
+        parts = []
+        for size in sizes:
+            parts.append(raw[pos:pos + size])
+            pos += size
+        return cls(bytes(parts[0]), parts[1:])
+
+
+class _Pickler(pickle.Pickler):
+
+    def __init__(self, file, refs, **kwargs):
+        super().__init__(file, **kwargs)
+        self._refs = refs
+
+    def persistent_id(self, obj):
+        return self._refs.get(id(obj))
+
+
+class _Unpickler(pickle.Unpickler):
+
+    def __init__(self, file, resolve, **kwargs):
+        super().__init__(file, **kwargs)
+        self._resolve = resolve
+
+    def persistent_load(self, pid):
+        return self._resolve(pid)
+
+
+def dumps(state: Any, refs: Dict[int, Any]) -> Checkpoint:
+    """ 序列化状态.
+
+    :param state: 状态.
+    :param refs: 以引用方式保存的对象. {id(obj): 持久化 ID}
+    :return: 检查点. 数组数据已复制，与原对象不共享内存.
+    """
+    buffers = []
+    f = io.BytesIO()
+    _Pickler(f, refs, protocol=5, buffer_callback=buffers.append).dump(state)
+    return Checkpoint(f.getvalue(), [bytearray(b.raw()) for b in buffers])
+
+
+def loads(cp: Checkpoint, resolve: Callable[[Any], Any]) -> Any:
+    """ 反序列化状态.
+
+    :param cp: 检查点.
+    :param resolve: 持久化 ID -> 对象.
+    :return: 状态. 数组数据为新复制的内存，可以多次恢复同一个检查点.
+    """
+    buffers = [bytearray(b) for b in cp.buffers]
+    return _Unpickler(io.BytesIO(cp.data), resolve, buffers=buffers).load()
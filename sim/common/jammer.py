@@ -19,11 +19,15 @@ class Jammer(basic.Entity):
     Attributes:
         position: 位置.
         power_on: 是否开干扰.
+        effect_range: 干扰作用距离. None 表示不限.
     """
 
+    shadow_fields = ('position', 'power_on', 'effect_range')
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.power_on = False
+        self.effect_range = None
         self.position = kwargs['pos'] if 'pos' in kwargs else vec.vec([0, 0])
         self.set_params(**kwargs)
 
@@ -31,9 +35,20 @@ class Jammer(basic.Entity):
         """ 设置参数.
 
         :param pos: 位置.
+        :param effect_range: 干扰作用距离.
         """
         if 'pos' in kwargs:
             self.position = vec.vec(kwargs['pos'])
+        if 'effect_range' in kwargs:
+            self.effect_range = None if kwargs['effect_range'] is None else float(kwargs['effect_range'])
+
+    def next_attention(self, now, dt):
+        """ 干扰器本身不需要主动步进. """
+        return None
+
+    def covers(self, pos) -> bool:
+        """ 判断位置是否在干扰作用范围内. """
+        return self.effect_range is None or vec.dist(pos, self.position) <= self.effect_range
 
     def info(self) -> str:
         if self.power_on:
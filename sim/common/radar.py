@@ -4,6 +4,8 @@
 
 import math
 
+import numpy as np
+
 from .. import basic
 from .. import vec
 
@@ -17,7 +19,8 @@ class _DetectResult:
         self.state = 0
 
     def accept(self, radar, t, ret):
-        if (t - self.time) >= radar.track_dt:
+        # 容许时钟累加误差, 避免按数据率更新时错过整个周期.
+        if (t - self.time) >= radar.track_dt - 1e-6:
             self.time = t
             self.result = ret
 
@@ -31,8 +34,12 @@ class Radar(basic.Entity):
         track_dt: 跟踪时间间隔(数据率).
         search_dt: 搜索时间间隔(数据率).
         track_off: 消批时间.
+        max_range: 最大探测距离. None 表示不限.
+        coverage: 探测范围 (AerRange). None 表示不限.
     """
 
+    shadow_fields = ('position',)
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.position = vec.vec([0, 0])
@@ -40,6 +47,8 @@ class Radar(basic.Entity):
         self.search_dt = 3.0
         self.search_count = 3
         self.track_off = 6.0
+        self.max_range = None
+        self.coverage = None
         self._results = {}
         self._now = 0
         self.set_params(**kwargs)
@@ -50,6 +59,9 @@ class Radar(basic.Entity):
         :param pos: 雷达站位置.
         :param search_dt: 搜索时间间隔.
         :param track_dt: 跟踪时间间隔.
+        :param max_range: 最大探测距离.
+        :param coverage: 探测范围 (AerRange).
+        :param update_period: 更新周期 (通常取 track_dt). None 表示每个场景节拍都更新.
         """
         if 'pos' in kwargs:
             self.position = vec.vec(kwargs['pos'])
@@ -57,6 +69,12 @@ class Radar(basic.Entity):
             self.search_dt = float(kwargs['search_dt'])
         if 'track_dt' in kwargs:
             self.track_dt = float(kwargs['track_dt'])
+        if 'max_range' in kwargs:
+            self.max_range = None if kwargs['max_range'] is None else float(kwargs['max_range'])
+        if 'coverage' in kwargs:
+            self.coverage = kwargs['coverage']
+        if 'update_period' in kwargs:
+            self.update_period = None if kwargs['update_period'] is None else float(kwargs['update_period'])
 
     def reset(self):
         self._results.clear()
@@ -66,29 +84,127 @@ class Radar(basic.Entity):
     def results(self):
         return self._results
 
+    @property
+    def access_range(self):
+        return self.max_range
+
     def access(self, others):
+        detections = 0
         for other in others:
             # 更新结果.
             if ret := self.detect(other):
-                if other.id not in self._results:
-                    self._results[other.id] = _DetectResult(self._now, ret)
+                self._accept(other.id, ret)
+                detections += 1
+        self._expire(others)
+        if detections and (prof := self.profiler) is not None:
+            prof.count('radar.detections', detections)
+
+    @classmethod
+    def access_batch(cls, radars, slots, index):
+        """ 多雷达批量探测.
+
+        一次计算所有雷达到所有目标 (有 rcs 和 position 的影子实体) 的距离矩阵，
+        按距离筛选后再逐个计算方位、检查探测范围并更新航迹表.
+        结果与不使用空间索引时逐个调用 access 一致.
+        """
+        batch = [r for r in radars if type(r).access is Radar.access and type(r).detect is Radar.detect
+                 and isinstance(r.position, np.ndarray)]
+        if len(batch) < len(radars):
+            rest = [(r, i) for r, i in zip(radars, slots) if r not in batch]
+            super().access_batch([r for r, _ in rest], [i for _, i in rest], index)
+        if not batch:
+            return
+
+        dim = len(batch[0].position)
+        targets, leftovers = [], []
+        for se in index.shadows:
+            if hasattr(se, 'rcs') and hasattr(se, 'position'):
+                pos = se.position
+                if isinstance(pos, np.ndarray) and pos.shape == (dim,):
+                    targets.append(se)
                 else:
-                    self._results[other.id].accept(self, self._now, ret)
+                    leftovers.append(se)
+        radar_pos = np.array([r.position for r in batch])
+        target_pos = np.array([se.position for se in targets]).reshape(len(targets), dim)
+        ids = [se.id for se in targets]
+        id_set = set(ids)
+
+        v = target_pos[None, :, :] - radar_pos[:, None, :]
+        d = vec.dist_n(v)
+        max_r = np.array([np.inf if r.max_range is None else r.max_range for r in batch])
+        ms, ks = np.nonzero(d <= max_r[:, None])
+        index.pairs += d.size
+        hits = [[] for _ in batch]
+        for m, k, vi, di in zip(ms.tolist(), ks.tolist(), v[ms, ks].tolist(), d[ms, ks].tolist()):
+            hits[m].append((k, vi, di))
+
+        detections = 0
+        for radar, radar_hits in zip(batch, hits):
+            for k, vi, di in radar_hits:
+                if ret := radar._measure(vi, di):
+                    radar._accept(ids[k], ret)
+                    detections += 1
             # 消批
-            if other.id in self._results:
-                if (self._now - self._results[other.id].time) > self.track_off:
-                    self._results.pop(other.id)
+            results, now = radar._results, radar._now
+            for tid in [tid for tid, r in results.items() if tid in id_set and (now - r.time) > radar.track_off]:
+                results.pop(tid)
+            if leftovers:
+                radar.access([se for se in leftovers if se.id != radar.id])
+        if detections and (prof := batch[0].profiler) is not None:
+            prof.count('radar.detections', detections)
+
+    def _expire(self, others):
+        """ 消批: 场景中活动的目标超过 track_off 未更新则删除其航迹.
+
+        不只检查交互候选 others，使用空间索引时超出探测距离的目标不在候选中，也要消批.
+        不在场景中的实体 (已移除) 的航迹保留，与批量探测一致.
+        """
+        now, results = self._now, self._results
+        stale = [tid for tid, r in results.items() if (now - r.time) > self.track_off]
+        if not stale:
+            return
+        scene = self._scene
+        if scene is None:
+            ids = {o.id for o in others}
+            alive = lambda tid: tid in ids
+        else:
+            alive = lambda tid: (e := scene._lookup(tid)) is not None and e.is_active()
+        for tid in stale:
+            if alive(tid):
+                results.pop(tid)
+
+    def _accept(self, tid, ret):
+        """ 更新航迹表. """
+        if tid not in self._results:
+            self._results[tid] = _DetectResult(self._now, ret)
+        else:
+            self._results[tid].accept(self, self._now, ret)
 
     def step(self, tt):
         self._now = tt[0]
 
+    def next_attention(self, now, dt):
+        """ 按跟踪数据率重访. """
+        return self._now + self.track_dt
+
     def detect(self, other):
         """ 探测目标. """
         if hasattr(other, 'rcs') and hasattr(other, 'position'):
             v = other.position - self.position
-            return vec.dist(v), math.atan2(v[1], v[0])
+            d = vec.dist(v)
+            if self.max_range is None or d <= self.max_range:
+                return self._measure(v, d)
         return None
 
+    def _measure(self, v, d):
+        """ 由相对位置和距离生成测量 (距离, 方位). 不在探测范围内返回 None. """
+        az = math.atan2(v[1], v[0])
+        if self.coverage is not None:
+            el = math.atan2(v[2], math.hypot(v[0], v[1])) if len(v) > 2 else 0.0
+            if not self.coverage.contains((az, el, d)):
+                return None
+        return d, az
+
 
 
 def in_range(val, rng) -> bool:
@@ -1,8 +1,11 @@
 import copy
 from enum import Enum
 
+import numpy as np
+
 from .. import basic
 from .. import vec
+from .jammer import Jammer
 
 
 class Uav(basic.Entity):
@@ -16,13 +19,19 @@ class Uav(basic.Entity):
         current_life: 当前寿命.
     """
 
+    shadow_fields = ('position', 'velocity', 'rcs', 'current_life')
+    access_range = 0.0  # 只受干扰器影响, 由干扰器的 effect_range 决定.
+    access_types = (Jammer,)
+    _kin = None  # 影子实体不关联运动学状态存储.
+    kin_slot = -1
+
     def __init__(self, **kwargs):
         """ 初始化. """
         super().__init__(**kwargs)
         self.controller = UavController(uav=self, **kwargs)
 
-        self.position = 0.0
-        self.velocity = 0.0
+        self._position = 0.0
+        self._velocity = 0.0
 
         self.sensor_position = None
 
@@ -30,6 +39,42 @@ class Uav(basic.Entity):
         self.current_life = self.life
         self.rcs = 0.01
 
+    @property
+    def position(self):
+        """ 当前位置. 使用运动学状态存储时为存储中对应行的视图. """
+        return self._position if self._kin is None else self._kin.position[self.kin_slot]
+
+    @position.setter
+    def position(self, value):
+        if self._kin is None:
+            self._position = value
+        else:
+            self._kin.position[self.kin_slot] = value
+
+    @property
+    def velocity(self):
+        """ 当前速度. 使用运动学状态存储时为存储中对应行的视图. """
+        return self._velocity if self._kin is None else self._kin.velocity[self.kin_slot]
+
+    @velocity.setter
+    def velocity(self, value):
+        if self._kin is None:
+            self._velocity = value
+        else:
+            self._kin.velocity[self.kin_slot] = value
+
+    def attach(self, scene=None):
+        if self._kin is not None:
+            self._position, self._velocity = self.position.copy(), self.velocity.copy()
+            self._kin.remove(self)
+            self._kin = None
+        super().attach(scene)
+        if scene is not None and scene.kinematics is not None:
+            position, velocity = self._position, self._velocity
+            self._kin = scene.kinematics
+            self._kin.add(self)
+            self.position, self.velocity = position, velocity
+
     def step(self, tt):
         assert self.is_active()
 
@@ -44,6 +89,39 @@ class Uav(basic.Entity):
         self.velocity = (self.position - prev_pos) / \
             dt if dt > 0.0 else vec.zeros_like(self.position)
 
+    @classmethod
+    def step_batch(cls, uavs, tt):
+        """ 批量步进. 结果与逐个调用 step 完全一致.
+
+        未重载 step、使用默认飞控且位置已初始化的无人机按位置维数分组走向量化路径，其余逐个步进.
+        """
+        groups = {}
+        for u in uavs:
+            if type(u).step is Uav.step and type(u.controller) is UavController \
+                    and isinstance(u.position, np.ndarray):
+                groups.setdefault(u.position.shape, []).append(u)
+            else:
+                u.step(tt)
+        for batch in groups.values():
+            cls._step_group(batch, tt)
+
+    @staticmethod
+    def _step_group(batch, tt):
+        """ 向量化步进位置维数相同的一组无人机. """
+        _, dt = tt
+        alive = []
+        for u in batch:
+            u.current_life -= dt
+            if u.current_life <= 0:
+                u.deactive()
+            else:
+                alive.append(u)
+
+        prev_pos = _gather(batch, 'position')
+        UavController.step_batch([u.controller for u in alive], tt)
+        pos = _gather(batch, 'position')
+        _scatter(batch, 'velocity', (pos - prev_pos) / dt if dt > 0.0 else np.zeros_like(pos))
+
     def reset(self):
         self.controller.reset()
         self.current_life = self.life
@@ -51,16 +129,47 @@ class Uav(basic.Entity):
         self.velocity = vec.zeros_like(self.position)
 
     def access(self, others):
-        from .jammer import Jammer
         actions = {}
         for other in others:
             if isinstance(other, Jammer):
-                if other.power_on:
+                if other.power_on and other.covers(self.position):
                     if 'jam' not in actions:
                         actions['jam'] = []
                     actions['jam'].append(1)
         self.controller.take(actions)
 
+    def next_attention(self, now, dt):
+        """ 下一次需要步进的时间: 到达航点、寿命结束前一个节拍、进入或离开干扰范围中最早的时间. """
+        c = self.controller
+        if type(c) is not UavController or not isinstance(self.position, np.ndarray) or c.speed <= 0:
+            return now
+        if c.state == UavState.Normal and 0 < c.track_no < len(c.tracks):
+            target = c.tracks[c.track_no]
+        elif c.state == UavState.Back and c.tracks:
+            target = c.tracks[0]
+        else:
+            return now
+
+        t = min(now + self.current_life - dt, now + vec.dist(c.sensor_position, target) / c.speed)
+        jammed = False
+        for jammer in (self._scene.entities_of(Jammer) if self._scene else []):
+            if not (jammer.is_active() and jammer.power_on):
+                continue
+            if jammer.effect_range is None:
+                jammed = True
+                continue
+            d = vec.dist(self.position, jammer.position)
+            if d <= jammer.effect_range:
+                jammed = True
+                t = min(t, now + (jammer.effect_range - d) / c.speed)
+            else:
+                t = min(t, now + (d - jammer.effect_range) / c.speed)
+        if c.state == UavState.Normal and jammed:
+            return now
+        if c.state == UavState.Back and not jammed and c.track_no < len(c.tracks):
+            return now
+        return t
+
     def info(self) -> str:
         if self.is_active():
             return 'uav [{}] : {} --- {}'.format(self.id, self.position, self.velocity)
@@ -148,6 +257,48 @@ class UavController:
                 else:
                     self.state = UavState.Over
 
+    @staticmethod
+    def step_batch(controllers, tt):
+        """ 按状态分组批量步进. 结果与逐个调用 step 完全一致.
+
+        :param controllers: 飞控列表. 要求关联的无人机位置维数一致.
+        """
+        _, dt = tt
+        movers, targets = [], []
+        for c in controllers:
+            if len(c.tracks) <= 0:
+                c.uav.deactive()
+            elif c.state == UavState.Normal:
+                if c.track_no == 0:
+                    c.uav.position = c.tracks[0]
+                    c.uav.velocity = vec.zeros_like(c.uav.position)
+                    c.track_no = 1
+                elif c.track_no < len(c.tracks):
+                    movers.append(c)
+                    targets.append(c.tracks[c.track_no])
+                else:
+                    c.state = UavState.Back if c.two_way else UavState.Over
+            elif c.state == UavState.Back:
+                movers.append(c)
+                targets.append(c.tracks[0])
+            elif c.state in (UavState.Over, UavState.Home):
+                c.uav.deactive()
+        if not movers:
+            return
+
+        uavs = [c.uav for c in movers]
+        p0 = np.array([c.sensor_position for c in movers], dtype=np.float64)
+        d = np.array([c.speed for c in movers], dtype=np.float64) * dt
+        step, left = vec.move_step_n(p0, np.array(targets), d)
+        _scatter(uavs, 'position', _gather(uavs, 'position') + step)
+
+        for c, arrive in zip(movers, (left <= 0).tolist()):
+            if arrive:
+                if c.state == UavState.Normal:
+                    c.track_no += 1
+                else:
+                    c.state = UavState.Home
+
     def _step_on_over(self, tt):
         self.uav.deactive()
 
@@ -161,3 +312,29 @@ class UavController:
 
     def _step_on_home(self, tt):
         self.uav.deactive()
+
+
+def _shared_store(uavs):
+    """ 无人机共用的运动学状态存储, 没有则返回 None. """
+    kin = uavs[0]._kin
+    if kin is not None and all(u._kin is kin for u in uavs):
+        return kin
+    return None
+
+
+def _gather(uavs, attr) -> np.ndarray:
+    """ 收集无人机的位置/速度为 (N, d) 数组. """
+    kin = _shared_store(uavs)
+    if kin is not None:
+        return getattr(kin, attr)[[u.kin_slot for u in uavs]]
+    return np.array([getattr(u, attr) for u in uavs], dtype=np.float64)
+
+
+def _scatter(uavs, attr, values):
+    """ 把 (N, d) 数组写回无人机的位置/速度. """
+    kin = _shared_store(uavs)
+    if kin is not None:
+        getattr(kin, attr)[[u.kin_slot for u in uavs]] = values
+    else:
+        for u, v in zip(uavs, values):
+            setattr(u, attr, v)
@@ -1,14 +1,23 @@
 """
 场景事件辅助处理模块.
+
+1. 时间事件 (TimeEvent): 作为 step_handlers 每步轮询.
+2. 定时事件调度器 (Scheduler): 优先队列, 只在事件到期的时钟节拍调用.
 """
 
-from .basic import Scenario
+from __future__ import annotations
+
+import copy
+import heapq
+import math
+from typing import Optional, Callable, Any, List, Tuple
 
 
 class TimeEvent:
     """ 时间事件. 
     
     配合 Scene 和 Entity 的 step_handlers 使用的时间时间处理辅助类.
+    每步都会被调用，事件较多时请使用 Scheduler.
 
     Usages:
         entity.step_handlers.append(TimeEvent(time=1, evt=lambda e: e.do_something()))
@@ -35,16 +44,218 @@ class TimeEvent:
             elif self.times is not None:
                 self.__on_times(obj)
 
+    def next_time(self, now, dt) -> Optional[float]:
+        """ 当前时间之后的下一个触发时间 (事件推进模式使用). None 表示不再触发. """
+        if self.evt is None:
+            return None
+        if self.time is not None:
+            times = [self.time]
+        elif self.times is not None:
+            times = self.times
+        else:
+            return None
+        return min((t for t in times if t > now + 0.1 * dt), default=None)
+
     def __on_time(self, obj):
         """ 处理定时消息. """
         now, dt = obj.clock_info
-        if abs(now - self.time) <= 0.1 * dt:
+        if abs(now - self.time) <= 0.1 * _base_dt(obj, dt):
             self.evt(obj)
 
     def __on_times(self, obj):
         """ 处理事件序列消息. """
         now, dt = obj.clock_info
+        dt = _base_dt(obj, dt)
         for t in self.times:
             if abs(now - t) < 0.1 * dt:
                 self.evt(obj)
                 break
+
+
+def _base_dt(obj, dt) -> float:
+    """ 时钟的基本步长.
+
+    事件推进模式下 clock_info 给出的 dt 是本步跨过的时长 (可能包含多个节拍)，
+    触发容差应按一个节拍计算，否则会提前或重复触发.
+    """
+    scene = obj if hasattr(obj, 'clock') else getattr(obj, 'scene', None)
+    clock = getattr(scene, 'clock', None)
+    return clock.dt if clock is not None else dt
+
+
+class ScheduledEvent:
+    """ 调度器中的定时事件.
+
+    Attributes:
+        time: (首次) 触发时间.
+        period: 重复周期. None 表示只触发一次.
+        end: 重复截止时间. None 表示不限.
+        evt: 事件处理句柄. 调用原型为 evt(obj).
+        obj: 事件关联对象.
+        cancelled: 是否已取消.
+    """
+
+    def __init__(self, time, period, end, evt, obj):
+        self.time = time
+        self.period = period
+        self.end = end
+        self.evt = evt
+        self.obj = obj
+        self.cancelled = False
+        self.count = 0  # 已触发次数.
+
+    def next_time(self) -> Optional[float]:
+        """ 下一次触发时间. None 表示不再触发. """
+        if self.count > 0 and self.period is None:
+            return None
+        t = self.time if self.period is None else self.time + self.count * self.period
+        return None if (self.end is not None and t > self.end) else t
+
+
+class Scheduler:
+    """ 定时事件调度器.
+
+    事件按时钟节拍 (tick) 排队: 触发时间 t 对应第一个不早于 t 的节拍，
+    不依赖浮点时间的累加误差和容差比较.
+
+    Usages:
+        scene.scheduler.at(5.0, lambda s: s.do_something())
+        scene.scheduler.at(1.0, lambda e: e.do_something(), obj=entity)
+        scene.scheduler.every(2.0, lambda e: e.do_something(), obj=entity, start=1.0)
+    """
+
+    # 换算节拍时允许的误差 (以节拍为单位).
+    TICK_EPS = 1e-6
+
+    def __init__(self, clock, owner=None):
+        """ 初始化.
+
+        :param clock: 仿真时钟 (SimClock).
+        :param owner: 事件默认关联对象 (通常是场景).
+        """
+        self.clock = clock
+        self.owner = owner
+        self._events: List[ScheduledEvent] = []
+        self._queue: List[Tuple[int, int, ScheduledEvent]] = []
+        self._seq = 0  # 入队序号, 同一节拍的事件按入队顺序触发.
+
+    def __len__(self):
+        return sum(1 for _, _, e in self._queue if not e.cancelled)
+
+    def at(self, time: float, evt: Callable[[Any], Any], obj=None) -> ScheduledEvent:
+        """ 在指定时间触发一次事件.
+
+        :param time: 触发时间 (绝对时间).
+        :param evt: 事件处理句柄. 调用原型为 evt(obj).
+        :param obj: 事件关联对象. 默认为调度器的 owner.
+        """
+        return self._add(ScheduledEvent(time, None, None, evt, obj))
+
+    def every(self, period: float, evt: Callable[[Any], Any], obj=None, start=None, end=None) -> ScheduledEvent:
+        """ 周期触发事件.
+
+        :param period: 周期.
+        :param evt: 事件处理句柄. 调用原型为 evt(obj).
+        :param obj: 事件关联对象. 默认为调度器的 owner.
+        :param start: 首次触发时间. 默认为时钟起始时间.
+        :param end: 截止时间. None 表示不限.
+        """
+        assert period > 0
+        start = self.clock.start if start is None else start
+        return self._add(ScheduledEvent(start, period, end, evt, obj))
+
+    def cancel(self, event: ScheduledEvent):
+        """ 取消事件. """
+        event.cancelled = True
+
+    def reset(self):
+        """ 重置. 所有未取消的事件重新排队. """
+        self._events = [e for e in self._events if not e.cancelled]
+        self._queue = []
+        for e in self._events:
+            e.count = 0
+            self._push(e)
+
+    def progress(self) -> List[Tuple[int, bool]]:
+        """ 各事件的进度 (已触发次数, 是否取消), 用于检查点. 不包含事件句柄. """
+        return [(e.count, e.cancelled) for e in self._events]
+
+    def restore(self, progress: List[Tuple[int, bool]]):
+        """ 恢复事件进度. 之后加入的事件被移除.
+
+        :param progress: progress() 的返回值.
+        """
+        if len(progress) > len(self._events):
+            raise ValueError('scheduler has fewer events than the checkpoint')
+        self._events = self._events[:len(progress)]
+        self._queue = []
+        for e, (count, cancelled) in zip(self._events, progress):
+            e.count, e.cancelled = count, cancelled
+            if not cancelled:
+                self._push(e)
+
+    def fork(self, clock, owner=None) -> Scheduler:
+        """ 复制调度器 (用于场景分支). 事件对象复制，事件句柄和关联对象共享.
+
+        :param clock: 新调度器使用的时钟.
+        :param owner: 新调度器的 owner.
+        """
+        other = Scheduler(clock, owner)
+        events = {id(e): copy.copy(e) for e in self._events}
+        other._events = list(events.values())
+        other._queue = [(tick, seq, events.get(id(e)) or copy.copy(e)) for tick, seq, e in self._queue]
+        other._seq = self._seq
+        return other
+
+    def objects(self) -> list:
+        """ 事件关联的对象 (不含默认的 owner). """
+        return [e.obj for e in self._events if e.obj is not None]
+
+    def rebind(self, old, new):
+        """ 把关联到 old 的事件改为关联到 new. """
+        for e in self._events:
+            if e.obj is old:
+                e.obj = new
+
+    def clear(self):
+        """ 移除所有事件. """
+        self._events.clear()
+        self._queue.clear()
+
+    def to_tick(self, time: float) -> int:
+        """ 时间换算为第一个不早于该时间的节拍. """
+        return max(math.ceil((time - self.clock.start) / self.clock.dt - self.TICK_EPS), 0)
+
+    def next_tick(self) -> Optional[int]:
+        """ 最近一个待触发事件的节拍. 没有事件返回 None. """
+        while self._queue and self._queue[0][2].cancelled:
+            heapq.heappop(self._queue)
+        return self._queue[0][0] if self._queue else None
+
+    def dispatch(self, tick: Optional[int] = None) -> int:
+        """ 触发所有到期 (节拍不晚于 tick) 的事件.
+
+        :param tick: 节拍. 默认为时钟当前节拍.
+        :return: 触发的事件个数.
+        """
+        tick = self.clock.tick if tick is None else tick
+        count = 0
+        while self._queue and self._queue[0][0] <= tick:
+            _, _, e = heapq.heappop(self._queue)
+            if e.cancelled:
+                continue
+            e.count += 1
+            self._push(e)
+            e.evt(self.owner if e.obj is None else e.obj)
+            count += 1
+        return count
+
+    def _add(self, event: ScheduledEvent) -> ScheduledEvent:
+        self._events.append(event)
+        self._push(event)
+        return event
+
+    def _push(self, event: ScheduledEvent):
+        if (t := event.next_time()) is not None:
+            heapq.heappush(self._queue, (self.to_tick(t), self._seq, event))
+            self._seq += 1
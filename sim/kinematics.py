@@ -0,0 +1,74 @@
+"""
+运动学状态存储.
+
+把大量实体的位置、速度保存在连续的 (N, d) 数组中 (结构数组, SoA)，
+实体属性为数组中对应行的视图，批量计算可以直接操作整个数组.
+"""
+
+from typing import List, Any
+
+import numpy as np
+
+
+class KinematicsStore:
+    """ 运动学状态存储.
+
+    删除成员时把最后一行移入空位，保证数组始终紧凑，所以成员的行号可能变化.
+    扩容时数组会重新分配，不要长期持有 position/velocity 返回的视图.
+
+    Attributes:
+        dim: 空间维数.
+        owners: 行号对应的成员实体.
+    """
+
+    def __init__(self, dim: int = 2, capacity: int = 64):
+        self.dim = dim
+        self.owners: List[Any] = []
+        self._position = np.zeros((max(capacity, 1), dim), dtype=np.float64)
+        self._velocity = np.zeros_like(self._position)
+
+    def __len__(self):
+        return len(self.owners)
+
+    @property
+    def position(self) -> np.ndarray:
+        """ 位置数组 (N, d). """
+        return self._position[:len(self.owners)]
+
+    @property
+    def velocity(self) -> np.ndarray:
+        """ 速度数组 (N, d). """
+        return self._velocity[:len(self.owners)]
+
+    def add(self, owner) -> int:
+        """ 增加成员.
+
+        :param owner: 成员实体. 要求有 kin_slot 属性，用于记录行号.
+        :return: 行号.
+        """
+        n = len(self.owners)
+        if n >= len(self._position):
+            self._position = np.concatenate([self._position, np.zeros_like(self._position)])
+            self._velocity = np.concatenate([self._velocity, np.zeros_like(self._velocity)])
+        self._position[n] = 0.0
+        self._velocity[n] = 0.0
+        self.owners.append(owner)
+        owner.kin_slot = n
+        return n
+
+    def remove(self, owner):
+        """ 移除成员. """
+        slot, last = owner.kin_slot, len(self.owners) - 1
+        if slot != last:
+            moved = self.owners[last]
+            self._position[slot] = self._position[last]
+            self._velocity[slot] = self._velocity[last]
+            self.owners[slot] = moved
+            moved.kin_slot = slot
+        self.owners.pop()
+        owner.kin_slot = -1
+
+    def clear(self):
+        for owner in self.owners:
+            owner.kin_slot = -1
+        self.owners.clear()
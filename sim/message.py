@@ -0,0 +1,114 @@
+"""
+消息总线.
+
+1. 点对点消息: 按接收者 id 放入各自的队列.
+2. 主题消息 (一对多): 发送时放入所有订阅者的队列，各订阅者共享同一个消息对象.
+
+分发时整体交换队列，每个接收者一次性收到本步的全部消息；
+处理消息过程中发送的消息进入新的队列，在下一步分发.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class MessageBus:
+    """ 消息总线.
+
+    接收者和订阅者只记录 id，分发时通过场景查找实体.
+    """
+
+    def __init__(self):
+        self._queues: Dict[int, List[Tuple[Any, Any]]] = {}  # 接收者 id -> [(发送者, 消息)], 保持首条消息的顺序.
+        self._topics: Dict[Any, Dict[int, None]] = {}  # 主题 -> 订阅者 id (有序集合).
+
+    def __len__(self):
+        """ 待分发的消息条数 (按接收者计). """
+        return sum(len(q) for q in self._queues.values())
+
+    def __bool__(self):
+        return bool(self._queues)
+
+    def post(self, sender, reciever: int, msg):
+        """ 发送点对点消息.
+
+        :param sender: 发送者.
+        :param reciever: 接收者 id.
+        :param msg: 消息.
+        """
+        if (queue := self._queues.get(reciever)) is None:
+            queue = self._queues[reciever] = []
+        queue.append((sender, msg))
+
+    def publish(self, sender, topic, msg) -> int:
+        """ 发送主题消息. 发送者自己不会收到.
+
+        :return: 接收者个数.
+        """
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return 0
+        item = (sender, msg)
+        sender_id = getattr(sender, 'id', None)
+        queues = self._queues
+        count = 0
+        for rid in subscribers:
+            if rid == sender_id:
+                continue
+            if (queue := queues.get(rid)) is None:
+                queue = queues[rid] = []
+            queue.append(item)
+            count += 1
+        return count
+
+    def subscribe(self, rid: int, topic):
+        """ 订阅主题. """
+        self._topics.setdefault(topic, {})[rid] = None
+
+    def unsubscribe(self, rid: int, topic=None):
+        """ 取消订阅. topic 为 None 时取消全部订阅. """
+        topics = list(self._topics) if topic is None else [topic]
+        for t in topics:
+            if (subscribers := self._topics.get(t)) is not None:
+                subscribers.pop(rid, None)
+                if not subscribers:
+                    del self._topics[t]
+
+    def subscribers(self, topic) -> List[int]:
+        """ 主题的订阅者 id. """
+        return list(self._topics.get(topic, ()))
+
+    def dispatch(self, resolve: Callable[[int], Optional[Any]]) -> int:
+        """ 分发当前的全部消息.
+
+        :param resolve: 接收者 id -> 实体. 找不到或不活动的接收者丢弃其消息.
+        :return: 分发的消息条数.
+        """
+        queues, self._queues = self._queues, {}
+        count = 0
+        for rid, msgs in queues.items():
+            reciever = resolve(rid)
+            if reciever is not None and reciever.is_active():
+                reciever.on_msgs(msgs)
+                count += len(msgs)
+        return count
+
+    def clear(self):
+        """ 清空消息和订阅. """
+        self._queues.clear()
+        self._topics.clear()
+
+    def state(self) -> dict:
+        """ 队列和订阅 (用于检查点). """
+        return {'queues': {k: list(v) for k, v in self._queues.items()},
+                'topics': {k: list(v) for k, v in self._topics.items()}}
+
+    def set_state(self, state: dict):
+        """ 恢复 state() 保存的队列和订阅. """
+        self._queues = {k: list(v) for k, v in state['queues'].items()}
+        self._topics = {k: dict.fromkeys(v) for k, v in state['topics'].items()}
+
+    def fork(self) -> 'MessageBus':
+        """ 复制总线 (用于场景分支). 消息对象共享. """
+        other = MessageBus()
+        other.set_state(self.state())
+        return other
@@ -0,0 +1,262 @@
+"""
+蒙特卡洛批量仿真.
+
+把大量随机场景的重复运行分发到进程池，每次运行使用由 (seed, 序号) 确定的随机种子，
+结果与进程数和完成顺序无关. 每批结果按列写入输出目录中的 .npz 文件，中断后已完成的批次保留，
+再次运行时跳过. 输出目录中的 manifest.json 记录运行参数，再次运行时检查是否一致.
+"""
+
+import os
+import glob
+import json
+import random
+import multiprocessing as mp
+from statistics import NormalDist
+from typing import Callable, Dict, Optional, Any
+
+import numpy as np
+
+
+MANIFEST = 'manifest.json'
+
+
+def run_seed(seed: int, index: int) -> int:
+    """ 第 index 次运行的随机种子. """
+    return int(np.random.SeedSequence([seed, index]).generate_state(1)[0])
+
+
+def _run_scene(scene):
+    """ 默认运行方式: 重置并运行场景到结束. """
+    scene.reset()
+    scene.run()
+
+
+class MonteCarlo:
+    """ 蒙特卡洛批量运行器.
+
+    每次运行: 用本次种子初始化 random 和 numpy.random，obj = factory()，run_fn(obj)，
+    metrics(obj) 返回 {指标名: 数值}.
+
+    Attributes:
+        summary: 汇总统计，运行过程中逐批更新.
+    """
+
+    def __init__(self, factory: Callable[[], Any], metrics: Callable[[Any], Dict[str, float]],
+                 run_fn: Optional[Callable[[Any], None]] = None, seed: int = 0,
+                 n_workers: Optional[int] = None, out: Optional[str] = None, chunk_size: int = 100):
+        """ 初始化.
+
+        :param factory: 场景构建函数. 默认返回 Scenario.
+        :param metrics: 指标函数.
+        :param run_fn: 运行函数. None 表示重置并运行场景到结束.
+        :param seed: 根种子.
+        :param n_workers: 进程数. None 表示 CPU 核数, 0 表示在当前进程中运行.
+        :param out: 结果输出目录. None 表示不写盘.
+        :param chunk_size: 每批运行次数. 以批为单位分发任务和写盘.
+        """
+        self.factory = factory
+        self.metrics = metrics
+        self.run_fn = run_fn if run_fn is not None else _run_scene
+        self.seed = seed
+        self.n_workers = os.cpu_count() if n_workers is None else n_workers
+        self.out = out
+        self.chunk_size = chunk_size
+        self.summary = Summary()
+
+    def run(self, n_runs: int, progress: Optional[Callable[['Summary'], None]] = None) -> 'Summary':
+        """ 运行 n_runs 次. 输出目录中已有的批次直接读入，不重复运行.
+
+        :param n_runs: 总运行次数.
+        :param progress: 每完成一批调用一次 progress(summary).
+        :return: 汇总统计.
+        :raise ValueError: 输出目录中已有结果的根种子、场景构建函数或批大小与当前不同.
+        """
+        if self.out is not None:
+            self._write_manifest(n_runs)
+        self.summary = Summary()
+        chunks = []
+        for start in range(0, n_runs, self.chunk_size):
+            stop = min(start + self.chunk_size, n_runs)
+            path = self._part_path(start, stop)
+            if path is not None and os.path.exists(path):
+                self.summary.update(_load_part(path))
+            else:
+                chunks.append((start, stop))
+
+        job = (self.factory, self.metrics, self.run_fn, self.seed)
+        if self.n_workers == 0:
+            _init_worker(job)
+            for columns in map(_run_chunk, chunks):
+                self._collect(columns, progress)
+        else:
+            # 运行参数在进程启动时传入, fork 方式下 factory 等可以是 lambda.
+            with mp.Pool(self.n_workers, initializer=_init_worker, initargs=(job,)) as pool:
+                for columns in pool.imap_unordered(_run_chunk, chunks):
+                    self._collect(columns, progress)
+        return self.summary
+
+    def run_one(self, index: int) -> Dict[str, float]:
+        """ 执行第 index 次运行. """
+        return _run_one((self.factory, self.metrics, self.run_fn, self.seed), index)
+
+    def _collect(self, columns, progress):
+        if self.out is not None:
+            start, stop = int(columns['run'][0]), int(columns['run'][-1]) + 1
+            path = self._part_path(start, stop)
+            tmp = path + '.tmp.npz'
+            np.savez(tmp, **columns)
+            os.replace(tmp, path)
+        self.summary.update(columns)
+        if progress is not None:
+            progress(self.summary)
+
+    def _part_path(self, start, stop) -> Optional[str]:
+        if self.out is None:
+            return None
+        return os.path.join(self.out, _part_name(start, stop))
+
+    def _write_manifest(self, n_runs):
+        """ 检查并更新输出目录中的运行参数. 已有的批次只在参数一致时复用. """
+        manifest = {'seed': self.seed, 'chunk_size': self.chunk_size, 'n_runs': n_runs,
+                    'factory': '{}.{}'.format(getattr(self.factory, '__module__', None),
+                                              getattr(self.factory, '__qualname__', type(self.factory).__name__))}
+        old = _read_manifest(self.out)
+        if old is not None:
+            for key in ('seed', 'chunk_size', 'factory'):
+                if old[key] != manifest[key]:
+                    raise ValueError('{} does not match the existing results in {}: {!r} != {!r}'.format(
+                        key, self.out, manifest[key], old[key]))
+        os.makedirs(self.out, exist_ok=True)
+        path = os.path.join(self.out, MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(path + '.tmp', path)
+
+
+def _run_one(job, index) -> Dict[str, float]:
+    factory, metrics, run_fn, seed = job
+    s = run_seed(seed, index)
+    random.seed(s)
+    np.random.seed(s)
+    obj = factory()
+    run_fn(obj)
+    return metrics(obj)
+
+
+_job = None  # 工作进程的运行参数 (factory, metrics, run_fn, seed).
+
+
+def _init_worker(job):
+    global _job
+    _job = job
+
+
+def _run_chunk(chunk) -> Dict[str, np.ndarray]:
+    """ 执行一批运行，返回按列组织的结果. """
+    start, stop = chunk
+    rows = [_run_one(_job, i) for i in range(start, stop)]
+    columns = {'run': np.arange(start, stop), 'seed': np.array([run_seed(_job[3], i) for i in range(start, stop)])}
+    for key in rows[0]:
+        columns[key] = np.array([row[key] for row in rows], dtype=np.float64)
+    return columns
+
+
+def _part_name(start, stop) -> str:
+    return 'part-{:09d}-{:09d}.npz'.format(start, stop)
+
+
+def _read_manifest(out) -> Optional[Dict[str, Any]]:
+    path = os.path.join(out, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _load_part(path) -> Dict[str, np.ndarray]:
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
+
+
+def load_results(out: str) -> Dict[str, np.ndarray]:
+    """ 读取输出目录中的结果，按运行序号排序. 只读取 manifest.json 中最近一次运行的批次 (未完成的跳过)，
+    没有 manifest.json 时读取全部批次文件.
+
+    :return: {列名: 数组}. 包含 run, seed 和各指标列.
+    """
+    manifest = _read_manifest(out)
+    if manifest is None:
+        paths = [p for p in sorted(glob.glob(os.path.join(out, 'part-*-*.npz'))) if not p.endswith('.tmp.npz')]
+    else:
+        n, size = manifest['n_runs'], manifest['chunk_size']
+        paths = [os.path.join(out, _part_name(start, min(start + size, n))) for start in range(0, n, size)]
+    parts = [_load_part(p) for p in paths if os.path.exists(p)]
+    if not parts:
+        return {}
+    columns = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    order = np.argsort(columns['run'], kind='stable')
+    return {k: v[order] for k, v in columns.items()}
+
+
+class Summary:
+    """ 指标的汇总统计.
+
+    均值和方差逐批累加 (并行合并公式)，分位数由保留的样本计算.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._mean = {}
+        self._m2 = {}
+        self._values = {}
+
+    def update(self, columns: Dict[str, np.ndarray]):
+        """ 合并一批结果. """
+        n = len(columns['run'])
+        if n == 0:
+            return
+        for key, values in columns.items():
+            if key in ('run', 'seed'):
+                continue
+            values = np.asarray(values, dtype=np.float64)
+            mean, m2 = values.mean(), ((values - values.mean()) ** 2).sum()
+            if key not in self._mean:
+                self._mean[key], self._m2[key], self._values[key] = mean, m2, [values]
+                continue
+            total = self.count + n
+            delta = mean - self._mean[key]
+            self._mean[key] += delta * n / total
+            self._m2[key] += m2 + delta * delta * self.count * n / total
+            self._values[key].append(values)
+        self.count += n
+
+    def stats(self, confidence: float = 0.95, quantiles=(0.05, 0.5, 0.95)) -> Dict[str, Dict[str, Any]]:
+        """ 统计结果.
+
+        :param confidence: 均值置信区间的置信度 (正态近似).
+        :param quantiles: 分位点.
+        :return: {指标名: {'n', 'mean', 'std', 'ci': (下限, 上限), 'quantiles': {q: 值}}}
+        """
+        z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+        ret = {}
+        for key, mean in self._mean.items():
+            std = float(np.sqrt(self._m2[key] / (self.count - 1))) if self.count > 1 else 0.0
+            half = z * std / np.sqrt(self.count)
+            values = np.concatenate(self._values[key])
+            ret[key] = {
+                'n': self.count,
+                'mean': float(mean),
+                'std': std,
+                'ci': (float(mean - half), float(mean + half)),
+                'quantiles': dict(zip(quantiles, np.quantile(values, quantiles).tolist())),
+            }
+        return ret
+
+    def info(self) -> str:
+        lines = ['runs = {}'.format(self.count)]
+        for key, s in self.stats().items():
+            lines.append('  {}: mean = {:.4f}, ci = [{:.4f}, {:.4f}], quantiles = {}'.format(
+                key, s['mean'], s['ci'][0], s['ci'][1],
+                ', '.join('{}: {:.4f}'.format(q, v) for q, v in s['quantiles'].items())))
+        return '\n'.join(lines)
+
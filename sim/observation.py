@@ -0,0 +1,282 @@
+"""
+观测编码 (声明式的场景状态编码).
+
+用特征列表描述观测: 哪些实体、哪些属性、相对距离/方位以及归一化方式.
+编码器对每个场景预先解析实体并编译为填充函数，每步把结果原地写入预分配的 float32 缓冲区.
+
+Usages:
+    obs = ObservationSpec([
+        Distance('target', 'jammer', scale=1 / 100.0),
+        Norm('target', 'velocity'),
+        Field('jammer', 'power_on'),
+    ])
+    s = obs.encode(scene)  # (3,) float32, 缓冲区复用.
+"""
+
+import math
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class Feature:
+    """ 观测特征.
+
+    结果按 (值 - offset) * scale 归一化. 实体找不到时 (例如已被移除) 填充 missing.
+
+    Attributes:
+        names: 涉及的实体名称.
+        width: 占用的观测位数. None 表示绑定时由属性值确定.
+    """
+
+    width: Optional[int] = 1
+
+    def __init__(self, *names: str, offset=0.0, scale=1.0, missing=0.0):
+        self.names = names
+        self.offset = offset
+        self.scale = scale
+        self.missing = missing
+
+    def resolve_width(self, objs: Sequence) -> int:
+        """ 由实体确定宽度. """
+        return self.width
+
+    def compile(self, objs: Sequence, view: np.ndarray) -> Callable[[], None]:
+        """ 生成填充函数.
+
+        :param objs: 实体 (与 names 对应, 均存在).
+        :param view: 输出位置 (width,).
+        :return: fill(). 计算特征并写入 view.
+        """
+        raise NotImplementedError
+
+
+class Field(Feature):
+    """ 实体属性. 数组属性占其长度；值为 None 时填充 missing. """
+
+    width = None
+
+    def __init__(self, name: str, attr: str, width: Optional[int] = None, **kwargs):
+        """ 初始化.
+
+        :param name: 实体名称.
+        :param attr: 属性名.
+        :param width: 宽度. None 表示由属性当前值确定 (当前值为 None 时必须给出).
+        """
+        super().__init__(name, **kwargs)
+        self.attr = attr
+        self.width = width
+
+    def resolve_width(self, objs):
+        value = getattr(objs[0], self.attr)
+        n = None if value is None else np.size(value)
+        if self.width is None and n is None:
+            raise ValueError('cannot infer width of {}.{}'.format(self.names[0], self.attr))
+        if self.width is not None and n is not None and n != self.width:
+            raise ValueError('width mismatch for {}.{}'.format(self.names[0], self.attr))
+        return self.width if n is None else n
+
+    def compile(self, objs, view):
+        obj, attr, offset, scale, missing = objs[0], self.attr, self.offset, self.scale, self.missing
+
+        def fill():
+            value = getattr(obj, attr)
+            if value is None:
+                view.fill(missing)
+            else:
+                np.subtract(value, offset, out=view)
+                np.multiply(view, scale, out=view)
+        return fill
+
+
+class Active(Feature):
+    """ 实体是否活动 (1/0). """
+
+    def compile(self, objs, view):
+        obj = objs[0]
+
+        def fill():
+            view[0] = 1.0 if obj.is_active() else 0.0
+        return fill
+
+
+class Norm(Feature):
+    """ 向量属性的长度, 例如速率. """
+
+    def __init__(self, name: str, attr: str = 'velocity', **kwargs):
+        super().__init__(name, **kwargs)
+        self.attr = attr
+
+    def compile(self, objs, view):
+        obj, attr, offset, scale = objs[0], self.attr, self.offset, self.scale
+
+        def fill():
+            view[0] = (math.hypot(*_coords(getattr(obj, attr))) - offset) * scale
+        return fill
+
+
+class Relative(Feature):
+    """ 实体 b 相对实体 a 的位置 (b - a). """
+
+    width = None
+
+    def __init__(self, a: str, b: str, attr: str = 'position', **kwargs):
+        super().__init__(a, b, **kwargs)
+        self.attr = attr
+
+    def resolve_width(self, objs):
+        return np.size(getattr(objs[0], self.attr))
+
+    def compile(self, objs, view):
+        a, b, attr, offset, scale = objs[0], objs[1], self.attr, self.offset, self.scale
+
+        def fill():
+            np.subtract(getattr(b, attr), getattr(a, attr), out=view)
+            np.subtract(view, offset, out=view)
+            np.multiply(view, scale, out=view)
+        return fill
+
+
+class Distance(Feature):
+    """ 实体 a, b 之间的距离. """
+
+    def __init__(self, a: str, b: str, attr: str = 'position', **kwargs):
+        super().__init__(a, b, **kwargs)
+        self.attr = attr
+
+    def compile(self, objs, view):
+        a, b, attr, offset, scale = objs[0], objs[1], self.attr, self.offset, self.scale
+
+        def fill():
+            view[0] = (math.dist(_coords(getattr(a, attr)), _coords(getattr(b, attr))) - offset) * scale
+        return fill
+
+
+class Bearing(Feature):
+    """ 实体 b 相对实体 a 的方位角 (弧度, x 轴正向为 0, 逆时针为正). """
+
+    def __init__(self, a: str, b: str, attr: str = 'position', **kwargs):
+        super().__init__(a, b, **kwargs)
+        self.attr = attr
+
+    def compile(self, objs, view):
+        a, b, attr, offset, scale = objs[0], objs[1], self.attr, self.offset, self.scale
+
+        def fill():
+            pa, pb = _coords(getattr(a, attr)), _coords(getattr(b, attr))
+            view[0] = (math.atan2(pb[1] - pa[1], pb[0] - pa[0]) - offset) * scale
+        return fill
+
+
+class ObservationSpec:
+    """ 观测编码器.
+
+    每个场景有自己的缓冲区和编译结果 (保存在场景中, 随场景释放)，场景中的实体增删后自动重新编译.
+    encode 返回的缓冲区在下一次编码时被覆盖，需要保存时请复制.
+
+    Attributes:
+        features: 特征列表.
+        size: 观测长度. 首次编码 (或 bind) 后确定.
+    """
+
+    def __init__(self, features: Sequence[Feature]):
+        self.features = list(features)
+        self.size: Optional[int] = None
+        self._widths: Optional[List[int]] = None
+
+    def __len__(self):
+        return self.size if self.size is not None else 0
+
+    def bind(self, scene) -> np.ndarray:
+        """ 解析实体并编译填充函数.
+
+        首次绑定时检查特征: 实体不存在、属性不存在或无法确定宽度时报错.
+        之后重新编译时找不到的实体按 missing 填充.
+
+        :param scene: 场景.
+        :return: 场景的观测缓冲区 (size,).
+        :raise KeyError: 实体或属性不存在.
+        :raise ValueError: 无法确定宽度.
+        """
+        strict = self._widths is None
+        objs_list = []
+        for f in self.features:
+            objs = [scene._lookup(name) for name in f.names]
+            if strict:
+                for name, obj in zip(f.names, objs):
+                    if obj is None:
+                        raise KeyError('unknown entity in observation: {!r}'.format(name))
+                    if (attr := getattr(f, 'attr', None)) and not hasattr(obj, attr):
+                        raise KeyError('unknown attribute in observation: {}.{}'.format(name, attr))
+            objs_list.append(objs)
+        if strict:
+            self._widths = [f.resolve_width(objs) for f, objs in zip(self.features, objs_list)]
+            self.size = sum(self._widths)
+
+        entry = self._binding(scene)
+        buf = entry[3] if entry is not None else np.zeros(self.size, dtype=np.float32)
+        fills, pos = [], 0
+        for f, objs, n in zip(self.features, objs_list, self._widths):
+            view = buf[pos:pos + n]
+            if all(obj is not None for obj in objs):
+                fills.append(f.compile(objs, view))
+            else:
+                fills.append(_constant(view, f.missing))
+            pos += n
+        # 记录场景的 id, 复制 (deepcopy) 的场景不使用原场景的编译结果.
+        scene._observations[id(self)] = (self, id(scene), scene.layout, buf, fills)
+        return buf
+
+    def release(self, scene):
+        """ 释放场景的缓冲区和编译结果. """
+        if self._binding(scene) is not None:
+            del scene._observations[id(self)]
+
+    def _binding(self, scene) -> Optional[Tuple['ObservationSpec', int, int, np.ndarray, List[Callable[[], None]]]]:
+        """ 场景中本编码器的绑定 (spec, id(scene), layout, 缓冲区, 填充函数). """
+        entry = scene._observations.get(id(self))
+        return entry if entry is not None and entry[0] is self and entry[1] == id(scene) else None
+
+    def encode(self, scene, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """ 编码场景状态.
+
+        :param scene: 场景.
+        :param out: 输出 (size,). None 表示返回场景的观测缓冲区.
+        :return: 观测.
+        """
+        entry = self._binding(scene)
+        if entry is None or entry[2] != scene.layout:
+            self.bind(scene)
+            entry = scene._observations[id(self)]
+        for fill in entry[4]:
+            fill()
+        if out is None:
+            return entry[3]
+        out[...] = entry[3]
+        return out
+
+    def encode_batch(self, scenes: Sequence, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """ 编码多个场景 (批量环境).
+
+        :param scenes: 场景序列, 长度为 K.
+        :param out: 输出 (K, size). None 表示新建.
+        :return: 观测 (K, size).
+        """
+        if out is None:
+            if self.size is None:
+                self.bind(scenes[0])
+            out = np.empty((len(scenes), self.size), dtype=np.float32)
+        for i, scene in enumerate(scenes):
+            self.encode(scene, out[i])
+        return out
+
+
+def _constant(view: np.ndarray, value: float) -> Callable[[], None]:
+    def fill():
+        view.fill(value)
+    return fill
+
+
+def _coords(v):
+    """ 坐标转换为 Python 列表. 对 math 函数而言比逐个读取 ndarray 元素快. """
+    return v.tolist() if isinstance(v, np.ndarray) else v
@@ -0,0 +1,207 @@
+"""
+多进程并行 rollout.
+
+每个工作进程持有一个或多个 Environment (以 rl.VecEnvironment 组织)，
+状态、奖励、结束标志写入共享内存，主进程读取时不需要序列化.
+"""
+
+from __future__ import annotations
+
+import random
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Callable, List, Tuple, Dict, Optional
+
+import numpy as np
+
+from .rl import Environment, VecEnvironment
+
+
+class ParallelEnvironment:
+    """ 多进程并行强化学习环境.
+
+    共 n_workers * envs_per_worker 个子环境，第 w 个工作进程负责序号
+    [w * envs_per_worker, (w + 1) * envs_per_worker) 的子环境. 接口与 VecEnvironment 一致，
+    另外支持异步步进 (step_async / step_wait).
+
+    返回的状态、奖励、结束标志是共享内存的视图，下一次 reset/step 时会被覆盖.
+    工作进程出错时抛出包含其调用栈的 RuntimeError，之后只能 close.
+
+    Attributes:
+        num_envs: 子环境个数.
+    """
+
+    def __init__(self, env_fn: Callable[[], Environment], n_workers: int, envs_per_worker: int = 1,
+                 state_shape: Tuple[int, ...] = (), state_dtype=np.float64, seed: Optional[int] = None,
+                 start_method: Optional[str] = None):
+        """ 初始化.
+
+        :param env_fn: 子环境构建函数. 使用 spawn 启动方式时必须可以被 pickle.
+        :param n_workers: 工作进程个数.
+        :param envs_per_worker: 每个工作进程的子环境个数.
+        :param state_shape: 单个子环境状态 (agent.encode_state 的输出) 的形状.
+        :param state_dtype: 状态数据类型.
+        :param seed: 随机种子. 第 w 个工作进程使用 seed + w 初始化 random 和 numpy.random.
+        :param start_method: 进程启动方式 ('fork', 'spawn', ...). None 表示平台默认.
+        """
+        self.num_envs = n_workers * envs_per_worker
+        self.envs_per_worker = envs_per_worker
+        self._waiting = False
+        self._closed = False
+        self._dead = set()  # 已退出 (出错) 的工作进程序号.
+
+        k = self.num_envs
+        specs = [((k,) + tuple(state_shape), np.dtype(state_dtype)), ((k,), np.dtype(np.float64)),
+                 ((k,), np.dtype(bool))]
+        self._shms = [shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+                      for shape, dtype in specs]
+        self._specs = [(shm.name, shape, dtype.str) for shm, (shape, dtype) in zip(self._shms, specs)]
+        self.states, self.rewards, self.dones = [np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+                                                 for shm, (shape, dtype) in zip(self._shms, specs)]
+
+        ctx = mp.get_context(start_method)
+        self._remotes, self._processes = [], []
+        for w in range(n_workers):
+            remote, work_remote = ctx.Pipe()
+            slots = (w * envs_per_worker, (w + 1) * envs_per_worker)
+            wseed = None if seed is None else seed + w
+            p = ctx.Process(target=_worker, args=(work_remote, env_fn, envs_per_worker, slots, wseed, self._specs),
+                            daemon=True)
+            p.start()
+            work_remote.close()
+            self._remotes.append(remote)
+            self._processes.append(p)
+
+    def __len__(self):
+        return self.num_envs
+
+    def reset(self) -> np.ndarray:
+        """ 重置所有子环境.
+
+        :return: 状态 (K, ...).
+        """
+        self._send_all([('reset', None)] * len(self._remotes))
+        self._recv_all()
+        return self.states
+
+    def step_async(self, acts):
+        """ 发送动作，不等待结果.
+
+        :param acts: 动作序列, 长度为 K.
+        """
+        assert len(acts) == self.num_envs and not self._waiting
+        n = self.envs_per_worker
+        self._send_all([('step', list(acts[w * n:(w + 1) * n])) for w in range(len(self._remotes))])
+        self._waiting = True
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+        """ 等待 step_async 的结果.
+
+        :return: [s_, r, done, infos]. 含义同 VecEnvironment.step.
+        """
+        assert self._waiting
+        self._waiting = False
+        infos = self._recv_all()
+        return self.states, self.rewards, self.dones, infos
+
+    def step(self, acts) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+        """ 所有子环境同步执行一步. """
+        self.step_async(acts)
+        return self.step_wait()
+
+    def ready(self) -> bool:
+        """ 异步步进的结果是否已经全部就绪. """
+        return all(remote.poll() for remote in self._remotes)
+
+    def close(self):
+        """ 结束工作进程并释放共享内存. """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self._waiting:
+                self._waiting = False
+                try:
+                    self._recv_all()
+                except RuntimeError:
+                    pass
+            for w, remote in enumerate(self._remotes):
+                if w not in self._dead:
+                    try:
+                        remote.send(('close', None))
+                    except OSError:
+                        pass
+                remote.close()
+            for p in self._processes:
+                p.join(timeout=5.0)
+                if p.is_alive():
+                    p.terminate()
+                    p.join()
+        finally:
+            self.states = self.rewards = self.dones = None
+            for shm in self._shms:
+                shm.close()
+                shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _send_all(self, msgs):
+        if self._dead:
+            raise RuntimeError('rollout worker {} has failed, close the environment'.format(min(self._dead)))
+        for remote, msg in zip(self._remotes, msgs):
+            remote.send(msg)
+
+    def _recv_all(self) -> List[Dict]:
+        """ 接收所有工作进程的结果. 出错的工作进程记为已退出，全部接收后抛出第一个错误. """
+        infos, errors = [], []
+        for w, remote in enumerate(self._remotes):
+            if w in self._dead:
+                continue
+            try:
+                status, payload = remote.recv()
+            except EOFError:
+                status, payload = 'error', 'worker exited unexpectedly\n'
+            if status == 'error':
+                self._dead.add(w)
+                errors.append('rollout worker {} failed:\n{}'.format(w, payload))
+                continue
+            infos.extend(payload)
+        if errors:
+            raise RuntimeError(errors[0])
+        return infos
+
+
+def _worker(remote, env_fn, n_envs, slots, seed, specs):
+    """ 工作进程主循环. """
+    import traceback
+
+    shms = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    states, rewards, dones = [np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)[slots[0]:slots[1]]
+                              for shm, (_, shape, dtype) in zip(shms, specs)]
+    try:
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed)
+        venv = VecEnvironment([env_fn] * n_envs)
+        while True:
+            cmd, data = remote.recv()
+            if cmd == 'reset':
+                states[...] = venv.reset()
+                remote.send(('ok', [{} for _ in range(n_envs)]))
+            elif cmd == 'step':
+                s_, r, done, infos = venv.step(data)
+                states[...], rewards[...], dones[...] = s_, r, done
+                remote.send(('ok', infos))
+            elif cmd == 'close':
+                break
+    except Exception:
+        remote.send(('error', traceback.format_exc()))
+    finally:
+        del states, rewards, dones
+        for shm in shms:
+            shm.close()
+        remote.close()
@@ -0,0 +1,157 @@
+"""
+场景步进性能剖析.
+
+按步进阶段、实体类型和处理器统计耗时，并统计步进实体数、交互候选对数、消息数等计数.
+把 StepProfiler 赋给 Scenario.profiler 即可启用；未启用时步进只多几次 None 判断.
+
+Usages:
+    scene.profiler = StepProfiler(path='profile.jsonl', every=1000)
+    scene.run()
+    print(scene.profiler.report())
+"""
+
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class StepProfiler:
+    """ 步进性能剖析器.
+
+    阶段 (phase):
+        schedule: 确定本步需要步进的实体 (含分支场景复制实体).
+        step: 实体步进 (按类型).
+        shadow: 发布影子实体.
+        index: 构建交互候选索引.
+        access: 实体交互 (按类型).
+        message: 消息分发.
+        events: 定时事件.
+        handlers: 场景步进处理器 (按处理器).
+        on_step: 实体步进处理 (按处理器, 重载了 on_step 的按类型).
+        compact: 归档.
+        clock: 推进时钟.
+
+    Attributes:
+        path: 定期输出的文件 (JSON Lines). None 表示不输出.
+        every: 输出间隔 (步数).
+        steps: 统计的步数.
+        wall: 步进总耗时 (秒).
+        phases: 阶段 -> 耗时.
+        types: (阶段, 类型名) -> [耗时, 实体数].
+        handlers: 处理器名 -> [耗时, 调用次数].
+        counters: 计数.
+        clock: 计时函数, 默认 time.perf_counter. 可以在实例或子类中替换.
+    """
+
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self, path: Optional[str] = None, every: int = 1000):
+        self.path = path
+        self.every = every
+        self.reset()
+
+    def reset(self):
+        """ 清空统计. """
+        self.steps = 0
+        self.wall = 0.0
+        self.phases: Dict[str, float] = {}
+        self.types: Dict[Tuple[str, str], List[float]] = {}
+        self.handlers: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+
+    def lap(self, phase: str, t0: float) -> float:
+        """ 记录阶段耗时 (从 t0 到现在).
+
+        :return: 当前时刻, 作为下一段的起点.
+        """
+        t = self.clock()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (t - t0)
+        return t
+
+    def lap_type(self, phase: str, cls: type, t0: float, n: int = 1) -> float:
+        """ 记录某类型 n 个实体在阶段中的耗时. """
+        t = self.clock()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (t - t0)
+        if (rec := self.types.get((phase, cls.__name__))) is None:
+            rec = self.types[(phase, cls.__name__)] = [0.0, 0]
+        rec[0] += t - t0
+        rec[1] += n
+        return t
+
+    def lap_handler(self, phase: str, handler, t0: float) -> float:
+        """ 记录处理器一次调用的耗时. """
+        t = self.clock()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (t - t0)
+        name = handler_name(handler)
+        if (rec := self.handlers.get(name)) is None:
+            rec = self.handlers[name] = [0.0, 0]
+        rec[0] += t - t0
+        rec[1] += 1
+        return t
+
+    def count(self, name: str, n: int = 1):
+        """ 增加计数. """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def end_step(self, t_start: float, now: Optional[float] = None):
+        """ 一步结束. 达到输出间隔时输出.
+
+        :param t_start: 本步开始时刻.
+        :param now: 仿真时间.
+        """
+        self.steps += 1
+        self.wall += self.clock() - t_start
+        if self.path is not None and self.every > 0 and self.steps % self.every == 0:
+            self.dump(now)
+
+    def summary(self) -> dict:
+        """ 统计结果.
+
+        :return: {'steps', 'wall', 'per_step', 'phases': {阶段: 耗时},
+            'types': {阶段: {类型: {'time', 'count'}}}, 'handlers': {处理器: {'time', 'calls'}}, 'counters'}
+        """
+        types = {}
+        for (phase, name), (t, n) in self.types.items():
+            types.setdefault(phase, {})[name] = {'time': t, 'count': n}
+        return {
+            'steps': self.steps,
+            'wall': self.wall,
+            'per_step': self.wall / self.steps if self.steps else 0.0,
+            'phases': dict(self.phases),
+            'types': types,
+            'handlers': {k: {'time': t, 'calls': n} for k, (t, n) in self.handlers.items()},
+            'counters': dict(self.counters),
+        }
+
+    def report(self, top: int = 10) -> str:
+        """ 文本报告. 各部分按耗时降序，每部分最多 top 行. """
+        wall = self.wall or 1.0
+        lines = ['steps = {}, wall = {:.3f}s, per step = {:.1f}us'.format(
+            self.steps, self.wall, self.wall / max(self.steps, 1) * 1e6)]
+        lines.append('phases:')
+        for name, t in sorted(self.phases.items(), key=lambda kv: -kv[1])[:top]:
+            lines.append('  {:<24} {:9.3f}s {:6.1%}'.format(name, t, t / wall))
+        lines.append('types:')
+        for (phase, name), (t, n) in sorted(self.types.items(), key=lambda kv: -kv[1][0])[:top]:
+            lines.append('  {:<24} {:9.3f}s {:6.1%} n={}'.format(phase + '/' + name, t, t / wall, n))
+        lines.append('handlers:')
+        for name, (t, n) in sorted(self.handlers.items(), key=lambda kv: -kv[1][0])[:top]:
+            lines.append('  {:<24} {:9.3f}s {:6.1%} calls={}'.format(name, t, t / wall, n))
+        lines.append('counters:')
+        for name, n in sorted(self.counters.items()):
+            lines.append('  {:<24} {}'.format(name, n))
+        return '\n'.join(lines)
+
+    def dump(self, now: Optional[float] = None):
+        """ 把当前 (累计) 统计追加到 path, 一行一个 JSON 对象. """
+        record = {'time': now, **self.summary()}
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+def handler_name(handler) -> str:
+    """ 处理器名称. lambda 附加行号以便区分. """
+    name = getattr(handler, '__qualname__', None) or type(handler).__qualname__
+    if '<lambda>' in name and (code := getattr(handler, '__code__', None)) is not None:
+        name = '{}:{}'.format(name, code.co_firstlineno)
+    return name
@@ -0,0 +1,218 @@
+"""
+轨迹记录.
+
+每步把场景中实体的状态 (时间、id、类型、位置、速度、活动状态、雷达航迹数) 按列写入
+预分配的内存映射 .npy 文件. 数据分块存放，写满一块后换下一块，内存占用有上限.
+元数据 (各块行数、类型表、名称表) 定期写入 meta.json，运行过程中可以用 Trajectory 读取.
+
+目录结构:
+    path/meta.json
+    path/00000/time.npy, id.npy, type.npy, position.npy, velocity.npy, active.npy, tracks.npy
+    path/00001/...
+"""
+
+import os
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+COLUMNS = ('time', 'id', 'type', 'position', 'velocity', 'active', 'tracks')
+
+
+def _column_specs(dim: int) -> Dict[str, tuple]:
+    """ 列名 -> (单行形状, 数据类型). """
+    return {
+        'time': ((), np.float64),
+        'id': ((), np.int64),
+        'type': ((), np.int32),
+        'position': ((dim,), np.float64),
+        'velocity': ((dim,), np.float64),
+        'active': ((), np.bool_),
+        'tracks': ((), np.int32),
+    }
+
+
+class TrajectoryRecorder:
+    """ 轨迹记录器.
+
+    作为场景的步进处理器使用，每次调用记录一步:
+        recorder = TrajectoryRecorder('run.traj')
+        scene.step_handlers.append(recorder)
+        scene.run()
+        recorder.close()
+
+    没有位置/速度的实体对应列为 NaN; tracks 为实体 results 的长度 (雷达航迹数)，没有 results 时为 0.
+
+    Attributes:
+        path: 输出目录.
+        dim: 位置/速度维数.
+        chunk_rows: 每块的行数.
+        flush_steps: 每隔多少步刷新一次数据和元数据.
+    """
+
+    def __init__(self, path: str, dim: int = 2, chunk_rows: int = 1 << 16, flush_steps: int = 100):
+        self.path = path
+        self.dim = dim
+        self.chunk_rows = chunk_rows
+        self.flush_steps = flush_steps
+        self._specs = _column_specs(dim)
+        self._types: List[str] = []
+        self._type_codes: Dict[type, int] = {}
+        self._names: Dict[int, str] = {}
+        self._chunk_sizes: List[int] = []
+        self._cols: Optional[Dict[str, np.memmap]] = None
+        self._rows = 0  # 当前块已写入的行数.
+        self._steps = 0
+        os.makedirs(path, exist_ok=True)
+
+    def __call__(self, scene):
+        self.record(scene.clock.now, scene.entities)
+
+    def next_time(self, now, dt):
+        """ 不需要为记录单独步进 (事件推进模式下只记录实际执行的步). """
+        return None
+
+    def record(self, now: float, entities: list):
+        """ 记录一步.
+
+        :param now: 当前时间.
+        :param entities: 实体列表.
+        """
+        k = len(entities)
+        if self._cols is None or self._rows + k > len(self._cols['time']):
+            self._new_chunk(k)
+        rows = slice(self._rows, self._rows + k)
+        cols = self._cols
+
+        cols['time'][rows] = now
+        cols['id'][rows] = [e.id for e in entities]
+        codes = self._type_codes
+        cols['type'][rows] = [codes[t] if (t := type(e)) in codes else self._new_type(t) for e in entities]
+        cols['position'][rows] = self._vectors(entities, 'position')
+        cols['velocity'][rows] = self._vectors(entities, 'velocity')
+        cols['active'][rows] = [e.is_active() for e in entities]
+        cols['tracks'][rows] = [len(r) if (r := getattr(e, 'results', None)) is not None else 0 for e in entities]
+        for e in entities:
+            if e.id not in self._names:
+                self._names[e.id] = e.name
+
+        self._rows += k
+        self._chunk_sizes[-1] = self._rows
+        self._steps += 1
+        if self._steps % self.flush_steps == 0:
+            self.flush()
+
+    def flush(self):
+        """ 把数据和元数据写入磁盘. """
+        if self._cols is not None:
+            for col in self._cols.values():
+                col.flush()
+        meta = {
+            'dim': self.dim,
+            'columns': list(COLUMNS),
+            'chunks': self._chunk_sizes,
+            'types': self._types,
+            'names': {str(k): v for k, v in self._names.items()},
+        }
+        tmp = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, 'meta.json'))
+
+    def close(self):
+        """ 结束记录. """
+        self.flush()
+        self._cols = None
+
+    def _new_chunk(self, min_rows: int):
+        """ 换下一块. 行数不足一步时按一步的行数分配. """
+        if self._cols is not None:
+            for col in self._cols.values():
+                col.flush()
+        rows = max(self.chunk_rows, min_rows)
+        folder = os.path.join(self.path, '{:05d}'.format(len(self._chunk_sizes)))
+        os.makedirs(folder, exist_ok=True)
+        self._cols = {name: np.lib.format.open_memmap(os.path.join(folder, name + '.npy'), mode='w+',
+                                                      dtype=dtype, shape=(rows,) + shape)
+                      for name, (shape, dtype) in self._specs.items()}
+        self._rows = 0
+        self._chunk_sizes.append(0)
+        self.flush()
+
+    def _new_type(self, t: type) -> int:
+        code = len(self._types)
+        self._types.append(t.__module__ + '.' + t.__qualname__)
+        self._type_codes[t] = code
+        return code
+
+    def _vectors(self, entities, attr) -> np.ndarray:
+        """ 收集位置/速度. 缺失或维数不符的为 NaN. """
+        values = [getattr(e, attr, None) for e in entities]
+        try:
+            arr = np.array(values, dtype=np.float64)
+            if arr.shape == (len(entities), self.dim):
+                return arr
+        except (TypeError, ValueError):
+            pass
+        arr = np.full((len(entities), self.dim), np.nan)
+        for i, v in enumerate(values):
+            if isinstance(v, np.ndarray) and v.shape == (self.dim,):
+                arr[i] = v
+        return arr
+
+
+class Trajectory:
+    """ 轨迹读取.
+
+    以只读内存映射方式打开记录目录. 记录仍在进行时可以调用 refresh 读取新写入的数据.
+
+    Attributes:
+        dim: 位置/速度维数.
+        types: 类型名列表, 与 type 列的编码对应.
+        names: 实体 id -> 名称.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dim = 0
+        self.types: List[str] = []
+        self.names: Dict[int, str] = {}
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self.refresh()
+
+    def __len__(self):
+        return sum(len(c['time']) for c in self._chunks)
+
+    def refresh(self):
+        """ 重新读取元数据. """
+        with open(os.path.join(self.path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.dim = meta['dim']
+        self.types = meta['types']
+        self.names = {int(k): v for k, v in meta['names'].items()}
+        chunks = []
+        for i, rows in enumerate(meta['chunks']):
+            if i < len(self._chunks) and len(self._chunks[i]['time']) == rows:
+                chunks.append(self._chunks[i])
+                continue
+            folder = os.path.join(self.path, '{:05d}'.format(i))
+            chunks.append({name: np.load(os.path.join(folder, name + '.npy'), mmap_mode='r')[:rows]
+                           for name in meta['columns']})
+        self._chunks = chunks
+
+    @property
+    def chunks(self) -> List[Dict[str, np.ndarray]]:
+        """ 各块的列数据 (只读内存映射). """
+        return self._chunks
+
+    def column(self, name: str) -> np.ndarray:
+        """ 读取一列 (所有块拼接). """
+        if not self._chunks:
+            return np.zeros((0,) + _column_specs(self.dim)[name][0], dtype=_column_specs(self.dim)[name][1])
+        return np.concatenate([c[name] for c in self._chunks])
+
+    def type_of(self, code: int) -> str:
+        """ 类型编码对应的类型名. """
+        return self.types[code]
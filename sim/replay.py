@@ -0,0 +1,164 @@
+"""
+轨迹回放.
+
+从 TrajectoryRecorder 记录的文件读取各步的实体状态，驱动绘图器显示，不需要重新仿真.
+按时间建立步索引，跳转到任意时间只需要一次二分查找.
+"""
+
+import time
+import importlib
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from .record import Trajectory
+
+
+class Frame:
+    """ 一步的记录 (回放帧).
+
+    Attributes:
+        time: 时间.
+        id, type, position, velocity, active, tracks: 各实体的记录列 (只读).
+        classes: type 列编码对应的类, 无法导入时为 None.
+    """
+
+    def __init__(self, t: float, columns: Dict[str, np.ndarray], classes: List[Optional[type]]):
+        self.time = t
+        self.id = columns['id']
+        self.type = columns['type']
+        self.position = columns['position']
+        self.velocity = columns['velocity']
+        self.active = columns['active']
+        self.tracks = columns['tracks']
+        self.classes = classes
+
+    def __len__(self):
+        return len(self.id)
+
+    def of_type(self, cls: type) -> np.ndarray:
+        """ 属于指定类型 (含子类) 的行号. """
+        codes = [i for i, c in enumerate(self.classes) if c is not None and issubclass(c, cls)]
+        return np.flatnonzero(np.isin(self.type, codes))
+
+
+class Replay:
+    """ 轨迹回放.
+
+    Usages:
+        replay = Replay('run.traj')
+        replay.play(Painter(dt=0), start=3500.0, speed=60.0)
+    """
+
+    # 查找时间时允许的误差, 记录的时间有时钟累加误差.
+    TIME_EPS = 1e-6
+
+    def __init__(self, traj: Union[Trajectory, str]):
+        """ 初始化.
+
+        :param traj: 轨迹或记录目录.
+        """
+        self.traj = traj if isinstance(traj, Trajectory) else Trajectory(traj)
+        self.refresh()
+
+    def __len__(self):
+        return len(self.times)
+
+    def refresh(self):
+        """ 重新读取轨迹并重建时间索引. 用于回放仍在记录中的轨迹. """
+        self.traj.refresh()
+        times, chunks, starts, stops = [], [], [], []
+        for k, c in enumerate(self.traj.chunks):
+            t = np.asarray(c['time'])
+            if len(t) == 0:
+                continue
+            begin = np.flatnonzero(np.r_[True, t[1:] != t[:-1]])
+            times.append(t[begin])
+            chunks.append(np.full(len(begin), k))
+            starts.append(begin)
+            stops.append(np.r_[begin[1:], len(t)])
+        cat = (lambda xs, dtype: np.concatenate(xs) if xs else np.zeros(0, dtype=dtype))
+        self.times = cat(times, np.float64)  # 各步的时间, 递增.
+        self._chunk = cat(chunks, np.int64)
+        self._start = cat(starts, np.int64)
+        self._stop = cat(stops, np.int64)
+        self._classes = [_resolve(name) for name in self.traj.types]
+
+    @property
+    def start_time(self) -> float:
+        return float(self.times[0]) if len(self.times) else 0.0
+
+    @property
+    def end_time(self) -> float:
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    def seek(self, t: float) -> int:
+        """ 时间 t 对应的帧号 (不晚于 t 的最后一步). 早于第一步时返回 0. """
+        return max(int(np.searchsorted(self.times, t + self.TIME_EPS, side='right')) - 1, 0)
+
+    def frame(self, i: int) -> Frame:
+        """ 第 i 帧. """
+        c = self.traj.chunks[self._chunk[i]]
+        rows = slice(self._start[i], self._stop[i])
+        return Frame(float(self.times[i]), {k: v[rows] for k, v in c.items()}, self._classes)
+
+    def frame_at(self, t: float) -> Frame:
+        """ 时间 t 的帧. """
+        return self.frame(self.seek(t))
+
+    def frames(self, start: Optional[float] = None, end: Optional[float] = None,
+               speed: float = 1.0, fps: float = 0.0) -> Iterator[Frame]:
+        """ 按回放时间依次产生帧.
+
+        :param start: 起始时间. None 表示从头开始.
+        :param end: 结束时间. None 表示到最后.
+        :param speed: 回放速度 (仿真时间/显示时间). fps 大于 0 时有效，中间的帧被跳过.
+        :param fps: 显示帧率. 0 表示不跳帧，逐帧产生.
+        """
+        if not len(self.times):
+            return
+        start = self.start_time if start is None else start
+        end = self.end_time if end is None else end
+        if fps <= 0:
+            i = self.seek(start)
+            while i < len(self.times) and self.times[i] <= end + self.TIME_EPS:
+                yield self.frame(i)
+                i += 1
+            return
+        k = 0
+        while (t := start + k * speed / fps) <= end + self.TIME_EPS:
+            yield self.frame_at(t)
+            k += 1
+
+    def play(self, painter, start: Optional[float] = None, end: Optional[float] = None,
+             speed: float = 1.0, fps: float = 30.0):
+        """ 用绘图器回放.
+
+        :param painter: 绘图器. 要求有 render_frame(frame) 方法 (如 paint_pygame.Painter).
+        :param start: 起始时间.
+        :param end: 结束时间.
+        :param speed: 回放速度 (仿真时间/显示时间).
+        :param fps: 显示帧率. 0 表示逐帧尽快显示.
+        """
+        interval = 1.0 / fps if fps > 0 else 0.0
+        next_show = time.perf_counter()
+        for frame in self.frames(start, end, speed, fps):
+            painter.render_frame(frame)
+            next_show += interval
+            if (wait := next_show - time.perf_counter()) > 0:
+                time.sleep(wait)
+
+
+def _resolve(name: str) -> Optional[type]:
+    """ 由 module.qualname 找到类. """
+    module, _, qualname = name.rpartition('.')
+    while module:
+        try:
+            obj = importlib.import_module(module)
+            for part in qualname.split('.'):
+                obj = getattr(obj, part)
+            return obj
+        except (ImportError, AttributeError):
+            module, _, head = module.rpartition('.')
+            qualname = head + '.' + qualname
+    return None
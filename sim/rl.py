@@ -3,10 +3,14 @@
 """
 
 from __future__ import annotations
-from typing import Tuple, Any, Dict
+from typing import Tuple, Any, Dict, List, Callable, Optional
+
+import numpy as np
 
 from .basic import Scenario
+from .observation import ObservationSpec
 from .visualize import Painter
+from .visualize.raster import RasterPainter
 
 
 
@@ -21,27 +25,37 @@ class Environment:
         need_info: 是否需要获取场景信息.
     """
 
-    def __init__(self, referee=None, agent=None, dt=0.01, **kwargs):
+    def __init__(self, referee=None, agent=None, dt=0.01, setup=None, **kwargs):
         """ 初始化.
 
         :param referee: 裁判. 用于评价场景，获取奖励.   
         :param agent: 与环境绑定的 agent. 用于场景状态编码和场景动作解码.   
         :param dt: display interval. 0表示尽快显示. 
+        :param setup: 场景构建函数 setup(scene). 给出时每次 reset 都清空并重新构建场景.
         """
         self.scene = Scenario(**kwargs)
         self.referee = referee if referee is not None else RlReferee()
         self.agent = agent
+        self.setup = setup
         self.painter = Painter(dt=dt)
+        self.raster: Optional[RasterPainter] = None
         self.need_info = True
         self.total_reward = 0.0
+        self.steps = 0
 
     def reset(self) -> Any:
         """ 重置场景.
 
         :return: 返回当前状态.
         """
+        if self.setup is not None:
+            self.scene.clear()
+            self.setup(self.scene)
+        if self.scene.actions is None and getattr(self.agent, 'action_keys', None):
+            self.scene.register_actions(self.agent.action_keys)
         self.scene.reset()
         self.total_reward = 0.0
+        self.steps = 0
         s = self.agent.encode_state(self.scene) if self.agent else self.scene
         return s
 
@@ -60,13 +74,22 @@ class Environment:
         s_ = self.agent.encode_state(self.scene) if self.agent else self.scene
         reward, done = self.referee.calc_reward(self.scene)
         self.total_reward += reward
+        self.steps += 1
 
         done = done or (tt is None)
         info = self._info() if self.need_info else ''
         return s_, reward, done, info
 
-    def render(self):
-        """ 显示. """
+    def render(self, mode='human', out: Optional[np.ndarray] = None):
+        """ 显示.
+
+        :param mode: 'human' 表示用 painter 显示; 'rgb_array' 表示无界面绘制并返回图像 (H, W, 3).
+        :param out: rgb_array 模式的输出图像. None 表示使用 raster 内部复用的缓冲区.
+        """
+        if mode == 'rgb_array':
+            if self.raster is None:
+                self.raster = RasterPainter()
+            return self.raster.render(self.scene, out)
         self.painter.render(self.scene)
 
     def _info(self) -> str:
@@ -78,6 +101,82 @@ class Environment:
         return '\n  '.join(infos)
 
 
+class VecEnvironment:
+    """ 向量化强化学习环境.
+
+    同步运行多个相互独立的 Environment，批量接收动作，返回堆叠后的状态、奖励和结束标志.
+    子环境结束后自动重置，并在 infos 中报告该 episode 的统计信息.
+
+    Attributes:
+        envs: 子环境列表.
+    """
+
+    def __init__(self, env_fns: List[Callable[[], Environment]]):
+        """ 初始化.
+
+        :param env_fns: 子环境构建函数列表. 通常配合 Environment 的 setup 参数使用，
+            以便自动重置时重新 (随机) 构建场景.
+        """
+        self.envs = [fn() for fn in env_fns]
+        for env in self.envs:
+            env.need_info = False
+        self._frames: Optional[np.ndarray] = None
+
+    def __len__(self):
+        return len(self.envs)
+
+    def reset(self) -> np.ndarray:
+        """ 重置所有子环境.
+
+        :return: 堆叠的状态 (K, ...).
+        """
+        return np.asarray([env.reset() for env in self.envs])
+
+    def step(self, acts) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict]]:
+        """ 所有子环境执行一步.
+
+        :param acts: 动作序列, 长度为 K.
+        :return: [s_, r, done, infos]
+            s_: 堆叠的状态 (K, ...). 结束的子环境返回重置后的状态.
+            r: 奖励 (K,).
+            done: 结束标志 (K,).
+            infos: 每个子环境的信息. 结束时包含 terminal_state 和 episode {'r': 总奖励, 'l': 步数}.
+        """
+        assert len(acts) == len(self.envs)
+        states, infos = [], []
+        rewards = np.zeros(len(self.envs), dtype=np.float64)
+        dones = np.zeros(len(self.envs), dtype=bool)
+        for i, (env, a) in enumerate(zip(self.envs, acts)):
+            s_, rewards[i], dones[i], _ = env.step(a)
+            info = {}
+            if dones[i]:
+                info['terminal_state'] = s_.copy() if isinstance(s_, np.ndarray) else s_
+                info['episode'] = {'r': env.total_reward, 'l': env.steps}
+                s_ = env.reset()
+            states.append(s_)
+            infos.append(info)
+        return np.asarray(states), rewards, dones, infos
+
+
+    def render(self, mode='rgb_array') -> Optional[np.ndarray]:
+        """ 显示所有子环境.
+
+        :param mode: 'rgb_array' 返回堆叠的图像 (K, H, W, 3)，缓冲区复用; 'human' 依次显示.
+        """
+        if mode != 'rgb_array':
+            for env in self.envs:
+                env.render(mode)
+            return None
+        for i, env in enumerate(self.envs):
+            if self._frames is None:
+                img = env.render('rgb_array')
+                self._frames = np.empty((len(self.envs),) + img.shape, dtype=img.dtype)
+                self._frames[0] = img
+            else:
+                env.render('rgb_array', out=self._frames[i])
+        return self._frames
+
+
 class RlReferee:
     """ 强化学习裁判. """
 
@@ -92,14 +191,23 @@ class RlReferee:
 
 
 class RlAgent:
-    """ 强化学习决策代理. """
+    """ 强化学习决策代理.
+
+    Attributes:
+        action_keys: 动作格式的指令键 (见 ActionSchema). 给出时环境在首次 reset 后注册,
+            decode_action 返回与之对应的动作向量.
+        observation: 观测编码器 (见 ObservationSpec). 给出时 encode_state 返回编码后的观测.
+    """
+
+    action_keys = None
+    observation: Optional[ObservationSpec] = None
 
     def encode_state(self, scene) -> Any:
-        """ 把场景翻译为输入."""
-        return scene
+        """ 把场景翻译为输入. 使用 observation 时返回的缓冲区在下一步被覆盖."""
+        return self.observation.encode(scene) if self.observation is not None else scene
 
-    def decode_action(self, act_val) -> Dict:
-        """ 把输出翻译为场景指令集. """
+    def decode_action(self, act_val) -> Any:
+        """ 把输出翻译为场景指令集 (或动作向量). """
         return act_val
 
     def decide(self, s) -> Any:
@@ -0,0 +1,172 @@
+"""
+空间索引模块.
+
+用于在交互 (access) 阶段按距离筛选候选实体，避免两两遍历.
+"""
+
+import itertools
+from typing import Optional
+
+import numpy as np
+
+
+class GridIndex:
+    """ 均匀网格索引.
+
+    Attributes:
+        cell_size: 网格边长.
+    """
+
+    def __init__(self, cell_size: float):
+        assert cell_size > 0
+        self.cell_size = float(cell_size)
+        self._positions = np.zeros((0, 0))
+        self._cells = {}
+
+    def __len__(self):
+        return len(self._positions)
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions
+
+    def build(self, positions):
+        """ 根据位置重建索引.
+
+        :param positions: 位置数组 (N, d).
+        """
+        self._positions = np.asarray(positions, dtype=np.float64)
+        self._cells = {}
+        if len(self._positions) == 0:
+            return
+        keys = np.floor(self._positions / self.cell_size).astype(np.int64)
+        cells, inverse = np.unique(keys, axis=0, return_inverse=True)
+        order = np.argsort(inverse.ravel(), kind='stable')
+        bounds = np.cumsum(np.bincount(inverse.ravel(), minlength=len(cells)))[:-1]
+        for key, idx in zip(map(tuple, cells.tolist()), np.split(order, bounds)):
+            self._cells[key] = idx
+
+    def query(self, center, radius: float) -> np.ndarray:
+        """ 查询距离 center 不超过 radius 的点.
+
+        :return: 点序号数组 (升序).
+        """
+        center = np.asarray(center, dtype=np.float64)
+        lo = np.floor((center - radius) / self.cell_size).astype(np.int64)
+        hi = np.floor((center + radius) / self.cell_size).astype(np.int64)
+        if np.prod(hi - lo + 1) > len(self._cells):
+            idx = np.arange(len(self._positions))
+        else:
+            parts = [self._cells[k] for k in itertools.product(*[range(a, b + 1) for a, b in zip(lo, hi)])
+                     if k in self._cells]
+            if not parts:
+                return np.zeros(0, dtype=np.int64)
+            idx = np.concatenate(parts)
+        d = np.linalg.norm(self._positions[idx] - center, axis=1)
+        return np.sort(idx[d <= radius])
+
+
+class AccessIndex:
+    """ 交互候选索引.
+
+    实体 e 与实体 o 构成交互候选的条件:
+        dist(e, o) <= e.access_range 或 dist(e, o) <= o.effect_range.
+    范围为 None 表示不限. 没有位置的实体对所有实体可见.
+    此外 e.access_types 不为 None 时，o 必须是其中某个类型的实例.
+    """
+
+    def __init__(self, entities, shadows, cell_size: Optional[float] = None, enabled: bool = True):
+        """ 初始化.
+
+        :param entities: 活动实体列表. 用于读取交互/影响范围.
+        :param shadows: 与 entities 对应的影子实体列表.
+        :param cell_size: 网格边长. None 表示取最大的有限交互范围.
+        :param enabled: 是否启用空间筛选. 不启用时候选为全部其他实体.
+        """
+        self.shadows = shadows
+        self.pairs = 0  # 已给出的交互候选对数 (用于性能剖析).
+        self._slot = np.full(len(shadows), -1, dtype=np.int64)  # 影子序号 -> 网格中的序号.
+        self._interests = [e.access_types for e in entities]
+        self._by_type = {}  # 类型 -> 影子序号列表.
+        self._type_cache = {}
+        for i, se in enumerate(shadows):
+            self._by_type.setdefault(type(se), []).append(i)
+        if not enabled:
+            self._access = [None] * len(shadows)
+            return
+        self._access = [e.access_range for e in entities]
+        self._everywhere = []  # 对所有实体可见的影子序号.
+        located, positions, effectors, effect_ranges = [], [], [], []
+
+        dim = None
+        for i, (e, se) in enumerate(zip(entities, shadows)):
+            pos = getattr(se, 'position', None)
+            if not isinstance(pos, np.ndarray) or pos.ndim != 1 or (dim is not None and len(pos) != dim):
+                self._everywhere.append(i)
+                continue
+            dim = len(pos)
+            self._slot[i] = len(located)
+            located.append(i)
+            positions.append(pos)
+            er = e.effect_range
+            if er is None:
+                self._everywhere.append(i)
+            elif er > 0:
+                effectors.append(i)
+                effect_ranges.append(er)
+
+        self._located = np.array(located, dtype=np.int64)
+        self._effectors = np.array(effectors, dtype=np.int64)
+        self._effect_ranges = np.array(effect_ranges, dtype=np.float64)
+        self._effector_pos = np.array([shadows[i].position for i in effectors]).reshape(len(effectors), dim or 0)
+        self._reach = np.zeros(len(shadows))  # 每个影子的影响范围, 不限或没有位置时为 inf.
+        self._reach[self._everywhere] = np.inf
+        self._reach[self._effectors] = self._effect_ranges
+
+        if cell_size is None:
+            finite = [r for r in self._access if r is not None and r > 0]
+            cell_size = max(finite) if finite else 1.0
+        self.grid = GridIndex(cell_size)
+        self.grid.build(np.array(positions).reshape(len(positions), dim or 0))
+
+    def of_types(self, types) -> np.ndarray:
+        """ 属于指定类型 (含子类) 的影子序号 (升序). """
+        if (idx := self._type_cache.get(types)) is None:
+            parts = [v for t, v in self._by_type.items() if issubclass(t, types)]
+            idx = np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+            self._type_cache[types] = idx
+        return idx
+
+    def others(self, i: int) -> list:
+        """ 第 i 个实体的交互候选 (影子实体列表, 不含自身). """
+        r, slot, types = self._access[i], self._slot[i], self._interests[i]
+        if types is not None:
+            return self._others_of_types(i, r, slot, types)
+        if r is None or slot < 0:
+            self.pairs += len(self.shadows) - 1
+            return [se for j, se in enumerate(self.shadows) if j != i]
+
+        pos = self.grid.positions[slot]
+        selected = set(self._everywhere)
+        if r > 0:
+            selected.update(self._located[self.grid.query(pos, r)].tolist())
+        if len(self._effectors):
+            d = np.linalg.norm(self._effector_pos - pos, axis=1)
+            selected.update(self._effectors[d <= self._effect_ranges].tolist())
+        selected.discard(i)
+        self.pairs += len(selected)
+        return [self.shadows[j] for j in sorted(selected)]
+
+    def _others_of_types(self, i, r, slot, types) -> list:
+        """ 在指定类型的实体中筛选交互候选. """
+        pool = self.of_types(types)
+        if r is not None and slot >= 0 and len(pool):
+            pos = self.grid.positions[slot]
+            slots = self._slot[pool]
+            located = slots >= 0
+            d = np.full(len(pool), np.inf)
+            d[located] = np.linalg.norm(self.grid.positions[slots[located]] - pos, axis=1)
+            pool = pool[(d <= np.maximum(self._reach[pool], r)) | ~located]
+        others = [self.shadows[j] for j in pool.tolist() if j != i]
+        self.pairs += len(others)
+        return others
@@ -1,21 +1,34 @@
 """
 向量工具模块.
+
+单个向量的函数对 2D/3D 数组走纯 Python 标量计算，避免 NumPy 调用开销；
+带 _n 后缀的函数是批量版本，输入 (N, d) 数组，逐行结果与单个版本一致.
 """
 
+import math
+
 import numpy as np
 
 
 def dist(v1, v2=None):
     """ 两个点的距离. """
     v = v1 if v2 is None else (v1 - v2)
-    return np.linalg.norm(v)
+    if type(v) is np.ndarray:
+        if v.shape == (2,):
+            x, y = v.tolist()
+            return math.sqrt(x * x + y * y)
+        if v.shape == (3,):
+            x, y, z = v.tolist()
+            return math.sqrt(x * x + y * y + z * z)
+    v = np.asarray(v)
+    return np.sqrt(np.sum(v * v))
 
 
 def unit(v):
     """ 计算单位向量. """
     d = dist(v)
     if d > 0.:
-        return v / dist(v)
+        return v / d
     else:
         return zeros_like(v)
 
@@ -38,10 +51,11 @@ def move_to(p0, p1, d):
     :param d: 移动距离.
     :return: [当前位置, 剩余距离]
     """
-    d0 = dist(p0, p1)
+    v = p1 - p0
+    d0 = dist(v)
     left = d0 - d
     if left > 0:
-        return p0 + d * unit(p1 - p0), left
+        return p0 + d * (v / d0), left
     return p1, left
 
 
@@ -53,7 +67,59 @@ def move_step(p0, p1, d):
     :param d: 移动距离.
     :return: [移动向量, 剩余距离]
     """
-    d0 = dist(p0, p1)
-    step = unit(p1 - p0) * min(d0, d)
+    v = p1 - p0
+    d0 = dist(v)
+    step = (v / d0 if d0 > 0. else zeros_like(v)) * min(d0, d)
     left = d0 - d
     return step, left
+
+
+def dist_n(v1, v2=None):
+    """ 批量计算距离.
+
+    :param v1: 点 (N, d).
+    :param v2: 点 (N, d) 或 (d,). None 表示到原点的距离.
+    :return: 距离 (N,).
+    """
+    v = v1 if v2 is None else (v1 - v2)
+    return np.sqrt(np.sum(v * v, axis=-1))
+
+
+def unit_n(v):
+    """ 批量计算单位向量. 零向量的单位向量为零向量.
+
+    :param v: 向量 (N, d).
+    :return: 单位向量 (N, d).
+    """
+    d = dist_n(v)
+    return np.divide(v, d[:, None], out=np.zeros_like(v, dtype=np.float64), where=(d > 0.)[:, None])
+
+
+def move_to_n(p0, p1, d):
+    """ 批量向目的地移动一定距离.
+
+    :param p0: 出发位置 (N, d).
+    :param p1: 目标位置 (N, d).
+    :param d: 移动距离, 标量或 (N,).
+    :return: [当前位置 (N, d), 剩余距离 (N,)]
+    """
+    v = p1 - p0
+    d0 = dist_n(v)
+    d = np.broadcast_to(d, d0.shape)
+    left = d0 - d
+    pos = np.where((left > 0)[:, None], p0 + d[:, None] * unit_n(v), p1)
+    return pos, left
+
+
+def move_step_n(p0, p1, d):
+    """ 批量向目的地移动一步（向量）.
+
+    :param p0: 出发位置 (N, d).
+    :param p1: 目标位置 (N, d).
+    :param d: 移动距离, 标量或 (N,).
+    :return: [移动向量 (N, d), 剩余距离 (N,)]
+    """
+    v = p1 - p0
+    d0 = dist_n(v)
+    step = unit_n(v) * np.minimum(d0, d)[:, None]
+    return step, d0 - d
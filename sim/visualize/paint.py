@@ -6,3 +6,5 @@ class Painter:
     def render(self, scene):
         pass
 
+    def render_frame(self, frame):
+        pass
@@ -2,8 +2,8 @@ import time
 import math
 import pygame
 
-import sim
 from sim import vec
+from sim.common import Uav, Radar, Jammer
 
 
 class Painter:
@@ -31,6 +31,13 @@ class Painter:
                 draw_entity(self, e)
             self.update()
 
+    def render_frame(self, frame):
+        """ 显示回放帧 (replay.Frame). 回放自行控制帧率，不等待. """
+        if self.init():
+            self.draw_background()
+            draw_frame(self, frame)
+            self.update(wait=False)
+
     def fill(self, color=(255, 255, 255)):
         self.screen.fill(color)
 
@@ -43,10 +50,10 @@ class Painter:
         rect_ = pygame.Rect((pt2[0] - r, pt2[1] - r), (2 * r, 2 * r))
         pygame.draw.rect(self.screen, color, rect_, w)
 
-    def update(self):
+    def update(self, wait=True):
         # pygame.display.update()
         pygame.display.flip()
-        if self.dt > 0:
+        if wait and self.dt > 0:
             time.sleep(self.dt)
 
     def draw_background(self):
@@ -65,14 +72,25 @@ class Painter:
 
 
 def draw_entity(painter, e):
-    if isinstance(e, sim.Uav):
+    if isinstance(e, Uav):
         draw_uav(painter, e)
-    elif isinstance(e, sim.Radar):
+    elif isinstance(e, Radar):
         draw_radar(painter, e)
-    elif isinstance(e, sim.Jammer):
+    elif isinstance(e, Jammer):
         draw_jammer(painter, e)
 
 
+def draw_frame(painter, frame):
+    """ 绘制回放帧. 记录中没有雷达回波位置，只绘制实体本身. """
+    for cls, draw in ((Uav, lambda pt: painter.circle(pt, (0, 0, 255))),
+                      (Radar, lambda pt: painter.rect(pt, (255, 0, 0), 4)),
+                      (Jammer, lambda pt: painter.rect(pt, (200, 0, 0), 4))):
+        rows = frame.of_type(cls)
+        for pt in frame.position[rows[frame.active[rows]]].tolist():
+            if pt[0] == pt[0]:  # 跳过 NaN.
+                draw(pt)
+
+
 def draw_uav(painter, uav):
     if uav.is_active():
         painter.circle((uav.position[0], uav.position[1]), (0, 0, 255))
@@ -83,7 +101,7 @@ def draw_radar(painter, radar):
         color = (255, 0, 0)
         painter.rect((radar.position[0], radar.position[1]), color, 4)
         for _, ret in radar.results.items():
-            d, a = ret[1]
+            d, a = ret.result
             pt = radar.position + vec.vec([d * math.cos(a), d * math.sin(a)])
             painter.rect(pt, color, 1)
 
@@ -0,0 +1,127 @@
+"""
+NumPy 光栅化绘图器.
+
+不依赖显示窗口，直接把场景画到复用的 RGB 图像缓冲区 (H, W, 3)，用于无界面训练节点和基于像素的代理.
+坐标变换与 paint_pygame.Painter 相同；同一种图元的所有点通过一次索引赋值绘制.
+"""
+
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ..common import Uav, Radar, Jammer
+
+
+def _circle_stencil(r: int, w: int = 1) -> np.ndarray:
+    """ 圆周 (线宽 w) 的像素偏移 (K, 2). """
+    d = np.arange(-r, r + 1)
+    dx, dy = np.meshgrid(d, d)
+    dist = np.sqrt(dx * dx + dy * dy)
+    mask = (dist <= r + 0.5) & (dist > r - w + 0.5)
+    return np.stack([dx[mask], dy[mask]], axis=1)
+
+
+def _rect_stencil(r: int, w: int = 1) -> np.ndarray:
+    """ 方框 (边长 2r, 线宽 w) 的像素偏移 (K, 2). """
+    d = np.arange(-r, r)
+    dx, dy = np.meshgrid(d, d)
+    mask = (dx < -r + w) | (dx >= r - w) | (dy < -r + w) | (dy >= r - w)
+    return np.stack([dx[mask], dy[mask]], axis=1)
+
+
+class RasterPainter:
+    """ 光栅化绘图器.
+
+    Attributes:
+        screen_rect: 图像尺寸 (宽, 高).
+        world_rect: 显示的世界范围 (宽, 高), 以原点为中心.
+        image: 最近一次绘制的图像 (H, W, 3), uint8. 每次绘制复用.
+    """
+
+    UAV = ((0, 0, 255), _circle_stencil(4))
+    RADAR = ((255, 0, 0), _rect_stencil(4))
+    RADAR_RETURN = ((255, 0, 0), _rect_stencil(1))
+    JAMMER = ((200, 0, 0), _rect_stencil(4))
+
+    def __init__(self, sr=(600, 600), wr=(300, 300)):
+        self.screen_rect = sr
+        self.world_rect = wr
+        self.image = np.empty((sr[1], sr[0], 3), dtype=np.uint8)
+        self._background = self._draw_background()
+
+    def render(self, scene, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """ 绘制场景.
+
+        :param scene: 场景.
+        :param out: 输出图像 (H, W, 3). None 表示使用 image.
+        :return: 图像.
+        """
+        uavs, radars, jammers, returns = [], [], [], []
+        for e in scene.entities:
+            if not e.is_active():
+                continue
+            if isinstance(e, Uav):
+                uavs.append(e.position[:2])
+            elif isinstance(e, Radar):
+                radars.append(e.position)
+                for ret in e.results.values():
+                    d, a = ret.result
+                    returns.append((e.position[0] + d * math.cos(a), e.position[1] + d * math.sin(a)))
+            elif isinstance(e, Jammer):
+                jammers.append(e.position)
+
+        img = self._begin(out)
+        self.draw(img, uavs, *self.UAV)
+        self.draw(img, radars, *self.RADAR)
+        self.draw(img, returns, *self.RADAR_RETURN)
+        self.draw(img, jammers, *self.JAMMER)
+        return img
+
+    def render_frame(self, frame, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """ 绘制回放帧 (replay.Frame). """
+        img = self._begin(out)
+        for cls, (color, stencil) in ((Uav, self.UAV), (Radar, self.RADAR), (Jammer, self.JAMMER)):
+            rows = frame.of_type(cls)
+            self.draw(img, frame.position[rows[frame.active[rows]]], color, stencil)
+        return img
+
+    def draw(self, img: np.ndarray, points, color: Tuple[int, int, int], stencil: np.ndarray):
+        """ 批量绘制图元.
+
+        :param img: 图像.
+        :param points: 世界坐标 (N, D), D >= 2. 只使用前两维, NaN 被忽略.
+        :param color: 颜色.
+        :param stencil: 图元的像素偏移 (K, 2).
+        """
+        if not len(points):
+            return
+        pts = np.asarray(points, dtype=np.float64).reshape(len(points), -1)[:, :2]
+        pts = pts[~np.isnan(pts).any(axis=1)]
+        if not len(pts):
+            return
+        x, y = self._transform((pts[:, 0], pts[:, 1]))
+        xs = (np.rint(x).astype(np.int64)[:, None] + stencil[None, :, 0]).ravel()
+        ys = (np.rint(y).astype(np.int64)[:, None] + stencil[None, :, 1]).ravel()
+        inside = (xs >= 0) & (xs < img.shape[1]) & (ys >= 0) & (ys < img.shape[0])
+        img[ys[inside], xs[inside]] = color
+
+    def _begin(self, out) -> np.ndarray:
+        img = self.image if out is None else out
+        np.copyto(img, self._background)
+        return img
+
+    def _draw_background(self) -> np.ndarray:
+        """ 白色背景和坐标轴 (线宽 2). """
+        img = np.full_like(self.image, 255)
+        cx, cy = self._transform((0.0, 0.0))
+        cx, cy = int(round(cx)), int(round(cy))
+        img[:, max(cx - 1, 0):max(cx + 1, 0)] = 0
+        img[max(cy - 1, 0):max(cy + 1, 0), :] = 0
+        return img
+
+    def _transform(self, pt):
+        sr, wr = self.screen_rect, self.world_rect
+        x = pt[0] * sr[0] / float(wr[0]) + sr[0] / 2.0
+        y = - pt[1] * sr[1] / float(wr[1]) + sr[1] / 2.0
+        return x, y
@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+
+from sim import Scenario
+from sim.common import Jammer, Uav
+from sim.rl import Environment, RlAgent
+
+
+def setup(scene):
+    scene.add(Uav(name='uav', tracks=[[50, 0], [0, 0]], speed=5))
+    scene.add(Jammer(name='jammer', pos=[10.0, 0.0]))
+
+
+class TestAction(unittest.TestCase):
+    """ 测试动作格式. """
+
+    def test_register(self):
+        scene = Scenario()
+        setup(scene)
+        schema = scene.register_actions(['jammer.power_on', ('jammer.effect_range', 1), 'jammer.position',
+                                         ('uav.sensor_position', 2)])
+        self.assertEqual(schema.size, 1 + 1 + 2 + 2)
+        for keys in (['nobody.power_on'], ['jammer.power'], ['jammer'], ['uav.sensor_position']):
+            with self.assertRaises((KeyError, ValueError)):
+                scene.register_actions(keys)
+        with self.assertRaises(ValueError):
+            scene.register_actions(['jammer.power_on', 'jammer.power_on'])
+
+    def test_apply(self):
+        scene = Scenario()
+        setup(scene)
+        jammer, uav = scene.find('jammer'), scene.find('uav')
+        schema = scene.register_actions(['jammer.power_on', ('jammer.effect_range', 1), ('uav.sensor_position', 2)])
+
+        buf = np.zeros(schema.size, dtype=np.float32)
+        schema.pack({'jammer.power_on': 1, 'uav.sensor_position': [3.0, 4.0]}, out=buf)
+        scene.accept_actions(buf)
+        self.assertIs(jammer.power_on, True)
+        self.assertEqual(jammer.effect_range, 0.0)
+        np.testing.assert_array_equal(uav.sensor_position, [3.0, 4.0])
+        buf[2] = 5.0
+        self.assertEqual(uav.sensor_position[0], 3.0)  # 动作向量不与实体共享.
+
+        # 与指令集方式结果一致.
+        scene.accept_actions({'jammer.power_on': False})
+        self.assertIs(jammer.power_on, False)
+        with self.assertRaises(ValueError):
+            scene.accept_actions(np.zeros(3))
+
+        # 实体重建后重新解析.
+        scene.clear()
+        setup(scene)
+        scene.accept_actions(np.array([1.0, 2.0, 0.0, 0.0]))
+        self.assertTrue(scene.find('jammer').power_on)
+        self.assertFalse(jammer.power_on)
+
+    def test_fork(self):
+        scene = Scenario()
+        setup(scene)
+        scene.register_actions(['jammer.power_on'])
+        child = scene.fork()
+        child.accept_actions(np.ones(1))
+        self.assertTrue(child.find('jammer').power_on)
+        self.assertFalse(scene.find('jammer').power_on)
+
+    def test_env(self):
+        class Agent(RlAgent):
+            action_keys = ['jammer.power_on']
+
+            def decode_action(self, act_val):
+                return np.array([act_val], dtype=np.float64)
+
+        env = Environment(agent=Agent(), setup=setup, dt=0)
+        env.reset()
+        env.step(1)
+        self.assertTrue(env.scene.find('jammer').power_on)
+        env.reset()
+        self.assertFalse(env.scene.find('jammer').power_on)
+        env.step(1)
+        self.assertTrue(env.scene.find('jammer').power_on)
+
+
+if __name__ == '__main__':
+    unittest.main()
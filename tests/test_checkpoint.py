@@ -0,0 +1,138 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from sim import Scenario, Entity
+from sim.checkpoint import Checkpoint
+from sim.common import Uav, Radar, Jammer
+
+
+class Pinger(Entity):
+    """ 测试实体: 每步给目标发消息, 记录收到的消息. """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.target = kwargs.get('target')
+        self.received = []
+
+    def step(self, tt):
+        if self.target is not None:
+            self.send_msg(self.target, tt[0])
+
+    def on_msg(self, sender, msg):
+        self.received.append(msg)
+
+
+def build(kinematics=False):
+    scene = Scenario(end=20.0)
+    if kinematics:
+        scene.enable_kinematics()
+    scene.auto_compact = True
+    jammer = scene.add(Jammer(name='jammer', pos=[0, 0], effect_range=10.0))
+    scene.add(Radar(name='radar', pos=[10, 10]))
+    scene.add(Uav(name='uav1', tracks=[[50, 0], [0, 0]], speed=5, life=30))
+    scene.add(Uav(name='uav2', tracks=[[0, 40], [0, 0]], speed=4, life=8))
+    receiver = scene.add(Pinger(name='receiver'))
+    scene.add(Pinger(name='sender', target=receiver))
+    scene.scheduler.at(6.0, lambda s: setattr(jammer, 'power_on', True))
+    scene.scheduler.every(5.0, lambda s: s.find('receiver').received.append('tick'))
+    scene.reset()
+    return scene
+
+
+def trace(scene, steps):
+    """ 运行若干步，记录状态. """
+    ret = []
+    for _ in range(steps):
+        if not scene.step():
+            break
+        names = sorted(e.name for e in scene.entities)
+        uavs = [scene.find(n) or scene.find_archived(n) for n in ('uav1', 'uav2')]
+        ret.append((scene.clock.now, names, [u.position.tolist() for u in uavs], [u.is_active() for u in uavs],
+                    sorted((r.time, r.result) for r in scene.find('radar').results.values()),
+                    list(scene.find('receiver').received), scene.find('jammer').power_on))
+    return ret
+
+
+class TestCheckpoint(unittest.TestCase):
+    """ 测试场景检查点. """
+
+    def test_restore_same_scene(self):
+        for kinematics in (False, True):
+            scene = build(kinematics)
+            trace(scene, 40)
+            cp = scene.checkpoint()
+            expect = trace(scene, 200)
+            self.assertEqual(len(scene.archive), 1)
+            self.assertTrue(expect[-1][4])
+
+            scene.restore(cp)
+            self.assertEqual(len(scene.archive), 0)
+            self.assertEqual(trace(scene, 200), expect)
+            scene.restore(cp)
+            self.assertEqual(trace(scene, 200), expect)
+
+    def test_restore_other_scene(self):
+        scene = build(kinematics=True)
+        trace(scene, 100)  # uav2 已归档.
+        cp = scene.checkpoint()
+        expect = trace(scene, 200)
+
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, 'scene.ckpt')
+            cp.save(filename)
+            cp2 = Checkpoint.load(filename)
+        self.assertEqual(cp2.nbytes, cp.nbytes)
+
+        other = build(kinematics=True)
+        other.restore(cp2)
+        self.assertEqual([e.id for e in other.entities], [e.id for e in scene.entities])
+        self.assertEqual(trace(other, 200), expect)
+
+    def test_mismatch(self):
+        cp = build().checkpoint()
+        scene = Scenario()
+        scene.add(Entity())
+        with self.assertRaises(ValueError):
+            scene.restore(cp)
+
+    def test_arrays_out_of_band(self):
+        scene = Scenario()
+        e = scene.add(Entity(name='big'))
+        e.data = np.arange(10000, dtype=np.float64)
+        cp = scene.checkpoint()
+        self.assertLess(len(cp.data), 2000)
+        e.data[:] = 0
+        scene.restore(cp)
+        np.testing.assert_array_equal(scene.find('big').data, np.arange(10000))
+
+    def test_restore_archived(self):
+        """ 归档的实体恢复后, 按实体布局缓存的观测和动作重新解析. """
+        from sim.observation import ObservationSpec, Field, Active
+
+        scene = Scenario(end=20.0)
+        scene.auto_compact = True
+        scene.add(Uav(name='u', tracks=[[0, 0], [100, 0]], speed=5, life=3))
+        scene.add(Jammer(name='jammer'))
+        scene.reset()
+        spec = ObservationSpec([Field('u', 'position'), Active('u')])
+        schema = scene.register_actions(['u.life'])
+        spec.encode(scene)
+        cp = scene.checkpoint()
+        scene.run()
+        self.assertIsNone(scene.find('u'))
+        np.testing.assert_array_equal(spec.encode(scene), [0, 0, 0])
+        with self.assertRaises(KeyError):
+            scene.accept_actions(np.array([1.0]))
+
+        scene.restore(cp)
+        self.assertIsNotNone(scene.find('u'))
+        np.testing.assert_array_equal(spec.encode(scene), [0, 0, 1])
+        scene.accept_actions(np.array([9.0]))
+        self.assertEqual(scene.find('u').life, 9.0)
+        # 动作格式按恢复后的实体布局重新绑定.
+        self.assertIs(scene.actions, schema)
+        self.assertEqual(schema._layout, scene.layout)
+        self.assertIs(schema._scalars[0][0], scene.find('u'))
@@ -0,0 +1,49 @@
+import unittest
+
+from sim import Scenario, Entity
+from sim.event import TimeEvent
+
+
+class TestEvent(unittest.TestCase):
+    """ 测试 event 模块. """
+
+    def test_scheduler(self):
+        scene = Scenario(end=10.0)
+        obj = scene.add(Entity(name='obj'))
+        rec = []
+
+        scene.scheduler.at(5.0, lambda s: rec.append(('at', s.clock.tick)))
+        scene.scheduler.at(0.55, lambda e: rec.append(('off_grid', e.scene.clock.tick)), obj=obj)
+        scene.scheduler.every(2.5, lambda s: rec.append(('every', s.clock.tick)), start=1.0, end=8.0)
+        cancelled = scene.scheduler.at(3.0, lambda s: rec.append(('cancelled', s.clock.tick)))
+        scene.scheduler.cancel(cancelled)
+
+        polled = []
+        scene.step_handlers.append(TimeEvent(time=5.0, evt=lambda s: polled.append(s.clock.tick)))
+
+        scene.reset()
+        scene.run()
+        self.assertEqual(rec, [('off_grid', 6), ('every', 10), ('every', 35), ('at', 50), ('every', 60)])
+        self.assertEqual(polled, [50])
+        self.assertEqual(len(scene.scheduler), 0)
+
+        # 重置后重新触发.
+        rec.clear()
+        scene.reset()
+        scene.run()
+        self.assertEqual(len(rec), 5)
+
+    def test_time_event_driven(self):
+        """ 事件推进模式下时间事件按节拍匹配, 不因跨步变长而提前或重复触发. """
+        def run(event_driven):
+            scene = Scenario(end=20.0, step=0.01)
+            scene.event_driven = event_driven
+            fired = []
+            scene.step_handlers.append(TimeEvent(time=10.0, evt=lambda s: fired.append(round(s.clock.now, 6))))
+            scene.step_handlers.append(TimeEvent(time=9.95, evt=lambda s: None))
+            scene.reset()
+            scene.run()
+            return fired
+
+        self.assertEqual(run(False), [10.0])
+        self.assertEqual(run(True), [10.0])
@@ -0,0 +1,135 @@
+import unittest
+
+from sim import Scenario, Entity
+from sim.common import Uav, Radar, Jammer
+from tests.test_checkpoint import Pinger, trace
+
+
+class Counter(Entity):
+    """ 测试实体: 记录 on_step 调用次数. """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.count = 0
+
+    def on_step(self):
+        self.count += 1
+
+
+def build(kinematics=False):
+    scene = Scenario(end=20.0)
+    if kinematics:
+        scene.enable_kinematics()
+    scene.add(Jammer(name='jammer', pos=[0, 0], effect_range=10.0))
+    scene.add(Radar(name='radar', pos=[10, 10], update_period=1.0))
+    scene.add(Uav(name='uav1', tracks=[[50, 0], [0, 0]], speed=5, life=30))
+    scene.add(Uav(name='uav2', tracks=[[0, 40], [0, 0]], speed=4, life=8))
+    receiver = scene.add(Pinger(name='receiver'))
+    scene.add(Pinger(name='sender', target=receiver))
+    scene.scheduler.at(6.0, lambda s: setattr(s.find('jammer'), 'power_on', True))
+    scene.scheduler.every(5.0, lambda s: s.find('receiver').received.append('tick'))
+    scene.reset()
+    return scene
+
+
+class TestFork(unittest.TestCase):
+    """ 测试场景分支. """
+
+    def test_fork(self):
+        for kinematics in (False, True):
+            scene, expect_scene = build(kinematics), build(kinematics)
+            trace(scene, 40)
+            trace(expect_scene, 40)
+            expect = trace(expect_scene, 120)
+
+            child = scene.fork()
+            self.assertEqual(trace(child, 120), expect)
+            grandchild = scene.fork().fork()
+            self.assertEqual(trace(grandchild, 120), expect)
+            # 分支不影响原场景.
+            self.assertEqual(trace(scene, 120), expect)
+
+    def test_copy_on_write(self):
+        scene = build()
+        trace(scene, 85)  # uav2 已结束.
+        uav2, radar = scene.find('uav2'), scene.find('radar')
+        self.assertFalse(uav2.is_active())
+
+        child = scene.fork()
+        child.step()  # 本节拍雷达不需要更新.
+        self.assertTrue(any(e is uav2 for e in child.entities))
+        self.assertTrue(any(e is radar for e in child.entities))
+        self.assertFalse(any(e is scene.find('uav1') for e in child.entities))
+
+        child.find('jammer').effect_range = 99.0
+        self.assertEqual(child.find('jammer').effect_range, 99.0)
+        self.assertEqual(scene.find('jammer').effect_range, 10.0)
+
+        # 原场景变化后不能再使用分支.
+        scene.step()
+        with self.assertRaises(RuntimeError):
+            child.find('radar')
+
+    def test_passive_entities(self):
+        scene = build()
+        trace(scene, 10)
+        jammer = scene.find('jammer')
+        child = scene.fork()
+        child.step()
+        # 干扰器不重载步进/交互，不复制.
+        self.assertTrue(any(e is jammer for e in child.entities))
+
+        # 重载 on_step 的实体步进前复制.
+        counter = scene.add(Counter(name='counter'))
+        child = scene.fork()
+        child.step()
+        self.assertEqual(child.find('counter').count, 1)
+        self.assertEqual(counter.count, 0)
+
+    def test_shared_reference(self):
+        scene = build()
+        trace(scene, 10)
+        child = scene.fork()
+        sender = child.find('sender')
+        self.assertIsNot(sender, scene.find('sender'))
+        # 引用的共享实体随之复制并加入分支场景.
+        self.assertIs(sender.target, child.find('receiver'))
+        self.assertIsNot(sender.target, scene.find('receiver'))
+        self.assertIs(sender.target.scene, child)
+
+    def test_parent_changed(self):
+        for change in (lambda s: s.reset(), lambda s: s.accept_actions({'jammer.power_on': True})):
+            scene = build()
+            trace(scene, 10)
+            child = scene.fork()
+            change(scene)
+            with self.assertRaises(RuntimeError):
+                child.find('radar')
+
+    def test_parent_membership_changed(self):
+        def make():
+            scene = Scenario(end=20.0)
+            scene.enable_kinematics()
+            a = scene.add(Uav(name='a', tracks=[[0, 0], [100, 0]], speed=1, life=30))
+            b = scene.add(Uav(name='b', tracks=[[0, 0], [0, 100]], speed=1, life=30))
+            scene.reset()
+            scene.step()
+            return scene, a, b
+
+        for change in (lambda s, a: s.remove(a), lambda s, a: s.add(Jammer(name='jammer')),
+                       lambda s, a: s.clear()):
+            scene, a, b = make()
+            child = scene.fork()
+            change(scene, a)
+            with self.assertRaises(RuntimeError):
+                child.step()
+
+        # 分支场景增删实体不影响原场景.
+        scene, a, b = make()
+        child = scene.fork()
+        child.remove(child.find('a'))
+        for _ in range(5):
+            child.step()
+        self.assertEqual(a.kin_slot, 0)
+        self.assertEqual(b.position.tolist(), scene.find('b').position.tolist())
+        self.assertAlmostEqual(child.find('b').position[1], b.position[1] + 0.5)
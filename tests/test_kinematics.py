@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from sim import Scenario
+from sim.common import Uav
+from sim.kinematics import KinematicsStore
+
+
+class TestKinematics(unittest.TestCase):
+    """ 测试 kinematics 模块. """
+
+    def test_store(self):
+        class Owner:
+            kin_slot = -1
+
+        store = KinematicsStore(dim=2, capacity=1)
+        owners = [Owner() for _ in range(5)]
+        for i, o in enumerate(owners):
+            store.add(o)
+            store.position[o.kin_slot] = [i, i]
+        self.assertEqual(store.position.shape, (5, 2))
+
+        store.remove(owners[1])
+        self.assertEqual(len(store), 4)
+        self.assertEqual(owners[1].kin_slot, -1)
+        for i, o in enumerate(owners):
+            if i != 1:
+                np.testing.assert_almost_equal(store.position[o.kin_slot], [i, i])
+
+    def test_uav(self):
+        """ 使用运动学状态存储时，运行结果不变. """
+        def run(use_store):
+            scene = Scenario(end=5.0)
+            if use_store:
+                scene.enable_kinematics(dim=2)
+            uavs = [scene.add(Uav(tracks=[[i, 0], [i, 10]], speed=i + 1)) for i in range(4)]
+            scene.reset()
+            scene.run()
+            return scene, uavs
+
+        scene, uavs = run(True)
+        _, uavs_ref = run(False)
+        for u, ur in zip(uavs, uavs_ref):
+            np.testing.assert_almost_equal(u.position, ur.position)
+            np.testing.assert_almost_equal(u.velocity, ur.velocity)
+            np.testing.assert_almost_equal(scene.kinematics.position[u.kin_slot], u.position)
+
+        # 属性是存储的视图.
+        uavs[0].position[0] = 100.0
+        self.assertAlmostEqual(scene.kinematics.position[uavs[0].kin_slot][0], 100.0)
+
+        # 移出场景后保留状态.
+        pos = uavs[1].position.copy()
+        scene.remove(uavs[1])
+        self.assertEqual(len(scene.kinematics), 3)
+        np.testing.assert_almost_equal(uavs[1].position, pos)
+        np.testing.assert_almost_equal(uavs[2].position, uavs_ref[2].position)
@@ -0,0 +1,78 @@
+import unittest
+
+from sim import Scenario, Entity
+
+
+class Shooter(Entity):
+    """ 测试实体: 记录收到的消息. """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+
+    def on_msgs(self, msgs):
+        self.batches.append(list(msgs))
+
+
+class Echo(Entity):
+    """ 测试实体: 收到消息后回复. """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.received = []
+
+    def on_msg(self, sender, msg):
+        self.received.append((self.clock_info[0], msg))
+        self.send_msg(sender, msg + 1)
+
+
+class TestMessage(unittest.TestCase):
+    """ 测试消息总线. """
+
+    def test_topic(self):
+        scene = Scenario()
+        radar = scene.add(Entity(name='radar'))
+        shooters = [scene.add(Shooter(name='shooter')) for _ in range(5)]
+        for s in shooters[:4]:
+            self.assertTrue(s.subscribe('tracks'))
+        radar.step_handlers.append(lambda e: e.publish('tracks', {'t': e.clock_info[0]}))
+        radar.step_handlers.append(lambda e: e.send_msg(shooters[4].id, 'direct'))
+
+        scene.reset()
+        scene.step()
+        self.assertEqual(len(scene.bus), 5)
+        scene.step()
+        batches = [s.batches for s in shooters]
+        self.assertEqual([len(b) for b in batches], [1, 1, 1, 1, 1])
+        # 订阅者共享同一个消息对象.
+        payloads = [b[0][0][1] for b in batches[:4]]
+        self.assertTrue(all(p is payloads[0] for p in payloads))
+        self.assertEqual(batches[4][0], [(radar, 'direct')])
+
+        shooters[0].unsubscribe('tracks')
+        scene.remove(shooters[1])
+        self.assertEqual(scene.bus.subscribers('tracks'), [shooters[2].id, shooters[3].id])
+        self.assertEqual(radar.publish('tracks', 0), 2)
+
+    def test_deferred(self):
+        scene = Scenario()
+        a = scene.add(Echo(name='a'))
+        b = scene.add(Echo(name='b'))
+        scene.reset()
+        a.send_msg(b, 0)
+        for _ in range(4):
+            scene.step()
+        # 处理消息时发送的回复在下一步分发.
+        self.assertEqual([m for _, m in b.received], [0, 2])
+        self.assertEqual([m for _, m in a.received], [1, 3])
+        self.assertAlmostEqual(a.received[0][0] - b.received[0][0], 0.1)
+
+    def test_unresolved_receiver(self):
+        scene = Scenario()
+        a = scene.add(Echo(name='a'))
+        scene.reset()
+        scene.post_msg(a, None, 0)
+        self.assertEqual(len(scene.bus), 0)
+        self.assertFalse(a.send_msg('nobody', 0))
+        scene.step()
+        self.assertEqual(a.received, [])
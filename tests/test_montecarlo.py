@@ -0,0 +1,68 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from sim import Scenario
+from sim.common import Uav
+from sim.montecarlo import MonteCarlo, load_results
+
+
+def make_scene():
+    scene = Scenario(end=10.0)
+    scene.add(Uav(name='target', tracks=[[0, 0], [100, 0]], speed=random.uniform(1, 5), two_way=False))
+    return scene
+
+
+def distance(scene):
+    return {'x': scene.find('target').position[0], 'speed': scene.find('target').controller.speed}
+
+
+class TestMonteCarlo(unittest.TestCase):
+    """ 测试蒙特卡洛批量运行. """
+
+    def test_reproducible(self):
+        serial = MonteCarlo(make_scene, distance, seed=3, n_workers=0, chunk_size=7).run(30)
+        parallel = MonteCarlo(make_scene, distance, seed=3, n_workers=2, chunk_size=7).run(30)
+        self.assertEqual(serial.count, 30)
+        s1, s2 = serial.stats(), parallel.stats()
+        self.assertAlmostEqual(s1['x']['mean'], s2['x']['mean'])
+        self.assertEqual(s1['x']['quantiles'], s2['x']['quantiles'])
+
+        speeds = np.array([MonteCarlo(make_scene, distance, seed=3).run_one(i)['speed'] for i in range(30)])
+        self.assertAlmostEqual(s1['speed']['mean'], speeds.mean())
+        self.assertAlmostEqual(s1['speed']['std'], speeds.std(ddof=1))
+        lo, hi = s1['speed']['ci']
+        self.assertTrue(lo < speeds.mean() < hi)
+
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as out:
+            mc = MonteCarlo(make_scene, distance, seed=5, n_workers=0, out=out, chunk_size=4)
+            mc.run(8)
+            self.assertEqual(len([f for f in os.listdir(out) if f.startswith('part-')]), 2)
+
+            calls = []
+            summary = mc.run(10, progress=lambda s: calls.append(s.count))
+            self.assertEqual(calls, [10])  # 已有的两批不再运行.
+            self.assertEqual(summary.count, 10)
+
+            results = load_results(out)
+            np.testing.assert_array_equal(results['run'], np.arange(10))
+            for i in (0, 9):
+                self.assertAlmostEqual(results['x'][i], mc.run_one(i)['x'])
+
+    def test_manifest(self):
+        with tempfile.TemporaryDirectory() as out:
+            MonteCarlo(make_scene, distance, seed=5, n_workers=0, out=out, chunk_size=4).run(10)
+            for kwargs in ({'seed': 6, 'chunk_size': 4}, {'seed': 5, 'chunk_size': 5}):
+                with self.assertRaises(ValueError):
+                    MonteCarlo(make_scene, distance, n_workers=0, out=out, **kwargs).run(10)
+            with self.assertRaises(ValueError):
+                MonteCarlo(Scenario, distance, seed=5, n_workers=0, out=out, chunk_size=4).run(10)
+
+            # 运行次数减少后只读取本次的批次 (part-8-10 不再读取).
+            mc = MonteCarlo(make_scene, distance, seed=5, n_workers=0, out=out, chunk_size=4)
+            self.assertEqual(mc.run(8).count, 8)
+            np.testing.assert_array_equal(load_results(out)['run'], np.arange(8))
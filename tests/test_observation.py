@@ -0,0 +1,135 @@
+import copy
+import gc
+import math
+import unittest
+import weakref
+
+import numpy as np
+
+from sim import Scenario, vec
+from sim.common import Jammer, Uav
+from sim.observation import ObservationSpec, Field, Active, Norm, Relative, Distance, Bearing
+from sim.rl import Environment, VecEnvironment, RlAgent
+
+
+def setup(scene):
+    scene.add(Jammer(name='jammer', pos=[0, 0]))
+    scene.add(Uav(name='target', tracks=[[30, 40], [0, 0]], speed=5))
+
+
+def make_spec():
+    return ObservationSpec([
+        Distance('jammer', 'target', scale=0.1),
+        Bearing('jammer', 'target'),
+        Relative('jammer', 'target', offset=10.0),
+        Norm('target'),
+        Field('jammer', 'power_on'),
+        Field('target', 'sensor_position', width=2, missing=-1.0),
+        Active('target'),
+    ])
+
+
+class ObsAgent(RlAgent):
+    observation = None
+
+    def __init__(self):
+        self.observation = make_spec()
+
+
+class TestObservation(unittest.TestCase):
+    """ 测试观测编码. """
+
+    def test_encode(self):
+        scene = Scenario()
+        setup(scene)
+        scene.reset()
+        spec = make_spec()
+        s = spec.encode(scene)
+        self.assertEqual(s.dtype, np.float32)
+        self.assertEqual(spec.size, 9)
+        np.testing.assert_allclose(s[:4], [5.0, math.atan2(40, 30), 20.0, 30.0], rtol=1e-6)
+        self.assertAlmostEqual(float(s[4]), vec.dist(scene.find('target').velocity), places=5)
+        np.testing.assert_array_equal(s[5:], [0.0, -1.0, -1.0, 1.0])
+
+        # 缓冲区原地更新.
+        scene.find('jammer').power_on = True
+        scene.step()
+        s2 = spec.encode(scene)
+        self.assertIs(s2, s)
+        self.assertEqual(s[5], 1.0)
+        target = scene.find('target')
+        self.assertAlmostEqual(float(s[0]), vec.dist(target.position) * 0.1, places=5)
+
+        out = np.zeros(spec.size, dtype=np.float32)
+        spec.encode(scene, out)
+        np.testing.assert_array_equal(out, s)
+
+    def test_invalid(self):
+        scene = Scenario()
+        setup(scene)
+        scene.reset()
+        for spec in (ObservationSpec([Distance('jammer', 'nobody')]),
+                     ObservationSpec([Field('jammer', 'power')])):
+            with self.assertRaises(KeyError):
+                spec.encode(scene)
+        with self.assertRaises(ValueError):
+            ObservationSpec([Field('target', 'sensor_position')]).encode(scene)
+
+    def test_rebind(self):
+        scene = Scenario()
+        setup(scene)
+        scene.reset()
+        spec = make_spec()
+        spec.encode(scene)
+        scene.remove(scene.find('target'))
+        s = spec.encode(scene)
+        np.testing.assert_array_equal(s[[0, 1, 2, 3, 4, 8]], [0.0] * 6)
+
+        # 重建后按新实体编码.
+        scene.clear()
+        setup(scene)
+        scene.reset()
+        self.assertEqual(spec.encode(scene)[0], 5.0)
+
+    def test_batch(self):
+        agent = ObsAgent()
+        venv = VecEnvironment([lambda: Environment(agent=agent, setup=setup, dt=0) for _ in range(3)])
+        s = venv.reset()
+        self.assertEqual(s.shape, (3, 9))
+        self.assertEqual(s.dtype, np.float32)
+        np.testing.assert_allclose(s[:, 0], 5.0)
+
+        batch = agent.observation.encode_batch([env.scene for env in venv.envs])
+        np.testing.assert_array_equal(batch, s)
+        for _ in range(2):
+            s, _, _, _ = venv.step([{}, {}, {}])
+        self.assertLess(s[0, 0], 5.0)
+        # 各环境的缓冲区相互独立.
+        self.assertIsNot(agent.observation.encode(venv.envs[0].scene),
+                         agent.observation.encode(venv.envs[1].scene))
+
+    def test_scene_lifetime(self):
+        spec = make_spec()
+        scene = Scenario()
+        setup(scene)
+        scene.reset()
+        expect = spec.encode(scene).copy()
+
+        # 编码分支场景和复制的场景不影响原场景的绑定, 场景释放后绑定随之释放.
+        refs = []
+        for other in (scene.fork(), copy.deepcopy(scene)):
+            for _ in range(3):
+                other.step()
+            self.assertLess(spec.encode(other)[0], expect[0])
+            refs.append(weakref.ref(other))
+            del other
+        gc.collect()
+        self.assertTrue(all(ref() is None for ref in refs))
+        np.testing.assert_array_equal(spec.encode(scene), expect)
+
+        spec.release(scene)
+        self.assertEqual(scene._observations, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
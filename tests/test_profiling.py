@@ -0,0 +1,106 @@
+import itertools
+import json
+import os
+import tempfile
+import unittest
+
+from sim import Scenario, Entity
+from sim.common import Radar, Uav, Jammer
+from sim.profiling import StepProfiler
+
+
+class Pinger(Entity):
+    """ 测试实体: 每步给自己发消息. """
+
+    def on_step(self):
+        self.send_msg(self, 'ping')
+
+
+def build(scene):
+    scene.add(Radar(name='radar', pos=[0, 0]))
+    scene.add(Jammer(name='jammer', pos=[0, 0]))
+    scene.add(Uav(name='uav', tracks=[[50, 0], [0, 0]], speed=5, life=30))
+    scene.add(Pinger(name='pinger'))
+    scene.step_handlers.append(lambda s: None)
+    scene.find('uav').step_handlers.append(lambda e: None)
+
+
+class TestProfiling(unittest.TestCase):
+    """ 测试步进性能剖析. """
+
+    def run_scene(self, **kwargs):
+        scene = Scenario(end=5.0, **kwargs)
+        build(scene)
+        scene.profiler = StepProfiler()
+        scene.reset()
+        scene.run()
+        return scene, scene.profiler
+
+    def test_summary(self):
+        scene, prof = self.run_scene()
+        summary = prof.summary()
+        steps = summary['steps']
+        self.assertGreater(steps, 0)
+        self.assertEqual(set(summary['phases']), {'schedule', 'step', 'shadow', 'index', 'access', 'message',
+                                                  'events', 'handlers', 'on_step', 'clock'})
+        self.assertAlmostEqual(sum(summary['phases'].values()), summary['wall'], delta=summary['wall'] * 0.05)
+        self.assertEqual(summary['types']['step']['Uav']['count'], steps)
+        self.assertEqual(summary['types']['on_step']['Pinger']['count'], steps)
+        self.assertEqual(sum(h['calls'] for h in summary['handlers'].values()), 2 * steps)
+
+        counters = summary['counters']
+        self.assertEqual(counters['entities.stepped'], 4 * steps)
+        self.assertEqual(counters['messages'], steps - 1)
+        self.assertGreater(counters['radar.detections'], 0)
+        self.assertGreater(counters['access.pairs'], 0)
+        self.assertIn('radar.detections', prof.report())
+
+    def test_non_batch(self):
+        scene = Scenario(end=5.0)
+        scene.batch_step = False
+        build(scene)
+        scene.profiler = StepProfiler()
+        scene.reset()
+        scene.run()
+        counters = scene.profiler.counters
+        self.assertEqual(counters['entities.stepped'], 4 * scene.profiler.steps)
+        self.assertGreater(counters['radar.detections'], 0)
+
+    def test_dump(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'profile.jsonl')
+            scene = Scenario(end=5.0)
+            build(scene)
+            scene.profiler = StepProfiler(path=path, every=10)
+            scene.reset()
+            scene.run()
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+            self.assertEqual(len(records), scene.profiler.steps // 10)
+            self.assertEqual([r['steps'] for r in records], [10 * (k + 1) for k in range(len(records))])
+            self.assertAlmostEqual(records[0]['time'], 0.9)
+
+    def test_clock(self):
+        ticks = itertools.count()
+        scene = Scenario(end=5.0)
+        build(scene)
+        scene.profiler = prof = StepProfiler()
+        prof.clock = lambda: float(next(ticks))
+        scene.reset()
+        scene.run()
+        # 所有计时都来自 clock: 每步最后一段之后 end_step 再取一次时刻.
+        self.assertTrue(all(t.is_integer() for t in prof.phases.values()))
+        self.assertEqual(sum(prof.phases.values()) + prof.steps, prof.wall)
+        self.assertEqual(prof.wall + prof.steps, next(ticks))
+
+    def test_disabled(self):
+        scene = Scenario(end=1.0)
+        build(scene)
+        scene.reset()
+        scene.run()
+        self.assertIsNone(scene.profiler)
+        self.assertIsNone(scene.fork().profiler)
+
+
+if __name__ == '__main__':
+    unittest.main()
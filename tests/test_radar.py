@@ -38,6 +38,10 @@ class TestRadar(unittest.TestCase):
         ret = radar.detect(uav)
         self.assertAlmostEqual(ret[0], 50 * 2 ** 0.5)
 
+        radar.set_params(max_range=50.0)
+        self.assertTrue(radar.detect(uav) is None)
+        self.assertAlmostEqual(radar.access_range, 50.0)
+
     def test_step(self):
         scene = Scenario(end=30.0)
         radar = scene.add(Radar())
@@ -56,4 +60,68 @@ class TestRadar(unittest.TestCase):
         tt = sorted(list(ts))
         print(tt)
 
-        
\ No newline at end of file
+        
+    def test_access_batch(self):
+        """ 批量探测与逐个探测结果一致, 与是否使用空间索引无关. """
+        import random
+        from sim.common.radar import AerRange
+
+        def run(batch_step, spatial_index):
+            rnd = random.Random(3)
+            scene = Scenario(end=20.0)
+            scene.batch_step = batch_step
+            scene.spatial_index = spatial_index
+            radars = [scene.add(Radar(pos=[0, 0])),
+                      scene.add(Radar(pos=[30, 0], max_range=40.0)),
+                      scene.add(Radar(pos=[-30, 10], max_range=60.0, coverage=AerRange(min_a=-1.0, max_a=1.0)))]
+            for _ in range(30):
+                tracks = [[rnd.uniform(-80, 80), rnd.uniform(-80, 80)] for _ in range(3)]
+                scene.add(Uav(tracks=tracks, speed=rnd.uniform(2, 10), life=rnd.uniform(5, 30)))
+            scene.add(Target(pos=[10, 10]))
+            scene.reset()
+            seq = {e.id: i for i, e in enumerate(scene.entities)}
+            records = []
+            while scene.step():
+                records.append([{seq[k]: (r.time, r.result) for k, r in radar.results.items()} for radar in radars])
+            return records
+
+        records = run(True, False)
+        self.assertEqual(records, run(False, False))
+        self.assertEqual(records, run(True, True))
+        self.assertEqual(records, run(False, True))
+        self.assertTrue(any(len(r) < 31 for r in records[-1]))
+
+    def test_update_period(self):
+        """ 按更新周期步进. """
+        class CountingRadar(Radar):
+            calls = 0
+
+            def step(self, tt):
+                CountingRadar.calls += 1
+                super().step(tt)
+
+        scene = Scenario(end=10.0, step=0.01)
+        radar = scene.add(CountingRadar(update_period=1.0))
+        target = scene.add(Target(pos=[50, 50]))
+        scene.reset()
+        scene.run()
+        self.assertEqual(CountingRadar.calls, 11)
+        self.assertAlmostEqual(radar.results[target.id].time, 10.0)
+
+    def test_expire_out_of_range(self):
+        """ 目标飞出探测距离后消批 (使用空间索引、逐个交互). """
+        scene = Scenario(end=20.0)
+        scene.batch_step = False
+        scene.spatial_index = True
+        radar = scene.add(Radar(pos=[0, 0], max_range=20.0))
+        uav = scene.add(Uav(tracks=[[10, 0], [1000, 0]], speed=10, life=100))
+        scene.reset()
+        for _ in range(3):
+            scene.step()
+        self.assertIn(uav.id, radar.results)
+        scene.run()
+        self.assertTrue(uav.is_active())
+        self.assertGreater(uav.position[0], 20.0)
+        self.assertNotIn(uav.id, radar.results)
+        self.assertEqual(radar.results, {})
+
@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from sim import Scenario
+from sim.common import Uav, Radar, Jammer
+from sim.rl import Environment, VecEnvironment
+from sim.visualize.raster import RasterPainter
+
+
+def setup_scene(scene):
+    scene.add(Jammer(name='jammer', pos=[-50, -50]))
+    scene.add(Radar(name='radar', pos=[50, 50]))
+    scene.add(Uav(name='uav', tracks=[[100, 0], [0, 0]], speed=5))
+
+
+class TestRaster(unittest.TestCase):
+    """ 测试光栅化绘图. """
+
+    def test_render(self):
+        scene = Scenario()
+        setup_scene(scene)
+        scene.reset()
+        scene.step()
+
+        painter = RasterPainter(sr=(200, 100), wr=(300, 150))
+        img = painter.render(scene)
+        self.assertEqual(img.shape, (100, 200, 3))
+        self.assertEqual(img.dtype, np.uint8)
+
+        # 无人机 (100, 0) -> 像素 (166.7, 50), 圆半径 4.
+        np.testing.assert_array_equal(img[50, 171], [0, 0, 255])
+        np.testing.assert_array_equal(img[46, 167], [0, 0, 255])
+        np.testing.assert_array_equal(img[47, 167], [255, 255, 255])
+        # 雷达 (50, 50) -> 像素 (133.3, 16.7), 方框左上角 (129, 13).
+        np.testing.assert_array_equal(img[13, 129], [255, 0, 0])
+        # 干扰器 (-50, -50) -> 像素 (66.7, 83.3), 方框左上角 (63, 79).
+        np.testing.assert_array_equal(img[79, 63], [200, 0, 0])
+        # 坐标轴.
+        np.testing.assert_array_equal(img[10, 99], [0, 0, 0])
+        # 雷达回波 (雷达探测到无人机).
+        self.assertEqual(len(scene.find('radar').results), 1)
+        np.testing.assert_array_equal(img[49, 166], [255, 0, 0])
+
+        # 缓冲区复用, 实体移动后旧位置被擦除.
+        scene.find('uav').position = np.array([-100.0, 0.0])
+        img2 = painter.render(scene)
+        self.assertIs(img2, img)
+        np.testing.assert_array_equal(img[46, 167], [255, 255, 255])
+
+    def test_3d(self):
+        scene = Scenario()
+        scene.add(Uav(name='uav', tracks=[[100, 0, 30], [0, 0, 30]], speed=5))
+        scene.add(Uav(name='uav2d', tracks=[[-100, 0], [0, 0]], speed=5))
+        scene.reset()
+        painter = RasterPainter(sr=(200, 100), wr=(300, 150))
+        img = painter.render(scene)
+        # 只使用前两维: (100, 0, 30) -> 像素 (166.7, 50).
+        np.testing.assert_array_equal(img[50, 171], [0, 0, 255])
+        np.testing.assert_array_equal(img[50, 37], [0, 0, 255])
+
+        # 单个三维点 (元素个数为奇数) 和 NaN.
+        img = painter.render(Scenario())
+        painter.draw(img, np.array([[100.0, 0.0, 30.0], [np.nan, 0.0, 0.0]]), *RasterPainter.UAV)
+        np.testing.assert_array_equal(img[50, 171], [0, 0, 255])
+        self.assertEqual(int((img == [0, 0, 255]).all(axis=2).sum()), len(RasterPainter.UAV[1]))
+
+    def test_env_render(self):
+        venv = VecEnvironment([lambda: Environment(setup=setup_scene) for _ in range(3)])
+        venv.reset()
+        frames = venv.render()
+        self.assertEqual(frames.shape, (3, 600, 600, 3))
+        np.testing.assert_array_equal(frames[0], venv.envs[0].render(mode='rgb_array'))
+        self.assertIs(venv.render(), frames)
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from sim import Scenario
+from sim.common import Uav, Radar, Jammer
+from sim.record import TrajectoryRecorder, Trajectory
+
+
+class TestRecord(unittest.TestCase):
+    """ 测试轨迹记录. """
+
+    def test_record(self):
+        scene = Scenario(end=10.0)
+        scene.add(Jammer(name='jammer', pos=[0, 0]))
+        radar = scene.add(Radar(name='radar', pos=[10, 10]))
+        uav = scene.add(Uav(name='uav', tracks=[[0, 0], [100, 0]], speed=5, two_way=False))
+
+        with tempfile.TemporaryDirectory() as path:
+            recorder = TrajectoryRecorder(path, chunk_rows=64, flush_steps=10)
+            scene.step_handlers.append(recorder)
+            scene.reset()
+            positions, tracks = [], []
+            for _ in range(50):
+                scene.step()
+                positions.append(uav.position.copy())
+                tracks.append(len(radar.results))
+
+            # 运行过程中读取.
+            traj = Trajectory(path)
+            self.assertEqual(len(traj), 150)
+            self.assertEqual(len(traj.chunks), 3)
+
+            scene.run()
+            recorder.close()
+            traj.refresh()
+            self.assertEqual(len(traj), 101 * 3)
+            self.assertEqual(traj.names[uav.id], 'uav')
+
+            ids, types = traj.column('id'), traj.column('type')
+            rows = ids == uav.id
+            self.assertEqual(traj.type_of(types[rows][0]), 'sim.common.uav.Uav')
+            np.testing.assert_array_equal(traj.column('position')[rows][:50], positions)
+            np.testing.assert_array_equal(traj.column('tracks')[ids == radar.id][:50], tracks)
+            np.testing.assert_almost_equal(traj.column('time')[rows][:3], [0.0, 0.1, 0.2])
+            self.assertTrue(np.isnan(traj.column('velocity')[ids == radar.id]).all())
+            self.assertTrue(traj.column('active')[rows].all())
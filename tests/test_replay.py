@@ -0,0 +1,66 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from sim import Scenario
+from sim.common import Uav, Radar, Jammer
+from sim.record import TrajectoryRecorder
+from sim.replay import Replay
+
+
+class FakePainter:
+    """ 测试绘图器: 记录显示的帧. """
+
+    def __init__(self):
+        self.frames = []
+
+    def render_frame(self, frame):
+        self.frames.append(frame)
+
+
+class TestReplay(unittest.TestCase):
+    """ 测试轨迹回放. """
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        scene = Scenario(end=10.0)
+        scene.add(Jammer(name='jammer', pos=[0, 0]))
+        scene.add(Radar(name='radar', pos=[10, 10]))
+        self.uav = scene.add(Uav(name='uav', tracks=[[0, 0], [100, 0]], speed=5, two_way=False))
+        recorder = TrajectoryRecorder(self.dir.name, chunk_rows=50)
+        scene.step_handlers.append(recorder)
+        scene.reset()
+        self.positions = {}
+        while True:
+            t = scene.clock.now  # 记录的是步进前的时间.
+            if not scene.step():
+                break
+            self.positions[round(t, 6)] = self.uav.position.copy()
+        recorder.close()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_seek(self):
+        replay = Replay(self.dir.name)
+        self.assertEqual(len(replay), 101)
+        self.assertAlmostEqual(replay.end_time, 10.0)
+
+        frame = replay.frame_at(3.55)
+        self.assertAlmostEqual(frame.time, 3.5)
+        self.assertEqual(len(frame), 3)
+        rows = frame.of_type(Uav)
+        self.assertEqual(frame.id[rows].tolist(), [self.uav.id])
+        np.testing.assert_array_equal(frame.position[rows[0]], self.positions[3.5])
+        self.assertEqual(replay.seek(-1.0), 0)
+
+    def test_play(self):
+        replay = Replay(self.dir.name)
+        painter = FakePainter()
+        replay.play(painter, start=2.0, end=4.0, fps=0)
+        self.assertEqual(len(painter.frames), 21)
+
+        painter = FakePainter()
+        replay.play(painter, start=0.0, speed=1000.0, fps=1000.0)  # 每帧前进 1 秒.
+        np.testing.assert_almost_equal([f.time for f in painter.frames], np.arange(11.0))
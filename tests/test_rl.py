@@ -0,0 +1,127 @@
+import random
+import unittest
+
+import numpy as np
+
+from sim import vec
+from sim.common import Uav, Jammer
+from sim.rl import Environment, VecEnvironment, RlReferee
+from sim.parallel import ParallelEnvironment
+
+
+class DistAgent:
+    """ 测试代理: 状态为目标到干扰器的距离. """
+
+    def encode_state(self, scene):
+        jammer, uav = scene.find('jammer'), scene.find('target')
+        return vec.vec([vec.dist(uav.position, jammer.position)])
+
+    def decode_action(self, act_val):
+        return {'jammer.power_on': bool(act_val)}
+
+
+class JamReferee(RlReferee):
+    """ 测试裁判: 开干扰扣分, 目标消失结束. """
+
+    def calc_reward(self, scene):
+        jammer, uav = scene.find('jammer'), scene.find('target')
+        return (-1.0 if jammer.power_on else 0.0), not uav.is_active()
+
+
+def setup_scene(scene, life):
+    scene.set_params(end=50.0)
+    scene.add(Jammer(name='jammer', pos=[0, 0], effect_range=10.0))
+    scene.add(Uav(name='target', tracks=[[50, 0], [0, 0]], speed=5, life=life))
+
+
+class FailingAgent(DistAgent):
+    """ 测试代理: 动作为 -1 时出错. """
+
+    def decode_action(self, act_val):
+        if act_val == -1:
+            raise ValueError('bad action')
+        return super().decode_action(act_val)
+
+
+def make_failing_env():
+    return Environment(referee=JamReferee(), agent=FailingAgent(), setup=lambda scene: setup_scene(scene, 2.0))
+
+
+def make_random_env():
+    return Environment(referee=JamReferee(), agent=DistAgent(),
+                       setup=lambda scene: setup_scene(scene, random.uniform(1.0, 3.0)))
+
+
+class TestRl(unittest.TestCase):
+    """ 测试 rl 模块. """
+
+    def test_vec_env(self):
+        def make(life):
+            return lambda: Environment(referee=JamReferee(), agent=DistAgent(),
+                                       setup=lambda scene: setup_scene(scene, life))
+
+        venv = VecEnvironment([make(1.0), make(2.0), make(3.0)])
+        s = venv.reset()
+        self.assertEqual(s.shape, (3, 1))
+        np.testing.assert_almost_equal(s[:, 0], [50, 50, 50])
+
+        episodes = [[], [], []]
+        for _ in range(35):
+            s, r, done, infos = venv.step([1, 0, 1])
+            self.assertEqual(s.shape, (3, 1))
+            self.assertEqual(r.shape, (3,))
+            self.assertEqual(done.dtype, bool)
+            for i, info in enumerate(infos):
+                if done[i]:
+                    episodes[i].append(info['episode'])
+                    np.testing.assert_almost_equal(s[i], [50])
+
+        self.assertEqual(len(episodes[0]), 2)
+        self.assertEqual(episodes[0][0], {'r': -12.0, 'l': 12})
+        self.assertEqual(episodes[1][0], {'r': 0.0, 'l': 21})
+        self.assertEqual(len(episodes[2]), 1)
+
+    def test_parallel_env(self):
+        def rollout(venv, steps=30):
+            s, trace = venv.reset(), []
+            for t in range(steps):
+                s, r, done, infos = venv.step([t % 2] * len(venv))
+                trace.append((s.copy(), r.copy(), done.copy()))
+            return trace
+
+        with ParallelEnvironment(make_random_env, n_workers=2, envs_per_worker=2, state_shape=(1,), seed=7) as penv:
+            trace = rollout(penv)
+            penv.step_async([1, 1, 0, 0])
+            while not penv.ready():
+                pass
+            s, r, done, infos = penv.step_wait()
+            self.assertEqual(len(infos), 4)
+
+        # 与单进程按同样种子运行的结果一致.
+        expects = []
+        for w in range(2):
+            random.seed(7 + w)
+            np.random.seed(7 + w)
+            expects.append(rollout(VecEnvironment([make_random_env] * 2)))
+        for t, (s, r, done) in enumerate(trace):
+            np.testing.assert_array_equal(s, np.concatenate([e[t][0] for e in expects]))
+            np.testing.assert_array_equal(r, np.concatenate([e[t][1] for e in expects]))
+            np.testing.assert_array_equal(done, np.concatenate([e[t][2] for e in expects]))
+        self.assertTrue(any(d.any() for _, _, d in trace))
+
+    def test_parallel_env_error(self):
+        from multiprocessing import shared_memory
+
+        penv = ParallelEnvironment(make_failing_env, n_workers=2, state_shape=(1,))
+        names = [shm.name for shm in penv._shms]
+        penv.reset()
+        with self.assertRaises(RuntimeError) as cm:
+            penv.step([0, -1])
+        self.assertIn('rollout worker 1 failed', str(cm.exception))
+        self.assertIn('bad action', str(cm.exception))
+        with self.assertRaises(RuntimeError):
+            penv.step([0, 0])
+        penv.close()
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
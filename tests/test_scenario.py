@@ -61,6 +61,113 @@ class TestScenario(unittest.TestCase):
         scene.clear()
         self.assertEqual(len(scene.entities), 0)
 
+    def test_scenario_index(self):
+        """ 测试 Scenario 查找索引. """
+        scene = Scenario()
+        objs = [scene.add(Entity(name='obj_{}'.format(i % 100))) for i in range(20000)]
+        self.assertEqual(len(scene.entities), 20000)
+        self.assertTrue(scene.find(objs[12345].id) is objs[12345])
+
+        # 同名实体返回最早加入的.
+        self.assertTrue(scene.find('obj_5') is objs[5])
+        scene.remove(objs[5])
+        self.assertTrue(scene.find('obj_5') is objs[105])
+        self.assertTrue(scene.find(objs[5]) is None)
+        self.assertTrue(scene.find(objs[5].id) is None)
+        self.assertTrue(objs[5].scene is None)
+
+        # 移除不在场景中的实体无影响.
+        scene.remove(Entity())
+        self.assertEqual(len(scene.entities), 19999)
+        self.assertTrue(scene.find('') is None)
+
+    def test_active_set(self):
+        """ 测试活动实体集合与归档. """
+        from sim.common import Uav
+
+        scene = Scenario(end=10.0)
+        e1, e2, e3 = scene.add(Entity(name='e1')), scene.add(Entity(name='e2')), scene.add(Entity(name='e3'))
+        self.assertEqual(scene.active_entities, [e1, e2, e3])
+        e2.deactive()
+        self.assertEqual(scene.active_entities, [e1, e3])
+        self.assertEqual(len(scene.entities), 3)
+
+        # 手动归档.
+        self.assertEqual(scene.compact(), 1)
+        self.assertEqual(scene.entities, [e1, e3])
+        self.assertTrue(scene.find('e2') is None)
+        self.assertTrue(scene.find_archived('e2') is e2)
+        self.assertTrue(scene.find_archived(e2.id) is e2)
+
+        # 自动归档, 保留最终状态.
+        scene.auto_compact = True
+        scene.enable_kinematics()
+        uavs = [scene.add(Uav(tracks=[[0, 0], [i + 1, 0]], life=2.0 + i)) for i in range(3)]
+        scene.reset()
+        scene.run()
+        self.assertEqual(scene.entities, [e1, e3])
+        self.assertEqual(len(scene.kinematics), 0)
+        for uav in uavs:
+            t, obj = scene.archive[uav.id]
+            self.assertTrue(obj is uav)
+            self.assertFalse(uav.is_active())
+            self.assertTrue(t < 10.0)
+        np.testing.assert_almost_equal(uavs[2].position, [2.2, 0])
+
+    def test_reactive(self):
+        """ 测试实体恢复活动状态. """
+
+        class Revivable(Entity):
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.steps = 0
+
+            def reset(self):
+                self._active = True
+                self.steps = 0
+
+            def step(self, tt):
+                self.steps += 1
+
+        scene = Scenario(end=1.0)
+        e1, e2, e3 = [scene.add(Revivable(name='e{}'.format(i))) for i in range(1, 4)]
+        scene.reset()
+        e1.deactive()
+        e2.deactive()
+        self.assertEqual(scene.active_entities, [e3])
+        e2.active()
+        self.assertEqual(scene.active_entities, [e2, e3])  # 保持加入顺序.
+        scene.step()
+        self.assertEqual([e.steps for e in (e1, e2, e3)], [0, 1, 1])
+
+        # 重置时按实体状态重建活动集合.
+        scene.reset()
+        self.assertEqual(scene.active_entities, [e1, e2, e3])
+        scene.run()
+        self.assertGreater(e1.steps, 1)
+        self.assertEqual([e.steps for e in (e1, e2, e3)], [e1.steps] * 3)
+
+    def test_step_order(self):
+        """ 测试步进顺序: 批量步进按类型分组, 否则按加入顺序. """
+        order = []
+
+        class A(Entity):
+            def step(self, tt):
+                order.append(self.name)
+
+        class B(A):
+            pass
+
+        for batch_step, expect in ((True, ['a1', 'a2', 'b1']), (False, ['a1', 'b1', 'a2'])):
+            scene = Scenario()
+            scene.batch_step = batch_step
+            for e in (A(name='a1'), B(name='b1'), A(name='a2')):
+                scene.add(e)
+            scene.reset()
+            order.clear()
+            scene.step()
+            self.assertEqual(order, expect)
+
     def test_scenario_run(self):
         """ 测试场景运行. """
         scene = Scenario()
@@ -108,6 +215,62 @@ class TestScenario(unittest.TestCase):
         self.assertTrue(obj1.msg_counter >= 100)
         self.assertTrue(obj2.msg_counter >= 100)
 
+    def test_shadow(self):
+        """ 测试影子实体. """
+        from sim.common import Uav, Jammer
+
+        scene = Scenario()
+        uav = scene.add(Uav(tracks=[[0, 0], [10, 0]]))
+        jammer = scene.add(Jammer(pos=[1, 1]))
+        scene.reset()
+        scene.step()
+        scene.step()
+
+        view = scene._shadows.view
+        self.assertEqual([se.id for se in view], [uav.id, jammer.id])
+        suav, sjammer = view
+        self.assertTrue(isinstance(suav, Uav) and suav is not uav)
+        self.assertTrue(isinstance(sjammer, Jammer))
+        self.assertTrue(suav.scene is None)
+        self.assertFalse(hasattr(suav, 'controller'))
+        np.testing.assert_almost_equal(suav.position, uav.position)
+
+        # 影子状态与实体状态互不影响.
+        uav.position[0] = 100.0
+        self.assertNotAlmostEqual(suav.position[0], 100.0)
+
+        # 影子对象隔步复用.
+        scene.step()
+        scene.step()
+        self.assertTrue(scene._shadows.view[0] is suav)
+
+    def test_event_driven(self):
+        """ 测试事件推进模式. """
+        from sim.common import Uav, Jammer
+        from sim.event import TimeEvent
+
+        def run(event_driven):
+            scene = Scenario(end=100.0, step=0.01)
+            scene.event_driven = event_driven
+            jammer = scene.add(Jammer(pos=[0, 0], effect_range=50.0))
+            jammer.step_handlers.append(TimeEvent(time=60.0, evt=lambda j: setattr(j, 'power_on', True)))
+            fired = []
+            scene.scheduler.at(30.0, lambda s: fired.append(s.clock.tick))
+            uav = scene.add(Uav(tracks=[[1000, 0], [0, 0]], speed=20, life=90.0))
+            scene.reset()
+            steps = 0
+            while scene.step():
+                steps += 1
+            return steps, fired, uav
+
+        steps, fired, uav = run(True)
+        steps_ref, fired_ref, uav_ref = run(False)
+        self.assertTrue(steps < steps_ref / 100)
+        self.assertEqual(fired, fired_ref)
+        self.assertEqual(uav.controller.state, uav_ref.controller.state)
+        self.assertFalse(uav.is_active())
+        np.testing.assert_almost_equal(uav.position, uav_ref.position, decimal=3)
+
     def test_sim_clock(self):
         """ 测试仿真时钟. """
         # 测试默认构造
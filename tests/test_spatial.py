@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+
+from sim import Scenario
+from sim.common import Uav, Jammer, Radar
+from sim.spatial import GridIndex
+
+
+class TestSpatial(unittest.TestCase):
+    """ 测试 spatial 模块. """
+
+    def test_grid(self):
+        rng = np.random.default_rng(0)
+        pts = rng.uniform(-100, 100, (500, 2))
+        grid = GridIndex(10.0)
+        grid.build(pts)
+        self.assertEqual(len(grid), 500)
+
+        for center, r in [((0, 0), 15.0), ((50, -20), 3.0), ((90, 90), 40.0), ((0, 0), 1000.0)]:
+            expect = np.flatnonzero(np.linalg.norm(pts - np.array(center), axis=1) <= r)
+            np.testing.assert_array_equal(grid.query(center, r), expect)
+
+        grid.build(np.zeros((0, 2)))
+        self.assertEqual(len(grid.query((0, 0), 10.0)), 0)
+
+    def test_access(self):
+        """ 空间索引不改变交互结果. """
+        def run(spatial_index):
+            scene = Scenario(end=5.0)
+            scene.spatial_index = spatial_index
+            radar = scene.add(Radar(pos=[0, 0], max_range=30.0))
+            jammer = scene.add(Jammer(pos=[20, 0], effect_range=15.0))
+            jammer.power_on = True
+            uavs = [scene.add(Uav(tracks=[[x, 40], [x, -40]], speed=5, life=100.0))
+                    for x in range(-40, 41, 10)]
+            scene.reset()
+            scene.run()
+            return sorted(radar.results.keys()), [(u.position.tolist(), u.controller.state) for u in uavs], uavs
+
+        ids_a, states_a, uavs_a = run(True)
+        ids_b, states_b, uavs_b = run(False)
+        self.assertEqual([uavs_a.index(u) for u in uavs_a if u.id in ids_a],
+                         [uavs_b.index(u) for u in uavs_b if u.id in ids_b])
+        self.assertEqual(states_a, states_b)
+
+    def test_access_types(self):
+        """ access 只收到关注类型的实体. """
+        seen = []
+
+        class Watcher(Jammer):
+            access_types = (Uav,)
+
+            def access(self, others):
+                seen.append([type(o) for o in others])
+
+        scene = Scenario(end=0.0)
+        scene.add(Watcher())
+        scene.add(Radar())
+        scene.add(Jammer())
+        uav = scene.add(Uav(tracks=[[0, 0], [1, 1]]))
+        scene.reset()
+        scene.step()
+        self.assertEqual(seen, [[Uav]])
+
+        self.assertEqual(len(scene.entities_of(Jammer)), 2)
+        self.assertEqual(scene.entities_of(Uav), [uav])
+        scene.remove(uav)
+        self.assertEqual(scene.entities_of(Uav), [])
@@ -7,4 +7,55 @@ class TestUav(unittest.TestCase):
     
     def test_create(self):
         uav = Uav()
-        self.assertTrue(uav is not None)
\ No newline at end of file
+        self.assertTrue(uav is not None)
+
+    def test_step_batch(self):
+        """ 批量步进与逐个步进结果完全一致. """
+        import random
+        import numpy as np
+        from sim import Scenario
+        from sim.common import Jammer
+        from sim.event import TimeEvent
+
+        def run(batch_step, use_store):
+            rnd = random.Random(7)
+            scene = Scenario(end=20.0)
+            scene.batch_step = batch_step
+            if use_store:
+                scene.enable_kinematics(dim=2)
+            jammer = scene.add(Jammer(pos=[0, 0], effect_range=30.0))
+            jammer.step_handlers.append(TimeEvent(times=[4, 9], evt=lambda j: setattr(j, 'power_on', not j.power_on)))
+            uavs = []
+            for i in range(40):
+                tracks = [[rnd.uniform(-50, 50), rnd.uniform(-50, 50)] for _ in range(rnd.randint(1, 4))]
+                uavs.append(scene.add(Uav(tracks=tracks, speed=rnd.uniform(1, 8), life=rnd.uniform(3, 25),
+                                          two_way=rnd.random() < 0.5)))
+            uavs[0].sensor_position = np.array([5.0, 5.0])
+            scene.reset()
+            records = []
+            while scene.step():
+                records.append([(u.is_active(), u.controller.state, u.controller.track_no,
+                                 u.position.tolist(), u.velocity.tolist()) for u in uavs])
+            return records
+
+        expect = run(False, False)
+        self.assertEqual(run(True, False), expect)
+        self.assertEqual(run(True, True), expect)
+        self.assertEqual(run(False, True), expect)
+
+    def test_mixed_dim(self):
+        """ 2 维和 3 维无人机混合时批量步进与逐个步进一致. """
+        from sim import Scenario
+
+        def run(batch_step):
+            scene = Scenario(end=5.0)
+            scene.batch_step = batch_step
+            uavs = [scene.add(Uav(tracks=[[0, 0], [10, 0]], speed=3)),
+                    scene.add(Uav(tracks=[[0, 0, 0], [10, 0, 5]], speed=3))]
+            scene.reset()
+            scene.run()
+            return [(u.is_active(), u.position.tolist()) for u in uavs]
+
+        expect = run(False)
+        self.assertEqual(len(expect[1][1]), 3)
+        self.assertEqual(run(True), expect)
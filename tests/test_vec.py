@@ -61,3 +61,37 @@ class TestVec(unittest.TestCase):
         vn, ld = vec.move_step(v0, vt, 2)
         self.assertAlmostEqual(ld, -1)
         np.testing.assert_almost_equal(vn, vec.vec([0, 1]))
+
+    def test_batch(self):
+        """ 批量版本与单个版本逐行一致. """
+        rng = np.random.default_rng(0)
+        for d in (2, 3):
+            p0 = rng.uniform(-100, 100, (50, d))
+            p1 = rng.uniform(-100, 100, (50, d))
+            p1[0] = p0[0]  # 零向量.
+            step = rng.uniform(0, 150, 50)
+
+            np.testing.assert_array_equal(vec.dist_n(p0), [vec.dist(p) for p in p0])
+            np.testing.assert_array_equal(vec.dist_n(p0, p1), [vec.dist(a, b) for a, b in zip(p0, p1)])
+            np.testing.assert_array_equal(vec.unit_n(p1 - p0), [vec.unit(b - a) for a, b in zip(p0, p1)])
+
+            pos, left = vec.move_to_n(p0, p1, step)
+            for i in range(50):
+                pos_i, left_i = vec.move_to(p0[i], p1[i], step[i])
+                np.testing.assert_array_equal(pos[i], pos_i)
+                self.assertEqual(left[i], left_i)
+
+            mv, left = vec.move_step_n(p0, p1, 10.0)
+            for i in range(50):
+                mv_i, left_i = vec.move_step(p0[i], p1[i], 10.0)
+                np.testing.assert_array_equal(mv[i], mv_i)
+                self.assertEqual(left[i], left_i)
+
+    def test_fast_scalar(self):
+        """ 标量快速路径与 NumPy 计算一致. """
+        rng = np.random.default_rng(1)
+        for d in (2, 3, 4):
+            for v in rng.normal(size=(100, d)) * 1e3:
+                self.assertEqual(vec.dist(v), np.sqrt(np.sum(v * v)))
+        self.assertAlmostEqual(vec.dist(3.0), 3.0)
+        self.assertAlmostEqual(vec.dist([3, 4]), 5.0)